@@ -1,34 +1,37 @@
 # 정세담 정책 프로그램 - 단일 파일 버전 (Streamlit Cloud 호환)
-# modules, config 없이 모든 기능 통합
+# config 없이 UI 기능 통합 (DB 계층과 AI 분석 생성은 modules/ 공용 사용)
 
 import streamlit as st
 import os
-import json
-import sqlite3
-import base64
-from datetime import datetime, date
+import hashlib
+from datetime import date
 from io import BytesIO
-from typing import Dict, Any, Optional, List, Tuple
-from contextlib import contextmanager
-from zipfile import ZipFile
+from typing import Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 
 # 환경 변수 로드
 load_dotenv()
 
-# OpenAI import
-# try:
-#   from openai import OpenAI
-#  api_key = os.environ.get("OPENAI_API_KEY")
-#   if not api_key and hasattr(st, 'secrets'):
-#        api_key = st.secrets.get("OPENAI_API_KEY", "")
-#    if not api_key:
-#        st.error("⚠️ OPENAI_API_KEY가 설정되지 않았습니다. Streamlit Cloud Secrets에서 설정하세요.")
-#        st.stop()
-#    client = OpenAI(api_key=api_key)
-#except Exception as e:
-#    st.error(f"OpenAI 라이브러리 로드 실패: {e}")
-#    st.stop()
+# OpenAI (분석 생성은 modules/ai_engine.py 공용 - 응답 캐시 포함, 모든 호출은 modules/openai_client 스케줄러 경유)
+try:
+    if not os.environ.get("OPENAI_API_KEY") and hasattr(st, 'secrets'):
+        secret_key = st.secrets.get("OPENAI_API_KEY", "")
+        if secret_key:
+            os.environ["OPENAI_API_KEY"] = secret_key
+except Exception:
+    pass
+
+# OPENAI_BASE_URL(오프라인 대체 서버 등)을 지정한 경우에는 키 없이 실행 가능
+if not os.environ.get("OPENAI_API_KEY") and not os.environ.get("OPENAI_BASE_URL"):
+    st.error("⚠️ OPENAI_API_KEY가 설정되지 않았습니다. Streamlit Cloud Secrets에서 설정하세요.")
+    st.stop()
+
+from modules.ai_engine import stream_policy_analysis, iter_policy_analysis_sections, ANALYSIS_SECTION_LABELS
+from modules.image_generator import iter_generate_images, fetch_image_bytes, image_cache
+from modules.image_variants import pick_variant, image_extension, image_mime_type
+from modules.export_cache import open_export
+from modules.export_jobs import export_jobs, JOB_DONE, JOB_ERROR
+from modules.bulk_export import bulk_export_filters
 
 # PIL import
 try:
@@ -37,21 +40,8 @@ except:
     st.error("Pillow 라이브러리가 필요합니다. requirements.txt에 pillow>=10.0.0 추가하세요.")
     st.stop()
 
-# ReportLab import
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.units import mm
-    from reportlab.pdfgen import canvas
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-except:
-    st.error("ReportLab 라이브러리가 필요합니다. requirements.txt에 reportlab>=4.0.0 추가하세요.")
-    st.stop()
-
 # ==================== 설정 (Settings) ====================
 
-DB_PATH = "data/policies.db"
-
 TARGET_AUDIENCES = {
     "시민": {
         "tone": "친근하고 이해하기 쉬운",
@@ -91,6 +81,7 @@ VIDEO_PLATFORMS = {
 }
 
 IMAGE_SIZES = ["1024x1024", "1024x1792", "1792x1024"]
+IMAGE_BATCH_TIMEOUT = 180  # 일괄 생성 전체 제한 시간(초) - 넘으면 남은 요청 취소
 VIDEO_DURATIONS = ["10초", "20초", "30초", "60초"]
 
 CONTENT_PACKAGES = {
@@ -118,411 +109,27 @@ MUST look like: Real photo taken in Korea TODAY with professional camera.
 """
 
 # ==================== 데이터베이스 (Database) ====================
-
-@contextmanager
-def get_db():
-    # data 폴더가 없으면 생성
-    os.makedirs("data", exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-    finally:
-        conn.close()
-
-def init_database():
-    with get_db() as conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS policies (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                category TEXT NOT NULL,
-                target_audience TEXT NOT NULL,
-                description TEXT,
-                status TEXT DEFAULT 'draft',
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-        """)
-        
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS policy_contents (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                policy_id INTEGER NOT NULL,
-                content_type TEXT NOT NULL,
-                content_data TEXT NOT NULL,
-                metadata TEXT,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (policy_id) REFERENCES policies(id)
-            )
-        """)
-        
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS policy_performance (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                policy_id INTEGER NOT NULL,
-                view_count INTEGER DEFAULT 0,
-                engagement_score REAL DEFAULT 0.0,
-                feedback_data TEXT,
-                metrics_data TEXT,
-                updated_at TEXT NOT NULL,
-                FOREIGN KEY (policy_id) REFERENCES policies(id)
-            )
-        """)
-        
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS generated_media (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                policy_id INTEGER NOT NULL,
-                media_type TEXT NOT NULL,
-                media_url TEXT,
-                media_data BLOB,
-                prompt TEXT,
-                generation_params TEXT,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (policy_id) REFERENCES policies(id)
-            )
-        """)
-        
-        conn.commit()
-
-def create_policy(title: str, category: str, target_audience: str, description: str = "") -> int:
-    now = datetime.now().isoformat()
-    with get_db() as conn:
-        cursor = conn.execute("""
-            INSERT INTO policies (title, category, target_audience, description, status, created_at, updated_at)
-            VALUES (?, ?, ?, ?, 'draft', ?, ?)
-        """, (title, category, target_audience, description, now, now))
-        conn.commit()
-        return cursor.lastrowid
-
-def update_policy_status(policy_id: int, status: str):
-    now = datetime.now().isoformat()
-    with get_db() as conn:
-        conn.execute("""
-            UPDATE policies SET status = ?, updated_at = ? WHERE id = ?
-        """, (status, now, policy_id))
-        conn.commit()
-
-def save_policy_content(policy_id: int, content_type: str, content_data: Dict[str, Any], metadata: Optional[Dict] = None):
-    now = datetime.now().isoformat()
-    with get_db() as conn:
-        conn.execute("""
-            INSERT INTO policy_contents (policy_id, content_type, content_data, metadata, created_at)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            policy_id,
-            content_type,
-            json.dumps(content_data, ensure_ascii=False),
-            json.dumps(metadata or {}, ensure_ascii=False),
-            now
-        ))
-        conn.commit()
-
-def save_generated_media(policy_id: int, media_type: str, media_data: bytes, prompt: str, params: Dict[str, Any]):
-    now = datetime.now().isoformat()
-    with get_db() as conn:
-        conn.execute("""
-            INSERT INTO generated_media (policy_id, media_type, media_data, prompt, generation_params, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            policy_id,
-            media_type,
-            media_data,
-            prompt,
-            json.dumps(params, ensure_ascii=False),
-            now
-        ))
-        conn.commit()
-
-def get_policy(policy_id: int) -> Optional[Dict[str, Any]]:
-    with get_db() as conn:
-        row = conn.execute("SELECT * FROM policies WHERE id = ?", (policy_id,)).fetchone()
-        if row:
-            return dict(row)
-        return None
-
-def get_all_policies(limit: int = 50) -> List[Dict[str, Any]]:
-    with get_db() as conn:
-        rows = conn.execute("""
-            SELECT * FROM policies ORDER BY created_at DESC LIMIT ?
-        """, (limit,)).fetchall()
-        return [dict(row) for row in rows]
-
-def get_policy_contents(policy_id: int) -> List[Dict[str, Any]]:
-    with get_db() as conn:
-        rows = conn.execute("""
-            SELECT * FROM policy_contents WHERE policy_id = ? ORDER BY created_at DESC
-        """, (policy_id,)).fetchall()
-        results = []
-        for row in rows:
-            data = dict(row)
-            data['content_data'] = json.loads(data['content_data'])
-            data['metadata'] = json.loads(data['metadata']) if data['metadata'] else {}
-            results.append(data)
-        return results
-
-def get_generated_media(policy_id: int, media_type: Optional[str] = None) -> List[Dict[str, Any]]:
-    with get_db() as conn:
-        if media_type:
-            rows = conn.execute("""
-                SELECT * FROM generated_media WHERE policy_id = ? AND media_type = ? ORDER BY created_at DESC
-            """, (policy_id, media_type)).fetchall()
-        else:
-            rows = conn.execute("""
-                SELECT * FROM generated_media WHERE policy_id = ? ORDER BY created_at DESC
-            """, (policy_id,)).fetchall()
-        
-        results = []
-        for row in rows:
-            data = dict(row)
-            data['generation_params'] = json.loads(data['generation_params']) if data['generation_params'] else {}
-            results.append(data)
-        return results
-
-def get_policies_by_date(date_str: str) -> List[Dict[str, Any]]:
-    with get_db() as conn:
-        rows = conn.execute("""
-            SELECT * FROM policies 
-            WHERE date(created_at) = date(?)
-            ORDER BY created_at DESC
-        """, (date_str,)).fetchall()
-        return [dict(row) for row in rows]
-
-def get_policies_by_date_range(start_date: str, end_date: str) -> List[Dict[str, Any]]:
-    with get_db() as conn:
-        rows = conn.execute("""
-            SELECT * FROM policies 
-            WHERE date(created_at) BETWEEN date(?) AND date(?)
-            ORDER BY created_at DESC
-        """, (start_date, end_date)).fetchall()
-        return [dict(row) for row in rows]
+# 커넥션 풀(WAL) 기반 DB 계층은 modules/database.py 를 공용으로 사용
+
+from modules.database import (
+    init_database,
+    create_policy,
+    save_generated_media,
+    save_generation_run,
+    get_policy,
+    get_policies_page,
+    get_policy_contents,
+    list_generated_media,
+    get_media_variants,
+    get_policies_by_date,
+    get_policies_by_date_range,
+    count_policies,
+    search_policies,
+    record_view,
+)
 
 # ==================== AI 엔진 (AI Engine) ====================
 
-def parse_json_response(text: str) -> Optional[Dict]:
-    text = text.strip()
-    if text.startswith("```"):
-        text = text.replace("```json", "").replace("```", "").strip()
-    try:
-        return json.loads(text)
-    except:
-        return None
-
-def generate_policy_analysis(
-    title: str,
-    category: str,
-    target_audience: str,
-    description: str,
-    keywords: str = "",
-    constraints: str = "",
-    model: str = "gpt-4o"
-) -> Tuple[Optional[Dict], str]:
-    
-    prompt = f"""
-당신은 정세담 정책 자동화 시스템의 AI입니다.
-정책의 기획부터 실행, 홍보, 성과관리까지 전체 프로세스를 설계합니다.
-
-[입력 정보]
-정책 제목: {title}
-정책 카테고리: {category}
-대상: {target_audience}
-정책 설명: {description}
-강조 키워드: {keywords}
-제약 조건: {constraints}
-
-[출력 규칙]
-- 반드시 JSON 형식으로만 출력
-- 한국 현실에 맞는 실행 가능한 내용
-- 과장 금지, 측정 가능한 지표 사용
-- 대상에 맞는 톤과 메시지
-
-[JSON 스키마]
-{{
-  "policy_planning": {{
-    "objective": "정책 목표 (3-5문장)",
-    "target_analysis": "대상 분석 (니즈, 특성, 접근법 3-5문장)",
-    "key_strategies": ["핵심 전략 5-8개"],
-    "expected_outcomes": ["기대 효과 5-7개"],
-    "timeline": {{
-      "preparation": "준비 단계 내용",
-      "pilot": "시범 운영 내용",
-      "expansion": "확대 적용 내용"
-    }}
-  }},
-  
-  "execution_plan": {{
-    "action_items": [
-      {{
-        "phase": "단계명",
-        "action": "실행 내용",
-        "responsible": "담당 주체",
-        "timeline": "소요 기간"
-      }}
-    ],
-    "resources_needed": {{
-      "budget_range": "예산 범위 (구체적 금액 대신 범주)",
-      "personnel": "필요 인력",
-      "infrastructure": "필요 인프라"
-    }},
-    "risk_management": [
-      {{
-        "risk": "리스크 항목",
-        "impact": "영향도",
-        "mitigation": "완화 방안"
-      }}
-    ]
-  }},
-  
-  "communication_strategy": {{
-    "key_messages": ["핵심 메시지 5-8개"],
-    "channels": [
-      {{
-        "channel": "채널명",
-        "content_type": "콘텐츠 형식",
-        "frequency": "발행 주기"
-      }}
-    ],
-    "target_specific_messages": {{
-      "citizens": "시민 대상 메시지",
-      "youth": "청년 대상 메시지",
-      "elderly": "노인 대상 메시지",
-      "parents": "학부모 대상 메시지"
-    }}
-  }},
-  
-  "content_briefs": {{
-    "image_brief_1": {{
-      "concept": "이미지 컨셉 (5-7문장)",
-      "scene_description": "장면 상세 묘사 (10-15문장)",
-      "visual_style": "비주얼 스타일 (촬영 기법, 조명, 색감)",
-      "key_message": "전달할 핵심 메시지"
-    }},
-    "image_brief_2": {{
-      "concept": "이미지 컨셉 (5-7문장)",
-      "scene_description": "장면 상세 묘사 (10-15문장)",
-      "visual_style": "비주얼 스타일 (촬영 기법, 조명, 색감)",
-      "key_message": "전달할 핵심 메시지"
-    }},
-    "video_brief": {{
-      "duration": "영상 길이",
-      "narrative_arc": "스토리 구조 (5-8문장)",
-      "scenes": [
-        {{
-          "timestamp": "시간대",
-          "scene": "장면 내용",
-          "visuals": "비주얼 요소",
-          "audio": "오디오 (내레이션/음악/효과음)",
-          "message": "전달 메시지"
-        }}
-      ],
-      "style_guide": "영상 스타일 가이드",
-      "call_to_action": "행동 유도 문구"
-    }}
-  }},
-  
-  "marketing_materials": {{
-    "slogan": "슬로건 (20-30자)",
-    "tagline": "태그라인 (40-60자)",
-    "elevator_pitch": "엘리베이터 피치 (150-200자)",
-    "press_release": "보도자료 형식 (300-500자)",
-    "social_media_posts": [
-      {{
-        "platform": "플랫폼",
-        "content": "게시물 내용",
-        "hashtags": ["해시태그"]
-      }}
-    ],
-    "faq": [
-      {{
-        "question": "자주 묻는 질문",
-        "answer": "답변"
-      }}
-    ]
-  }},
-  
-  "performance_metrics": {{
-    "kpi_framework": [
-      {{
-        "category": "지표 카테고리",
-        "metric": "측정 항목",
-        "measurement_method": "측정 방법",
-        "target_range": "목표 범위 (구간/추이)",
-        "data_source": "데이터 출처"
-      }}
-    ],
-    "success_criteria": ["성공 기준 5-7개"],
-    "monitoring_plan": {{
-      "daily": "일간 모니터링 항목",
-      "weekly": "주간 모니터링 항목",
-      "monthly": "월간 모니터링 항목"
-    }},
-    "improvement_triggers": ["개선이 필요한 시점을 알리는 지표 5-7개"]
-  }},
-  
-  "stakeholder_management": {{
-    "stakeholders": [
-      {{
-        "group": "이해관계자 그룹",
-        "interests": "관심사",
-        "engagement_strategy": "소통 전략"
-      }}
-    ],
-    "objection_handling": [
-      {{
-        "objection": "예상 반대 의견",
-        "response": "대응 논리"
-      }}
-    ]
-  }}
-}}
-
-위 스키마를 정확히 따라 JSON만 출력하세요.
-"""
-
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "당신은 정책 전문가입니다. 항상 JSON 형식으로만 응답합니다."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=4000
-        )
-        
-        raw_text = response.choices[0].message.content
-        parsed_data = parse_json_response(raw_text)
-        
-        if parsed_data:
-            return parsed_data, raw_text
-        
-        # JSON 파싱 실패시 재시도
-        retry_prompt = f"""
-이전 응답이 올바른 JSON 형식이 아닙니다.
-아래 내용을 완벽한 JSON으로 다시 출력해주세요.
-
-{raw_text}
-"""
-        
-        retry_response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "JSON 형식으로만 응답합니다."},
-                {"role": "user", "content": retry_prompt}
-            ],
-            temperature=0.3,
-            max_tokens=4000
-        )
-        
-        retry_text = retry_response.choices[0].message.content
-        retry_parsed = parse_json_response(retry_text)
-        
-        return retry_parsed, retry_text
-        
-    except Exception as e:
-        return None, f"Error: {str(e)}"
-
 def generate_image_prompt(brief: Dict[str, Any], style_override: str = "") -> str:
     concept = brief.get("concept", "")
     scene = brief.get("scene_description", "")
@@ -673,25 +280,18 @@ Technical: 30fps or 60fps slow-motion elements, high contrast, vibrant colors
 def generate_policy_image(
     brief: dict,
     size: str = "1024x1024",
-    quality: str = "standard"
+    quality: str = "standard",
+    use_cache: bool = True
 ) -> Optional[Tuple[Image.Image, bytes]]:
-    """정책 이미지 생성 (brief 기반)"""
+    """정책 이미지 생성 (brief 기반, 같은 프롬프트/크기/품질이면 캐시 사용 - use_cache=False면 새 변형)"""
     
     prompt = generate_image_prompt(brief)
     
     try:
-        response = client.images.generate(
-            model="dall-e-3",
-            prompt=prompt,
-            size=size,
-            quality=quality,
-            n=1,
-            response_format="b64_json"
-        )
+        results = fetch_image_bytes(prompt, size=size, quality=quality, use_cache=use_cache)
         
-        if response.data and len(response.data) > 0:
-            b64_data = response.data[0].b64_json
-            image_bytes = base64.b64decode(b64_data)
+        if results:
+            image_bytes = results[0]
             image = Image.open(BytesIO(image_bytes))
             return (image, image_bytes)
         
@@ -701,340 +301,8 @@ def generate_policy_image(
         st.error(f"이미지 생성 실패: {str(e)}")
         return None
 
-def batch_generate_images(prompts: List[str], size: str = "1024x1024", quality: str = "standard") -> List[Tuple[Image.Image, bytes]]:
-    """여러 이미지 순차 생성"""
-    results = []
-    for prompt in prompts:
-        try:
-            response = client.images.generate(
-                model="dall-e-3",
-                prompt=prompt,
-                size=size,
-                quality=quality,
-                n=1,
-                response_format="b64_json"
-            )
-            
-            if response.data and len(response.data) > 0:
-                b64_data = response.data[0].b64_json
-                image_bytes = base64.b64decode(b64_data)
-                image = Image.open(BytesIO(image_bytes))
-                results.append((image, image_bytes))
-        except Exception as e:
-            st.error(f"이미지 생성 실패: {str(e)}")
-            continue
-    
-    return results
-
 # ==================== PDF/ZIP 내보내기 (Export Manager) ====================
-
-def create_pdf_report(policy: Dict[str, Any], analysis: Dict[str, Any], images: List[bytes] = None, video_prompts: List[str] = None) -> bytes:
-    """한글 정책 보고서 PDF 생성 - AI 분석 9개 항목 전체 포함"""
-    
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    
-    # 한글 폰트
-    try:
-        pdfmetrics.registerFont(UnicodeCIDFont('HYSMyeongJo-Medium'))
-        font_name = 'HYSMyeongJo-Medium'
-    except:
-        font_name = 'Helvetica'
-    
-    def new_page():
-        c.showPage()
-        return height - 50
-    
-    def add_heading(y, text, size=14):
-        if y < 100:
-            y = new_page()
-        c.setFont(font_name, size)
-        c.drawString(50, y, text[:90])
-        return y - (size + 15)
-    
-    def add_text(y, text, size=10, indent=60):
-        if y < 80:
-            y = new_page()
-        c.setFont(font_name, size)
-        max_len = 85 if indent == 60 else 90
-        lines = [text[i:i+max_len] for i in range(0, min(len(text), 400), max_len)]
-        for line in lines[:10]:
-            if y < 60:
-                y = new_page()
-                c.setFont(font_name, size)
-            c.drawString(indent, y, line)
-            y -= (size + 4)
-        return y - 5
-    
-    y = height - 50
-    
-    # 표지
-    c.setFont(font_name, 24)
-    c.drawString(50, y, "정책 보고서")
-    y -= 50
-    c.setFont(font_name, 14)
-    c.drawString(50, y, f"제목: {policy.get('title', '')[:50]}")
-    y -= 25
-    c.setFont(font_name, 11)
-    c.drawString(50, y, f"카테고리: {policy.get('category', '')[:60]}")
-    y -= 20
-    c.drawString(50, y, f"대상: {policy.get('target_audience', '')}")
-    y -= 20
-    c.drawString(50, y, f"생성일: {policy.get('created_at', '')}")
-    
-    if not analysis:
-        c.save()
-        buffer.seek(0)
-        return buffer.read()
-    
-    y = new_page()
-    
-    # ===== 1. 정책 기획 =====
-    y = add_heading(y, "1. 정책 기획", 16)
-    if "policy_planning" in analysis:
-        planning = analysis["policy_planning"]
-        
-        if planning.get("objective"):
-            y = add_text(y, f"[목표] {planning['objective']}", 10, 60)
-        
-        if planning.get("target_analysis"):
-            y = add_text(y, f"[대상 분석] {planning['target_analysis']}", 10, 60)
-        
-        if planning.get("key_strategies"):
-            y = add_text(y, "[핵심 전략]", 11, 60)
-            for idx, s in enumerate(planning["key_strategies"][:8], 1):
-                y = add_text(y, f"{idx}. {s}", 10, 70)
-        
-        if planning.get("expected_outcomes"):
-            y = add_text(y, "[기대 효과]", 11, 60)
-            for o in planning["expected_outcomes"][:5]:
-                y = add_text(y, f"• {o}", 10, 70)
-    
-    y -= 15
-    
-    # ===== 2. 실행 계획 =====
-    if y < 150:
-        y = new_page()
-    y = add_heading(y, "2. 실행 계획", 16)
-    if "execution_plan" in analysis:
-        execution = analysis["execution_plan"]
-        
-        if execution.get("action_items"):
-            y = add_text(y, "[실행 항목]", 11, 60)
-            for idx, item in enumerate(execution["action_items"][:8], 1):
-                y = add_text(y, f"{idx}. {item.get('action', '')}", 10, 70)
-        
-        if execution.get("resources_needed"):
-            res = execution["resources_needed"]
-            y = add_text(y, "[필요 자원]", 11, 60)
-            if res.get("budget_range"):
-                y = add_text(y, f"예산: {res['budget_range']}", 10, 70)
-            if res.get("personnel"):
-                y = add_text(y, f"인력: {res['personnel']}", 10, 70)
-    
-    y -= 15
-    
-    # ===== 3. 커뮤니케이션 전략 =====
-    if y < 150:
-        y = new_page()
-    y = add_heading(y, "3. 커뮤니케이션 전략", 16)
-    if "communication_strategy" in analysis:
-        comm = analysis["communication_strategy"]
-        
-        if comm.get("key_messages"):
-            y = add_text(y, "[핵심 메시지]", 11, 60)
-            for idx, msg in enumerate(comm["key_messages"][:8], 1):
-                y = add_text(y, f"{idx}. {msg}", 10, 70)
-        
-        if comm.get("channels"):
-            y = add_text(y, "[채널 전략]", 11, 60)
-            for ch in comm["channels"][:5]:
-                y = add_text(y, f"• {ch.get('channel', '')}: {ch.get('content_type', '')}", 10, 70)
-    
-    y -= 15
-    
-    # ===== 4. 콘텐츠 제작 브리프 =====
-    if y < 150:
-        y = new_page()
-    y = add_heading(y, "4. 콘텐츠 제작 브리프", 16)
-    if "content_briefs" in analysis:
-        briefs = analysis["content_briefs"]
-        
-        if "image_brief_1" in briefs:
-            b1 = briefs["image_brief_1"]
-            y = add_text(y, "[이미지 브리프 1]", 11, 60)
-            y = add_text(y, f"컨셉: {b1.get('concept', '')}", 10, 70)
-            y = add_text(y, f"장면: {b1.get('scene_description', '')}", 10, 70)
-        
-        if "image_brief_2" in briefs:
-            b2 = briefs["image_brief_2"]
-            y = add_text(y, "[이미지 브리프 2]", 11, 60)
-            y = add_text(y, f"컨셉: {b2.get('concept', '')}", 10, 70)
-            y = add_text(y, f"장면: {b2.get('scene_description', '')}", 10, 70)
-        
-        if "video_brief" in briefs:
-            vb = briefs["video_brief"]
-            y = add_text(y, "[영상 브리프]", 11, 60)
-            y = add_text(y, f"스토리: {vb.get('narrative_arc', '')}", 10, 70)
-    
-    y -= 15
-    
-    # ===== 5. 마케팅 자료 =====
-    if y < 150:
-        y = new_page()
-    y = add_heading(y, "5. 마케팅 자료", 16)
-    if "marketing_materials" in analysis:
-        mk = analysis["marketing_materials"]
-        
-        if mk.get("slogan"):
-            y = add_text(y, f"[슬로건] {mk['slogan']}", 11, 60)
-        
-        if mk.get("tagline"):
-            y = add_text(y, f"[태그라인] {mk['tagline']}", 10, 60)
-        
-        if mk.get("elevator_pitch"):
-            y = add_text(y, f"[엘리베이터 피치] {mk['elevator_pitch']}", 10, 60)
-        
-        if mk.get("social_media_posts"):
-            y = add_text(y, "[소셜미디어 콘텐츠]", 11, 60)
-            for idx, post in enumerate(mk["social_media_posts"][:5], 1):
-                y = add_text(y, f"{idx}. {post.get('platform', '')}: {post.get('content', '')}", 10, 70)
-    
-    y -= 15
-    
-    # ===== 6. 성과 지표 (KPI) =====
-    if y < 150:
-        y = new_page()
-    y = add_heading(y, "6. 성과 지표 (KPI)", 16)
-    if "performance_metrics" in analysis:
-        metrics = analysis["performance_metrics"]
-        
-        if metrics.get("kpi_framework"):
-            y = add_text(y, "[KPI 프레임워크]", 11, 60)
-            for idx, kpi in enumerate(metrics["kpi_framework"][:8], 1):
-                y = add_text(y, f"{idx}. {kpi.get('metric', '')}", 10, 70)
-                if kpi.get("target_range"):
-                    y = add_text(y, f"   목표: {kpi['target_range']}", 9, 75)
-        
-        if metrics.get("success_criteria"):
-            y = add_text(y, "[성공 기준]", 11, 60)
-            for sc in metrics["success_criteria"][:5]:
-                y = add_text(y, f"• {sc}", 10, 70)
-    
-    y -= 15
-    
-    # ===== 7. 이해관계자 관리 =====
-    if y < 150:
-        y = new_page()
-    y = add_heading(y, "7. 이해관계자 관리", 16)
-    if "stakeholder_management" in analysis:
-        sh = analysis["stakeholder_management"]
-        
-        if sh.get("stakeholders"):
-            y = add_text(y, "[이해관계자 분석]", 11, 60)
-            for idx, s in enumerate(sh["stakeholders"][:6], 1):
-                y = add_text(y, f"{idx}. {s.get('group', '')}: {s.get('interests', '')}", 10, 70)
-        
-        if sh.get("objection_handling"):
-            y = add_text(y, "[반대 의견 대응]", 11, 60)
-            for obj in sh["objection_handling"][:4]:
-                y = add_text(y, f"• 반대: {obj.get('objection', '')}", 10, 70)
-                y = add_text(y, f"  대응: {obj.get('response', '')}", 9, 75)
-    
-    y -= 15
-    
-    # ===== 8. 이미지 프롬프트 =====
-    if images:
-        if y < 150:
-            y = new_page()
-        y = add_heading(y, "8. 생성된 이미지", 16)
-        
-        for idx, img_bytes in enumerate(images[:4], 1):
-            if y < 250:
-                y = new_page()
-            try:
-                img = ImageReader(BytesIO(img_bytes))
-                c.drawImage(img, 50, y - 200, width=450, height=200, preserveAspectRatio=True)
-                y -= 220
-                c.setFont(font_name, 10)
-                c.drawString(50, y, f"이미지 {idx}")
-                y -= 30
-            except:
-                pass
-    
-    # ===== 9. 영상 프롬프트 =====
-    if video_prompts:
-        y = new_page()
-        y = add_heading(y, "9. 영상 프롬프트", 16)
-        
-        for idx, prompt in enumerate(video_prompts[:9], 1):
-            if y < 150:
-                y = new_page()
-            y = add_text(y, f"[영상 {idx}]", 11, 60)
-            y = add_text(y, prompt[:600], 9, 70)
-            y -= 15
-    
-    c.save()
-    buffer.seek(0)
-    return buffer.read()
-
-def create_zip_export(
-    policy: Dict[str, Any],
-    analysis: Dict[str, Any],
-    images: List[bytes] = None,
-    video_prompts: List[str] = None,
-    pdf_bytes: bytes = None
-) -> bytes:
-    """모든 자료를 ZIP으로 압축 (PDF 포함)"""
-    
-    buffer = BytesIO()
-    
-    with ZipFile(buffer, 'w') as zipf:
-        # PDF 보고서 (최우선)
-        if pdf_bytes:
-            zipf.writestr("정책_보고서_전체.pdf", pdf_bytes)
-        
-        # 정책 정보
-        zipf.writestr("policy_info.json", json.dumps(policy, ensure_ascii=False, indent=2))
-        
-        # AI 분석 결과
-        zipf.writestr("analysis_full.json", json.dumps(analysis, ensure_ascii=False, indent=2))
-        
-        # 이미지
-        if images:
-            for idx, img_bytes in enumerate(images, 1):
-                zipf.writestr(f"images/image_{idx}.png", img_bytes)
-        
-        # 영상 프롬프트
-        if video_prompts:
-            for idx, prompt in enumerate(video_prompts, 1):
-                zipf.writestr(f"video_prompts/prompt_{idx}.txt", prompt)
-        
-        # README
-        readme = f"""
-정세담 정책 프로그램 - 결과물 패키지
-
-정책 제목: {policy['title']}
-생성일: {policy['created_at']}
-
-포함 내용:
-- 정책_보고서_전체.pdf: AI 분석 7개 섹션 + 이미지 + 영상 프롬프트 전체 (PDF)
-- policy_info.json: 정책 기본 정보
-- analysis_full.json: AI 분석 전체 결과 (JSON)
-- images/: 생성된 이미지
-- video_prompts/: 영상 제작 프롬프트
-
-사용 방법:
-1. 정책_보고서_전체.pdf를 열어 전체 내용 확인 (권장)
-2. analysis_full.json을 열어 JSON 형태로 확인
-3. images 폴더의 이미지 활용
-4. video_prompts의 프롬프트를 Sora, Runway, Pika 등에 입력
-"""
-        zipf.writestr("README.txt", readme)
-    
-    buffer.seek(0)
-    return buffer.read()
+# 보고서 PDF는 modules/pdf_renderer.py(PdfRenderer.policy_report), 패키지 ZIP은 modules/export_manager.py, 생성은 백그라운드 작업 큐 modules/export_jobs.py
 
 # ==================== Streamlit UI ====================
 
@@ -1088,12 +356,123 @@ def init_session_state():
         "show_results": False,
         "selected_category": "",
         "temp_selection": "",
-        "active_tab": 0  # 탭 전환용
+        "active_tab": 0,  # 탭 전환용
+        "policy_page_cursors": [],  # 저장된 정책 목록 페이지 커서 (이전 페이지로 돌아가기용 스택)
+        "export_job_ids": {},  # 내보내기 종류별 백그라운드 작업 ID (modules/export_jobs)
+        "image_downloads": set()  # 원본 다운로드를 요청한 이미지 content_hash (요청한 것만 rerun마다 읽음)
     }
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
 
+# 용도별로 필요한 긴 변 픽셀 - 이 이상인 파생본 중 가장 작은 것을 사용 (modules/image_variants)
+GALLERY_MIN_SIDE = 640  # 2열 갤러리, 고해상도 화면 2배 기준
+PDF_MIN_SIDE = 900  # PDF 이미지 폭 450pt의 2배
+
+def new_image_entry(image, image_bytes: bytes, brief: str, handle=None) -> Dict[str, Any]:
+    """
+    생성한 이미지의 세션 항목 - 저장했으면 저장된 원본 핸들을 기준으로
+    
+    저장 시 재인코딩되므로 생성 bytes의 해시는 파생본(media_variants)/저장된 미디어로 만든
+    내보내기 캐시 키와 맞지 않는다. 저장하지 않은 항목(정책 없음)만 bytes를 들고 있음.
+    """
+    if handle is None:
+        return {"image": image, "bytes": image_bytes, "brief": brief}
+    return {"image": image, "media": handle, "brief": brief}
+
+def image_entry_hash(entry: Dict[str, Any]) -> str:
+    """원본 content_hash (저장 전 항목은 처음 한 번 계산해 항목에 보관)"""
+    if "content_hash" not in entry:
+        entry["content_hash"] = entry["media"].content_hash if "media" in entry \
+            else hashlib.sha256(entry["bytes"]).hexdigest()
+    return entry["content_hash"]
+
+def image_entry_variant(entry: Dict[str, Any], min_side: Optional[int] = None):
+    """
+    저장 시 백그라운드로 만들어진 파생본 중 min_side를 만족하는 가장 작은 것 (아직 없으면 None)
+    
+    min_side가 None이면 원본 해상도 파생본(full)
+    """
+    if not entry.get("variants"):
+        variants = get_media_variants([image_entry_hash(entry)]).get(entry["content_hash"])
+        if not variants:
+            return None
+        entry["variants"] = variants
+    name = pick_variant(entry["variants"], min_side)
+    return entry["variants"][name] if name else None
+
+def image_entry_bytes(entry: Dict[str, Any]) -> bytes:
+    """생성 직후 항목은 bytes를 들고 있고, 불러온 항목은 MediaHandle로 그때그때 읽음"""
+    return entry["bytes"] if "bytes" in entry else entry["media"].read()
+
+def image_entry_media(entry: Dict[str, Any], min_side: Optional[int] = None):
+    """ZIP용: 파생본/원본 MediaHandle (ZIP에 쓸 때 청크 단위로 읽음), 저장 전 항목은 bytes"""
+    variant = image_entry_variant(entry, min_side)
+    if variant is not None:
+        return variant
+    return entry["media"] if "media" in entry else entry["bytes"]
+
+def payload_hash(payload: Any, entry: Dict[str, Any]) -> str:
+    """image_entry_media 결과의 식별자 (내보내기 캐시 키용)"""
+    return payload.content_hash if hasattr(payload, "content_hash") else image_entry_hash(entry)
+
+def image_entry_source(entry: Dict[str, Any]):
+    """st.image 입력: 미리보기 파생본 → 원본 파일 경로 순 (경로를 넘겨 앱에서 디코딩하지 않음)"""
+    variant = image_entry_variant(entry, GALLERY_MIN_SIDE)
+    if variant is not None:
+        return variant.path
+    return entry["image"] if "image" in entry else entry["media"].path
+
+# 내보내기 작업 진행률 폴링 주기 (st.fragment가 없는 Streamlit 버전은 새로고침 버튼)
+EXPORT_POLL_SECONDS = 1.0
+
+def _export_job_progress(job_id: str):
+    job = export_jobs.get(job_id)
+    if job is None:
+        return
+    if job.finished:
+        st.rerun()
+    st.progress(job.progress, text=f"{job.message} ({job.snapshot()['elapsed']:.0f}초)")
+
+if hasattr(st, "fragment"):
+    _export_job_progress = st.fragment(run_every=EXPORT_POLL_SECONDS)(_export_job_progress)
+
+def render_export_control(
+    kind: str,
+    label: str,
+    download_label: str,
+    file_name: str,
+    mime: str,
+    policy_id: int,
+    options: Dict[str, Any],
+    job_inputs: Dict[str, Any]
+):
+    """
+    캐시에 있으면 바로 다운로드, 없으면 버튼을 눌렀을 때 백그라운드 작업 등록 후 진행률 표시
+    
+    작업 ID는 세션에 kind별로 보관 - 다른 탭을 보다 와도 진행 중인 작업을 이어서 폴링
+    """
+    cached = open_export(kind, policy_id, options)
+    if cached is not None:
+        with cached:
+            st.download_button(download_label, cached, file_name=file_name, mime=mime, use_container_width=True)
+        return
+    
+    job = export_jobs.get(st.session_state.export_job_ids.get(kind))
+    if job is not None and job.policy_id != policy_id:
+        job = None
+    if job is not None and job.status == JOB_ERROR:
+        st.error(f"내보내기 실패: {job.error}")
+    if job is None or job.finished:
+        if st.button(label, use_container_width=True, key=f"export_{kind}"):
+            job = export_jobs.submit(kind, policy_id, options, **job_inputs)
+            st.session_state.export_job_ids[kind] = job.id
+        else:
+            return
+    _export_job_progress(job.id)
+    if not hasattr(st, "fragment"):
+        st.button("🔄 진행 상황 새로고침", key=f"export_refresh_{kind}", use_container_width=True)
+
 init_session_state()
 init_database()
 
@@ -1132,7 +511,7 @@ with st.sidebar:
     
     st.markdown("### 📅 날짜별 정책 검색")
     
-    search_type = st.radio("검색 방식", ["전체 보기", "날짜 선택", "날짜 범위"], horizontal=True)
+    search_type = st.radio("검색 방식", ["전체 보기", "날짜 선택", "날짜 범위", "키워드"], horizontal=True)
     
     if search_type == "날짜 선택":
         selected_date = st.date_input("날짜 선택", value=date.today())
@@ -1149,9 +528,17 @@ with st.sidebar:
             end_date.strftime("%Y-%m-%d")
         )
         st.caption(f"{len(policies)}건 발견")
+    elif search_type == "키워드":
+        search_keyword = st.text_input("검색어", placeholder="예: 미세먼지, 공공임대주택")
+        policies = search_policies(search_keyword.strip()) if search_keyword.strip() else []
+        st.caption(f"{len(policies)}건 발견 (3글자 이상 검색어는 관련도순)")
     else:
-        policies = get_all_policies(limit=20)
-        st.caption(f"최근 {len(policies)}건")
+        page_cursors = st.session_state.policy_page_cursors
+        policies, next_page_cursor = get_policies_page(
+            limit=20,
+            cursor=page_cursors[-1] if page_cursors else None
+        )
+        st.caption(f"최근 정책 {len(page_cursors) + 1}페이지 ({len(policies)}건)")
     
     st.markdown("### 🗂️ 저장된 정책")
     
@@ -1161,6 +548,8 @@ with st.sidebar:
                 st.write(f"📅 {policy['created_at'][:10]}")
                 st.write(f"카테고리: {policy['category']}")
                 st.write(f"대상: {policy['target_audience']}")
+                if policy.get('snippet'):
+                    st.caption(policy['snippet'])
                 if st.button("불러오기", key=f"load_{policy['id']}"):
                     st.session_state.current_policy_id = policy['id']
                     contents = get_policy_contents(policy['id'])
@@ -1169,28 +558,78 @@ with st.sidebar:
                             if content['content_type'] == 'analysis':
                                 st.session_state.current_analysis = content['content_data']
                     
-                    media = get_generated_media(policy['id'])
-                    st.session_state.generated_images = []
-                    
-                    for m in media:
-                        if m['media_type'] == 'image' and m['media_data']:
-                            img = Image.open(BytesIO(m['media_data']))
-                            st.session_state.generated_images.append({
-                                "image": img,
-                                "bytes": m['media_data'],
-                                "brief": "loaded"
-                            })
+                    # 메타데이터만 조회, 바이트는 화면에 그릴 때 지연 로딩
+                    media = list_generated_media(policy['id'], media_type='image')
+                    st.session_state.generated_images = [
+                        {"media": m['handle'], "variants": m['variants'], "brief": "loaded"}
+                        for m in media if m['handle']
+                    ]
+                    st.session_state.image_downloads = set()
                     
                     st.success(f"✅ 정책 불러오기 완료!")
                     st.rerun()
     else:
         st.info("저장된 정책이 없습니다")
     
+    if search_type == "전체 보기":
+        nav_prev, nav_next = st.columns(2)
+        with nav_prev:
+            if st.button("◀ 이전", disabled=not st.session_state.policy_page_cursors, use_container_width=True):
+                st.session_state.policy_page_cursors.pop()
+                st.rerun()
+        with nav_next:
+            if st.button("다음 ▶", disabled=next_page_cursor is None, use_container_width=True):
+                st.session_state.policy_page_cursors.append(next_page_cursor)
+                st.rerun()
+    
+    st.divider()
+    
+    with st.expander("📦 일괄 내보내기"):
+        bulk_mode = st.radio("범위", ["월", "기간"], horizontal=True, key="bulk_mode")
+        if bulk_mode == "월":
+            bulk_month = st.date_input("월 (아무 날짜)", value=date.today(), key="bulk_month")
+            bulk_filters = bulk_export_filters(month=bulk_month.strftime("%Y-%m"))
+            bulk_label = bulk_month.strftime("%Y-%m")
+        else:
+            bulk_start = st.date_input("시작", value=date.today(), key="bulk_start")
+            bulk_end = st.date_input("종료", value=date.today(), key="bulk_end")
+            bulk_filters = bulk_export_filters(bulk_start.strftime("%Y-%m-%d"), bulk_end.strftime("%Y-%m-%d"))
+            bulk_label = f"{bulk_start.strftime('%Y%m%d')}_{bulk_end.strftime('%Y%m%d')}"
+        bulk_pdf = st.checkbox("정책별 보고서 PDF 포함", value=False, key="bulk_pdf")
+        bulk_media = st.checkbox("이미지 포함", value=True, key="bulk_media")
+        st.caption(f"대상 정책 {count_policies(**bulk_filters)}건")
+        
+        bulk_job = export_jobs.get(st.session_state.export_job_ids.get("bulk"))
+        if bulk_job is not None and bulk_job.status == JOB_ERROR:
+            st.error(f"내보내기 실패: {bulk_job.error}")
+        if bulk_job is not None and bulk_job.status == JOB_DONE:
+            try:
+                bulk_file = open(bulk_job.path, "rb")
+            except FileNotFoundError:
+                # 오래된 결과는 다음 일괄 내보내기 작업이 정리 (bulk_export.BULK_EXPORT_MAX_AGE)
+                st.info("내보낸 파일이 정리되었습니다. 다시 내보내기를 시작하세요.")
+            else:
+                with bulk_file:
+                    st.download_button(
+                        "📥 일괄 내보내기 ZIP 다운로드", bulk_file,
+                        file_name=f"정책_일괄_{bulk_label}.zip", mime="application/zip", use_container_width=True
+                    )
+        if bulk_job is None or bulk_job.finished:
+            if st.button("일괄 내보내기 시작", use_container_width=True, key="bulk_export"):
+                bulk_job = export_jobs.submit_bulk(bulk_filters, include_media=bulk_media, include_pdf=bulk_pdf)
+                st.session_state.export_job_ids["bulk"] = bulk_job.id
+                st.rerun()
+        else:
+            _export_job_progress(bulk_job.id)
+            if not hasattr(st, "fragment"):
+                st.button("🔄 진행 상황 새로고침", key="bulk_export_refresh", use_container_width=True)
+    
     st.divider()
     
     if st.button("🆕 새 정책 시작", use_container_width=True):
         for key in ["current_policy_id", "current_analysis", "generated_images", "video_prompts_3styles", "selected_category", "temp_selection"]:
             st.session_state[key] = [] if "images" in key or "prompts" in key else ("" if "category" in key or "selection" in key else None)
+        st.session_state.image_downloads = set()
         st.session_state.workflow_step = "기획"
         st.session_state.show_results = False
         st.rerun()
@@ -1423,6 +862,16 @@ with tab1:
     
     col1, col2, col3 = st.columns([2, 2, 1])
     
+    with col3:
+        force_regenerate = st.checkbox(
+            "🔄 새로 생성",
+            help="같은 입력의 이전 분석 결과(캐시)를 쓰지 않고 AI가 새로 생성합니다"
+        )
+        parallel_sections = st.checkbox(
+            "⚡ 섹션 병렬 생성",
+            help="7개 섹션을 나눠 동시에 요청합니다 (가장 느린 섹션만큼만 기다림, 섹션별 재시도)"
+        )
+    
     with col1:
         if st.button("💾 정책 저장", use_container_width=True):
             if not policy_title or not policy_description:
@@ -1444,38 +893,49 @@ with tab1:
                 st.error("정책 제목과 설명은 필수입니다")
             else:
                 try:
-                    if not st.session_state.current_policy_id:
-                        policy_id = create_policy(
-                            title=policy_title,
-                            category=policy_category,
-                            target_audience=target_audience,
-                            description=policy_description
-                        )
-                        st.session_state.current_policy_id = policy_id
-                    
-                    with st.spinner("AI가 정책을 분석하고 있습니다... (30-60초 소요)"):
-                        analysis, raw = generate_policy_analysis(
+                    # 섹션이 완성되는 대로 바로 표시 (전체 응답을 기다리지 않음)
+                    with st.status("AI가 정책을 분석하고 있습니다... (30-60초 소요)", expanded=True) as status:
+                        analysis = {}
+                        failed = []
+                        generate_sections = iter_policy_analysis_sections if parallel_sections else stream_policy_analysis
+                        for key, section in generate_sections(
                             title=policy_title,
                             category=policy_category,
                             target_audience=target_audience,
                             description=policy_description,
                             keywords=keywords,
-                            constraints=constraints
-                        )
+                            constraints=constraints,
+                            use_cache=not force_regenerate
+                        ):
+                            label = ANALYSIS_SECTION_LABELS.get(key, key)
+                            if section is None:
+                                failed.append(label)
+                                st.markdown(f"❌ **{label}** 생성 실패")
+                                continue
+                            analysis[key] = section
+                            status.update(label=f"{label} 완료 ({len(analysis)}/{len(ANALYSIS_SECTION_LABELS)})")
+                            st.markdown(f"✅ **{label}**")
+                            st.json(section, expanded=False)
                         
-                        if analysis:
+                        if analysis and not failed:
                             st.session_state.current_analysis = analysis
-                            save_policy_content(
-                                st.session_state.current_policy_id,
-                                "analysis",
-                                analysis
+                            # 정책 생성 + 분석 저장을 한 트랜잭션으로 (분석 실패 시 빈 정책이 남지 않음)
+                            st.session_state.current_policy_id = save_generation_run(
+                                policy_id=st.session_state.current_policy_id,
+                                policy={
+                                    "title": policy_title,
+                                    "category": policy_category,
+                                    "target_audience": target_audience,
+                                    "description": policy_description
+                                },
+                                contents={"analysis": analysis}
                             )
-                            st.success("✅ AI 분석이 완료되었습니다!")
+                            status.update(label="✅ AI 분석이 완료되었습니다!", state="complete", expanded=False)
                             st.session_state.show_results = True
                             st.session_state.workflow_step = "홍보"
                             st.balloons()
                         else:
-                            st.error(f"AI 분석 생성에 실패했습니다.")
+                            status.update(label="AI 분석 생성에 실패했습니다.", state="error")
                             
                 except Exception as e:
                     st.error(f"오류 발생: {str(e)}")
@@ -1669,6 +1129,17 @@ with tab3:
         with col3:
             num_images = st.number_input("생성 개수", min_value=1, max_value=4, value=2)
         
+        new_variant = st.checkbox(
+            "🎲 새 변형 생성",
+            help="같은 브리프/크기/품질로 이미 만든 이미지(캐시)를 쓰지 않고 새로 생성합니다"
+        )
+        cache_stats = image_cache.stats()
+        if cache_stats["hits"] + cache_stats["misses"]:
+            st.caption(
+                f"이미지 캐시: 적중률 {cache_stats['hit_rate']:.0%} "
+                f"({cache_stats['entries']}장, {cache_stats['bytes'] / 1024 / 1024:.1f}MB)"
+            )
+        
         st.divider()
         
         col1, col2 = st.columns(2)
@@ -1680,24 +1151,23 @@ with tab3:
                         result = generate_policy_image(
                             briefs["image_brief_1"],
                             size=image_size,
-                            quality=image_quality
+                            quality=image_quality,
+                            use_cache=not new_variant
                         )
                         if result:
                             img, img_bytes = result
-                            st.session_state.generated_images.append({
-                                "image": img,
-                                "bytes": img_bytes,
-                                "brief": "image_brief_1"
-                            })
-                            
+                            handle = None
                             if st.session_state.current_policy_id:
-                                save_generated_media(
+                                handle = save_generated_media(
                                     st.session_state.current_policy_id,
                                     "image",
                                     img_bytes,
                                     generate_image_prompt(briefs["image_brief_1"]),
                                     {"size": image_size, "quality": image_quality}
                                 )
+                            st.session_state.generated_images.append(
+                                new_image_entry(img, img_bytes, "image_brief_1", handle)
+                            )
                             
                             st.success("✅ 이미지 1 생성 완료!")
                             st.rerun()
@@ -1711,30 +1181,81 @@ with tab3:
                         result = generate_policy_image(
                             briefs["image_brief_2"],
                             size=image_size,
-                            quality=image_quality
+                            quality=image_quality,
+                            use_cache=not new_variant
                         )
                         if result:
                             img, img_bytes = result
-                            st.session_state.generated_images.append({
-                                "image": img,
-                                "bytes": img_bytes,
-                                "brief": "image_brief_2"
-                            })
-                            
+                            handle = None
                             if st.session_state.current_policy_id:
-                                save_generated_media(
+                                handle = save_generated_media(
                                     st.session_state.current_policy_id,
                                     "image",
                                     img_bytes,
                                     generate_image_prompt(briefs["image_brief_2"]),
                                     {"size": image_size, "quality": image_quality}
                                 )
+                            st.session_state.generated_images.append(
+                                new_image_entry(img, img_bytes, "image_brief_2", handle)
+                            )
                             
                             st.success("✅ 이미지 2 생성 완료!")
                             st.rerun()
                         else:
                             st.error("이미지 생성에 실패했습니다")
         
+        # 선택한 개수만큼 브리프 1/2를 번갈아 동시에 생성 (완료되는 대로 바로 표시)
+        if st.button(f"🖼️ 이미지 {num_images}장 한 번에 생성", use_container_width=True):
+            brief_keys = [key for key in ("image_brief_1", "image_brief_2") if key in briefs]
+            if brief_keys:
+                brief_order = [brief_keys[i % len(brief_keys)] for i in range(num_images)]
+                prompts = [generate_image_prompt(briefs[key]) for key in brief_order]
+                progress = st.progress(0.0, text=f"이미지 {num_images}장을 동시에 생성하고 있습니다...")
+                preview_cols = st.columns(num_images)
+                results = []
+                for result in iter_generate_images(
+                    prompts,
+                    size=image_size,
+                    quality=image_quality,
+                    timeout=IMAGE_BATCH_TIMEOUT,
+                    use_cache=not new_variant
+                ):
+                    results.append(result)
+                    progress.progress(len(results) / num_images, text=f"{len(results)}/{num_images} 완료")
+                    with preview_cols[result["index"]]:
+                        if result["status"] == "ok":
+                            st.image(result["image"], caption=f"이미지 {result['index'] + 1}", use_column_width=True)
+                        elif result["status"] == "timeout":
+                            st.warning(f"이미지 {result['index'] + 1}: 시간 초과")
+                        else:
+                            st.error(f"이미지 {result['index'] + 1}: {result['error']}")
+                
+                succeeded = sorted((r for r in results if r["status"] == "ok"), key=lambda r: r["index"])
+                media = [
+                    {
+                        "media_type": "image",
+                        "media_data": r["bytes"],
+                        "prompt": r["prompt"],
+                        "params": {"size": image_size, "quality": image_quality}
+                    }
+                    for r in succeeded
+                ]
+                if succeeded and st.session_state.current_policy_id:
+                    # 저장 후 각 media 항목에 저장된 원본 핸들("handle")이 채워짐
+                    save_generation_run(policy_id=st.session_state.current_policy_id, media=media)
+                for r, m in zip(succeeded, media):
+                    st.session_state.generated_images.append(
+                        new_image_entry(r["image"], r["bytes"], brief_order[r["index"]], m.get("handle"))
+                    )
+                
+                if len(succeeded) == num_images:
+                    st.success(f"✅ 이미지 {num_images}장 생성 완료!")
+                    st.rerun()
+                elif succeeded:
+                    st.warning(f"{num_images}장 중 {len(succeeded)}장만 생성되었습니다")
+                else:
+                    st.error("이미지 생성에 실패했습니다")
+        
         st.divider()
         
         if st.session_state.generated_images:
@@ -1743,17 +1264,23 @@ with tab3:
             cols = st.columns(2)
             for idx, img_data in enumerate(st.session_state.generated_images):
                 with cols[idx % 2]:
-                    st.image(img_data["image"], use_column_width=True)
+                    st.image(image_entry_source(img_data), use_column_width=True)
                     st.caption(f"이미지 {idx+1}")
                     
-                    buffer = BytesIO(img_data["bytes"])
-                    st.download_button(
-                        f"💾 이미지 {idx+1} 다운로드",
-                        buffer,
-                        file_name=f"policy_image_{idx+1}.png",
-                        mime="image/png",
-                        key=f"download_img_{idx}"
-                    )
+                    # 원본 (저장 시 인코딩 정책에 따라 PNG가 아닐 수 있음) - 원본 파일은 요청한 이미지만 읽음
+                    content_hash = image_entry_hash(img_data)
+                    if content_hash not in st.session_state.image_downloads:
+                        if st.button(f"📥 이미지 {idx+1} 원본 준비", key=f"prepare_img_{idx}"):
+                            st.session_state.image_downloads.add(content_hash)
+                    if content_hash in st.session_state.image_downloads:
+                        original = image_entry_bytes(img_data)
+                        st.download_button(
+                            f"💾 이미지 {idx+1} 다운로드",
+                            BytesIO(original),
+                            file_name=f"policy_image_{idx+1}.{image_extension(original)}",
+                            mime=image_mime_type(original),
+                            key=f"download_img_{idx}"
+                        )
         else:
             st.info("이미지를 생성하려면 위의 버튼을 클릭하세요")
     
@@ -1893,6 +1420,7 @@ with tab5:
     
     if st.session_state.current_policy_id and st.session_state.current_analysis:
         policy = get_policy(st.session_state.current_policy_id)
+        record_view(policy['id'])  # 메모리에 모았다가 주기적으로 일괄 반영
         
         st.markdown("#### 정책 정보")
         col1, col2, col3, col4 = st.columns(4)
@@ -1924,71 +1452,49 @@ with tab5:
         
         st.markdown("#### 📥 다운로드")
         
+        # 영상 프롬프트 3종 모두 텍스트로 변환
+        video_texts = []
+        for idx, prompt_set in enumerate(st.session_state.video_prompts_3styles, 1):
+            video_texts.append(f"[세트 {idx} - 다큐멘터리]\n{prompt_set.get('documentary', '')}")
+            video_texts.append(f"[세트 {idx} - 시네마틱]\n{prompt_set.get('cinematic', '')}")
+            video_texts.append(f"[세트 {idx} - 모던 다이내믹]\n{prompt_set.get('modern_dynamic', '')}")
+        
+        # PDF에는 미리보기 파생본, ZIP에는 원본 해상도 파생본(핸들 - 바이트는 ZIP에 쓸 때 읽음)
+        entries = st.session_state.generated_images
+        pdf_images = [image_entry_media(img, PDF_MIN_SIDE) for img in entries]
+        zip_images = [image_entry_media(img) for img in entries]
+        
+        # 내보내기 캐시 키: DB 정책 revision + DB 밖 입력(세션 영상 프롬프트, 사용할 이미지)
+        pdf_options = {
+            "images": [payload_hash(m, img) for m, img in zip(pdf_images, entries)],
+            "video_prompts": video_texts
+        }
+        zip_options = {"pdf": pdf_options, "zip_images": [payload_hash(m, img) for m, img in zip(zip_images, entries)]}
+        
+        # 무거운 렌더링은 백그라운드 작업 큐(modules/export_jobs)에서 - 이 세션 스레드는 진행률만 폴링
+        job_inputs = {
+            "policy": policy,
+            "analysis": st.session_state.current_analysis,
+            "pdf_images": pdf_images,
+            "zip_images": zip_images,
+            "video_prompts": video_texts
+        }
+        
         col1, col2 = st.columns(2)
         
         with col1:
-            if st.button("📄 PDF 보고서", use_container_width=True):
-                with st.spinner("PDF를 생성하고 있습니다..."):
-                    # 이미지 바이트 수집
-                    image_bytes = [img['bytes'] for img in st.session_state.generated_images]
-                    
-                    # 영상 프롬프트 텍스트 수집
-                    video_texts = []
-                    for idx, prompt_set in enumerate(st.session_state.video_prompts_3styles, 1):
-                        video_texts.append(f"[세트 {idx} - 다큐멘터리]\n{prompt_set.get('documentary', '')}")
-                        video_texts.append(f"[세트 {idx} - 시네마틱]\n{prompt_set.get('cinematic', '')}")
-                        video_texts.append(f"[세트 {idx} - 모던 다이내믹]\n{prompt_set.get('modern_dynamic', '')}")
-                    
-                    pdf_bytes = create_pdf_report(
-                        policy, 
-                        st.session_state.current_analysis,
-                        images=image_bytes if image_bytes else None,
-                        video_prompts=video_texts if video_texts else None
-                    )
-                    st.download_button(
-                        "💾 PDF 다운로드",
-                        pdf_bytes,
-                        file_name=f"policy_report_{policy['id']}.pdf",
-                        mime="application/pdf",
-                        use_container_width=True
-                    )
+            render_export_control(
+                "pdf", "📄 PDF 보고서", "💾 PDF 다운로드",
+                f"policy_report_{policy['id']}.pdf", "application/pdf",
+                policy['id'], pdf_options, job_inputs
+            )
         
         with col2:
-            if st.button("📦 전체 ZIP", use_container_width=True):
-                with st.spinner("ZIP 파일을 생성하고 있습니다..."):
-                    image_bytes = [img['bytes'] for img in st.session_state.generated_images]
-                    
-                    # 영상 프롬프트 3종 모두 텍스트로 변환
-                    video_texts = []
-                    for idx, prompt_set in enumerate(st.session_state.video_prompts_3styles, 1):
-                        video_texts.append(f"[세트 {idx} - 다큐멘터리]\n{prompt_set.get('documentary', '')}")
-                        video_texts.append(f"[세트 {idx} - 시네마틱]\n{prompt_set.get('cinematic', '')}")
-                        video_texts.append(f"[세트 {idx} - 모던 다이내믹]\n{prompt_set.get('modern_dynamic', '')}")
-                    
-                    # PDF 먼저 생성
-                    pdf_bytes = create_pdf_report(
-                        policy, 
-                        st.session_state.current_analysis,
-                        images=image_bytes if image_bytes else None,
-                        video_prompts=video_texts if video_texts else None
-                    )
-                    
-                    # ZIP 생성 (PDF 포함)
-                    zip_bytes = create_zip_export(
-                        policy,
-                        st.session_state.current_analysis,
-                        images=image_bytes,
-                        video_prompts=video_texts if video_texts else None,
-                        pdf_bytes=pdf_bytes
-                    )
-                    
-                    st.download_button(
-                        "💾 ZIP 다운로드",
-                        zip_bytes,
-                        file_name=f"policy_package_{policy['id']}.zip",
-                        mime="application/zip",
-                        use_container_width=True
-                    )
+            render_export_control(
+                "zip", "📦 전체 ZIP", "💾 ZIP 다운로드",
+                f"policy_package_{policy['id']}.zip", "application/zip",
+                policy['id'], zip_options, job_inputs
+            )
     
     else:
         st.info("정책을 생성하고 AI 분석을 완료해주세요")
@@ -1,31 +1,32 @@
 # 정세담 정책 프로그램 - 단일 파일 버전 (Streamlit Cloud 호환)
-# modules, config 없이 모든 기능 통합
+# config 없이 모든 기능 통합 (OpenAI 호출은 modules/openai_client 공용 클라이언트/스케줄러 사용)
 
 import streamlit as st
 import os
 import json
-import sqlite3
 import base64
-from datetime import datetime, date
+from datetime import date
 from io import BytesIO
-from typing import Dict, Any, Optional, List, Tuple
-from contextlib import contextmanager
-from zipfile import ZipFile
+from typing import Dict, Any, Optional, List, Tuple, BinaryIO
 from dotenv import load_dotenv
 
 # 환경 변수 로드
 load_dotenv()
 
-# OpenAI import
+# OpenAI import (프로세스 공용 클라이언트 - 연결 재사용 + 모델별 RPM/TPM 스케줄링)
 try:
-    from openai import OpenAI
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key and hasattr(st, 'secrets'):
         api_key = st.secrets.get("OPENAI_API_KEY", "")
-    if not api_key:
+    if not api_key and not os.environ.get("OPENAI_BASE_URL"):
         st.error("⚠️ OPENAI_API_KEY가 설정되지 않았습니다. Streamlit Cloud Secrets에서 설정하세요.")
         st.stop()
-    client = OpenAI(api_key=api_key)
+    if api_key:
+        os.environ["OPENAI_API_KEY"] = api_key
+    from modules.openai_client import chat_completion, generate_image, BATCH
+    from modules.image_generator import fetch_image_bytes
+    from modules.image_variants import image_extension
+    from modules.zip_stream import spool_zip
 except Exception as e:
     st.error(f"OpenAI 라이브러리 로드 실패: {e}")
     st.stop()
@@ -37,21 +38,15 @@ except:
     st.error("Pillow 라이브러리가 필요합니다. requirements.txt에 pillow>=10.0.0 추가하세요.")
     st.stop()
 
-# ReportLab import
+# ReportLab import (폰트 등록/스타일은 modules/pdf_renderer 공용 렌더러에서 프로세스당 한 번)
 try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.units import mm
-    from reportlab.pdfgen import canvas
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+    from modules.pdf_renderer import get_renderer
 except:
     st.error("ReportLab 라이브러리가 필요합니다. requirements.txt에 reportlab>=4.0.0 추가하세요.")
     st.stop()
 
 # ==================== 설정 (Settings) ====================
 
-DB_PATH = "data/policies.db"
-
 TARGET_AUDIENCES = {
     "시민": {
         "tone": "친근하고 이해하기 쉬운",
@@ -149,185 +144,21 @@ CRITICAL: The image must depict something that could realistically be photograph
 """
 
 # ==================== 데이터베이스 (Database) ====================
-
-@contextmanager
-def get_db():
-    # data 폴더가 없으면 생성
-    os.makedirs("data", exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-    finally:
-        conn.close()
-
-def init_database():
-    with get_db() as conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS policies (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                category TEXT NOT NULL,
-                target_audience TEXT NOT NULL,
-                description TEXT,
-                status TEXT DEFAULT 'draft',
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-        """)
-        
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS policy_contents (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                policy_id INTEGER NOT NULL,
-                content_type TEXT NOT NULL,
-                content_data TEXT NOT NULL,
-                metadata TEXT,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (policy_id) REFERENCES policies(id)
-            )
-        """)
-        
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS policy_performance (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                policy_id INTEGER NOT NULL,
-                view_count INTEGER DEFAULT 0,
-                engagement_score REAL DEFAULT 0.0,
-                feedback_data TEXT,
-                metrics_data TEXT,
-                updated_at TEXT NOT NULL,
-                FOREIGN KEY (policy_id) REFERENCES policies(id)
-            )
-        """)
-        
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS generated_media (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                policy_id INTEGER NOT NULL,
-                media_type TEXT NOT NULL,
-                media_url TEXT,
-                media_data BLOB,
-                prompt TEXT,
-                generation_params TEXT,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (policy_id) REFERENCES policies(id)
-            )
-        """)
-        
-        conn.commit()
-
-def create_policy(title: str, category: str, target_audience: str, description: str = "") -> int:
-    now = datetime.now().isoformat()
-    with get_db() as conn:
-        cursor = conn.execute("""
-            INSERT INTO policies (title, category, target_audience, description, status, created_at, updated_at)
-            VALUES (?, ?, ?, ?, 'draft', ?, ?)
-        """, (title, category, target_audience, description, now, now))
-        conn.commit()
-        return cursor.lastrowid
-
-def update_policy_status(policy_id: int, status: str):
-    now = datetime.now().isoformat()
-    with get_db() as conn:
-        conn.execute("""
-            UPDATE policies SET status = ?, updated_at = ? WHERE id = ?
-        """, (status, now, policy_id))
-        conn.commit()
-
-def save_policy_content(policy_id: int, content_type: str, content_data: Dict[str, Any], metadata: Optional[Dict] = None):
-    now = datetime.now().isoformat()
-    with get_db() as conn:
-        conn.execute("""
-            INSERT INTO policy_contents (policy_id, content_type, content_data, metadata, created_at)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            policy_id,
-            content_type,
-            json.dumps(content_data, ensure_ascii=False),
-            json.dumps(metadata or {}, ensure_ascii=False),
-            now
-        ))
-        conn.commit()
-
-def save_generated_media(policy_id: int, media_type: str, media_data: bytes, prompt: str, params: Dict[str, Any]):
-    now = datetime.now().isoformat()
-    with get_db() as conn:
-        conn.execute("""
-            INSERT INTO generated_media (policy_id, media_type, media_data, prompt, generation_params, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            policy_id,
-            media_type,
-            media_data,
-            prompt,
-            json.dumps(params, ensure_ascii=False),
-            now
-        ))
-        conn.commit()
-
-def get_policy(policy_id: int) -> Optional[Dict[str, Any]]:
-    with get_db() as conn:
-        row = conn.execute("SELECT * FROM policies WHERE id = ?", (policy_id,)).fetchone()
-        if row:
-            return dict(row)
-        return None
-
-def get_all_policies(limit: int = 50) -> List[Dict[str, Any]]:
-    with get_db() as conn:
-        rows = conn.execute("""
-            SELECT * FROM policies ORDER BY created_at DESC LIMIT ?
-        """, (limit,)).fetchall()
-        return [dict(row) for row in rows]
-
-def get_policy_contents(policy_id: int) -> List[Dict[str, Any]]:
-    with get_db() as conn:
-        rows = conn.execute("""
-            SELECT * FROM policy_contents WHERE policy_id = ? ORDER BY created_at DESC
-        """, (policy_id,)).fetchall()
-        results = []
-        for row in rows:
-            data = dict(row)
-            data['content_data'] = json.loads(data['content_data'])
-            data['metadata'] = json.loads(data['metadata']) if data['metadata'] else {}
-            results.append(data)
-        return results
-
-def get_generated_media(policy_id: int, media_type: Optional[str] = None) -> List[Dict[str, Any]]:
-    with get_db() as conn:
-        if media_type:
-            rows = conn.execute("""
-                SELECT * FROM generated_media WHERE policy_id = ? AND media_type = ? ORDER BY created_at DESC
-            """, (policy_id, media_type)).fetchall()
-        else:
-            rows = conn.execute("""
-                SELECT * FROM generated_media WHERE policy_id = ? ORDER BY created_at DESC
-            """, (policy_id,)).fetchall()
-        
-        results = []
-        for row in rows:
-            data = dict(row)
-            data['generation_params'] = json.loads(data['generation_params']) if data['generation_params'] else {}
-            results.append(data)
-        return results
-
-def get_policies_by_date(date_str: str) -> List[Dict[str, Any]]:
-    with get_db() as conn:
-        rows = conn.execute("""
-            SELECT * FROM policies 
-            WHERE date(created_at) = date(?)
-            ORDER BY created_at DESC
-        """, (date_str,)).fetchall()
-        return [dict(row) for row in rows]
-
-def get_policies_by_date_range(start_date: str, end_date: str) -> List[Dict[str, Any]]:
-    with get_db() as conn:
-        rows = conn.execute("""
-            SELECT * FROM policies 
-            WHERE date(created_at) BETWEEN date(?) AND date(?)
-            ORDER BY created_at DESC
-        """, (start_date, end_date)).fetchall()
-        return [dict(row) for row in rows]
+# app.py와 같은 data/policies.db를 쓰므로 DB 계층도 modules/database.py 를 공용으로 사용
+# (이미지 바이트는 generated_media BLOB이 아닌 파일 저장소(modules/media_store)에 저장)
+
+from modules.database import (
+    init_database,
+    create_policy,
+    save_policy_content,
+    save_generated_media,
+    get_policy,
+    get_all_policies,
+    get_policy_contents,
+    get_generated_media,
+    get_policies_by_date,
+    get_policies_by_date_range,
+)
 
 # ==================== AI 엔진 (AI Engine) ====================
 
@@ -512,7 +343,7 @@ def generate_policy_analysis(
 """
 
     try:
-        response = client.chat.completions.create(
+        response = chat_completion(
             model=model,
             messages=[
                 {"role": "system", "content": "당신은 정책 전문가입니다. 항상 JSON 형식으로만 응답합니다."},
@@ -536,7 +367,7 @@ def generate_policy_analysis(
 {raw_text}
 """
         
-        retry_response = client.chat.completions.create(
+        retry_response = chat_completion(
             model=model,
             messages=[
                 {"role": "system", "content": "JSON 형식으로만 응답합니다."},
@@ -704,25 +535,18 @@ Technical: 30fps or 60fps slow-motion elements, high contrast, vibrant colors
 def generate_policy_image(
     brief: dict,
     size: str = "1024x1024",
-    quality: str = "standard"
+    quality: str = "standard",
+    use_cache: bool = True
 ) -> Optional[Tuple[Image.Image, bytes]]:
-    """정책 이미지 생성 (brief 기반)"""
+    """정책 이미지 생성 (brief 기반, 같은 프롬프트/크기/품질이면 캐시 사용 - use_cache=False면 새 변형)"""
     
     prompt = generate_image_prompt(brief)
     
     try:
-        response = client.images.generate(
-            model="dall-e-3",
-            prompt=prompt,
-            size=size,
-            quality=quality,
-            n=1,
-            response_format="b64_json"
-        )
+        results = fetch_image_bytes(prompt, size=size, quality=quality, use_cache=use_cache)
         
-        if response.data and len(response.data) > 0:
-            b64_data = response.data[0].b64_json
-            image_bytes = base64.b64decode(b64_data)
+        if results:
+            image_bytes = results[0]
             image = Image.open(BytesIO(image_bytes))
             return (image, image_bytes)
         
@@ -737,7 +561,8 @@ def batch_generate_images(prompts: List[str], size: str = "1024x1024", quality:
     results = []
     for prompt in prompts:
         try:
-            response = client.images.generate(
+            response = generate_image(
+                priority=BATCH,
                 model="dall-e-3",
                 prompt=prompt,
                 size=size,
@@ -759,76 +584,33 @@ def batch_generate_images(prompts: List[str], size: str = "1024x1024", quality:
 
 # ==================== PDF/ZIP 내보내기 (Export Manager) ====================
 
-def create_pdf_report(policy: Dict[str, Any], analysis: Dict[str, Any]) -> bytes:
-    """한글 정책 보고서 PDF 생성"""
-    
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    
-    # 한글 폰트 등록
-    try:
-        pdfmetrics.registerFont(UnicodeCIDFont('HYSMyeongJo-Medium'))
-        font_name = 'HYSMyeongJo-Medium'
-    except:
-        font_name = 'Helvetica'
-    
-    # 제목
-    c.setFont(font_name, 20)
-    c.drawString(50, height - 50, "정책 보고서")
-    
-    c.setFont(font_name, 14)
-    c.drawString(50, height - 80, f"제목: {policy['title']}")
-    c.drawString(50, height - 100, f"카테고리: {policy['category']}")
-    c.drawString(50, height - 120, f"대상: {policy['target_audience']}")
-    
-    c.setFont(font_name, 10)
-    y_position = height - 160
-    
-    # 정책 설명
-    if policy.get('description'):
-        c.drawString(50, y_position, "정책 설명:")
-        y_position -= 20
-        desc_lines = policy['description'][:200].split('\n')
-        for line in desc_lines[:5]:
-            c.drawString(60, y_position, line[:80])
-            y_position -= 15
-    
-    c.showPage()
-    c.save()
-    
-    buffer.seek(0)
-    return buffer.read()
-
 def create_zip_export(
     policy: Dict[str, Any],
     analysis: Dict[str, Any],
     images: List[bytes] = None,
     video_prompts: List[str] = None
-) -> bytes:
-    """모든 자료를 ZIP으로 압축"""
-    
-    buffer = BytesIO()
+) -> BinaryIO:
+    """모든 자료를 ZIP으로 압축 (항목별로 임시 파일에 기록해 되감은 파일 객체 반환)"""
     
-    with ZipFile(buffer, 'w') as zipf:
+    def entries():
         # 정책 정보
-        zipf.writestr("policy_info.json", json.dumps(policy, ensure_ascii=False, indent=2))
+        yield "policy_info.json", json.dumps(policy, ensure_ascii=False, indent=2)
         
         # AI 분석 결과
-        zipf.writestr("analysis_full.json", json.dumps(analysis, ensure_ascii=False, indent=2))
+        yield "analysis_full.json", json.dumps(analysis, ensure_ascii=False, indent=2)
         
-        # 이미지
+        # 이미지 (PNG/JPEG/WebP는 ZIP_STORED)
         if images:
             for idx, img_bytes in enumerate(images, 1):
-                zipf.writestr(f"images/image_{idx}.png", img_bytes)
+                yield f"images/image_{idx}.{image_extension(img_bytes)}", img_bytes
         
         # 영상 프롬프트
         if video_prompts:
             for idx, prompt in enumerate(video_prompts, 1):
-                zipf.writestr(f"video_prompts/prompt_{idx}.txt", prompt)
+                yield f"video_prompts/prompt_{idx}.txt", prompt
         
         # README
-        readme = f"""
+        yield "README.txt", f"""
 정세담 정책 프로그램 - 결과물 패키지
 
 정책 제목: {policy['title']}
@@ -845,10 +627,8 @@ def create_zip_export(
 2. images 폴더의 이미지 활용
 3. video_prompts의 프롬프트를 Runway, Pika 등에 입력
 """
-        zipf.writestr("README.txt", readme)
     
-    buffer.seek(0)
-    return buffer.read()
+    return spool_zip(entries())
 
 # ==================== Streamlit UI ====================
 
@@ -1640,7 +1420,7 @@ with tab5:
         with col1:
             if st.button("📄 PDF 보고서", use_container_width=True):
                 with st.spinner("PDF를 생성하고 있습니다..."):
-                    pdf_bytes = create_pdf_report(policy, st.session_state.current_analysis)
+                    pdf_bytes = get_renderer().policy_report(policy, st.session_state.current_analysis)
                     st.download_button(
                         "💾 PDF 다운로드",
                         pdf_bytes,
@@ -1654,19 +1434,18 @@ with tab5:
                 with st.spinner("ZIP 파일을 생성하고 있습니다..."):
                     image_bytes = [img['bytes'] for img in st.session_state.generated_images]
                     
-                    zip_bytes = create_zip_export(
+                    with create_zip_export(
                         policy,
                         st.session_state.current_analysis,
                         images=image_bytes
-                    )
-                    
-                    st.download_button(
-                        "💾 ZIP 다운로드",
-                        zip_bytes,
-                        file_name=f"policy_package_{policy['id']}.zip",
-                        mime="application/zip",
-                        use_container_width=True
-                    )
+                    ) as zip_file:
+                        st.download_button(
+                            "💾 ZIP 다운로드",
+                            zip_file,
+                            file_name=f"policy_package_{policy['id']}.zip",
+                            mime="application/zip",
+                            use_container_width=True
+                        )
     
     else:
         st.info("정책을 생성하고 AI 분석을 완료해주세요")
@@ -3,9 +3,6 @@ import json
 import sqlite3
 import time
 from datetime import datetime, date
-import os
-
-from openai import OpenAI
 
 from modules.mobile_ui import inject_mobile_css, copy_button, quick_ai_links
 from modules.image_ai import render_image_ai
@@ -15,6 +12,8 @@ from typing import Any, Dict, Optional
 from modules.action_buttons import render_ai_actions
 from modules.video_ai import render_video_ai
 from modules.export_utils import render_download_buttons
+from modules.json_repair import loads_tolerant
+from modules.openai_client import create_response
 
 
 
@@ -27,9 +26,7 @@ inject_mobile_css()
 # =========================
 # OpenAI
 # =========================
-client = OpenAI(
-    api_key=os.environ.get("OPENAI_API_KEY")
-)
+# 호출은 modules/openai_client 공용 클라이언트 경유 (연결 재사용 + 모델별 RPM/TPM 스케줄링)
 
 # =========================
 # DB (SQLite)
@@ -130,14 +127,12 @@ def _strip_code_fences(s: str) -> str:
     return s
 
 def try_parse_json(s: str) -> Optional[dict]:
-    s = _strip_code_fences(s)
-    try:
-        return json.loads(s)
-    except Exception:
-        return None
+    # 엄격 파싱 실패 시 잘림/후행 쉼표/앞뒤 설명/스마트 따옴표를 로컬 복구 (재요청 전에)
+    data, _ = loads_tolerant(_strip_code_fences(s))
+    return data if isinstance(data, dict) else None
 
 def call_ai_json(prompt: str, model: str, max_tokens: int = 2600) -> (Optional[dict], str):
-    res = client.responses.create(
+    res = create_response(
         model=model,
         input=prompt,
         max_output_tokens=max_tokens
@@ -147,7 +142,7 @@ def call_ai_json(prompt: str, model: str, max_tokens: int = 2600) -> (Optional[d
     if data is not None:
         return data, raw
 
-    # retry once: force JSON only
+    # 로컬 복구도 실패한 경우에만 retry once: force JSON only
     reprompt = f"""
 너는 반드시 JSON만 출력한다. 설명/마크다운/코드블록/주석 금지.
 아래 스키마를 지켜서 '완전한 JSON'만 다시 출력해.
@@ -155,7 +150,7 @@ def call_ai_json(prompt: str, model: str, max_tokens: int = 2600) -> (Optional[d
 원문(잘못된 출력):
 {raw}
 """
-    res2 = client.responses.create(
+    res2 = create_response(
         model=model,
         input=reprompt,
         max_output_tokens=max_tokens
@@ -1,126 +1,174 @@
 # modules/export_utils.py
-import io
+import os
 import json
-import zipfile
+import shutil
+import hashlib
+import tempfile
 from datetime import datetime
 
 import streamlit as st
 
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from modules.pdf_renderer import get_renderer
+from modules.zip_stream import spool_zip
 
 
 # =========================
 # PDF (한글 절대 안 깨지는 방식)
 # =========================
 def make_pdf(result: dict) -> bytes:
-    buffer = io.BytesIO()
-
-    # ✅ CID 한글 폰트 (ReportLab 내장)
-    pdfmetrics.registerFont(UnicodeCIDFont("HYSMyeongJo-Medium"))
-
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=36,
-        leftMargin=36,
-        topMargin=36,
-        bottomMargin=36,
+    # ✅ CID 한글 폰트 (ReportLab 내장) - 공용 보고서 렌더러가 섹션마다 JSON 그대로 출력 (깨짐 없음)
+    return get_renderer().policy_report(
+        {"created_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S')},
+        result,
+        heading="정세담 퍼포먼스 결과"
     )
 
-    styles = getSampleStyleSheet()
-    styles["Normal"].fontName = "HYSMyeongJo-Medium"
-    styles["Title"].fontName = "HYSMyeongJo-Medium"
-
-    story = []
-
-    # 표지
-    story.append(Paragraph("<b>정세담 퍼포먼스 결과</b>", styles["Title"]))
-    story.append(Paragraph(
-        f"생성 시각: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-        styles["Normal"]
-    ))
-    story.append(PageBreak())
-
-    # 섹션별 출력
-    for section, content in result.items():
-        story.append(Paragraph(f"<b>{section.upper()}</b>", styles["Title"]))
-
-        if isinstance(content, (dict, list)):
-            text = json.dumps(content, ensure_ascii=False, indent=2)
-        else:
-            text = str(content)
-
-        # JSON 그대로 출력 (깨짐 없음)
-        for line in text.split("\n"):
-            story.append(Paragraph(line.replace("<", "&lt;").replace(">", "&gt;"), styles["Normal"]))
-
-        story.append(PageBreak())
-
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.read()
-
 
 # =========================
 # ZIP (항목별 구조화)
 # =========================
-def make_zip(result: dict) -> bytes:
-    buf = io.BytesIO()
-    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-
-        zf.writestr(
-            "result_full.json",
-            json.dumps(result, ensure_ascii=False, indent=2)
-        )
+def make_zip(result: dict):
+    """항목을 하나씩 임시 파일(작으면 메모리)에 기록하고 되감은 파일 객체 반환 (다 쓴 뒤 close)"""
+    def entries():
+        yield "result_full.json", json.dumps(result, ensure_ascii=False, indent=2)
 
         for k, v in result.items():
-            zf.writestr(
+            yield (
                 f"{k}/{k}.json",
                 json.dumps(v, ensure_ascii=False, indent=2)
                 if isinstance(v, (dict, list)) else str(v)
             )
 
-        zf.writestr(
-            "meta.txt",
-            f"exported_at={datetime.now().isoformat()}"
-        )
+        yield "meta.txt", f"exported_at={datetime.now().isoformat()}"
 
-    buf.seek(0)
-    return buf.read()
+    return spool_zip(entries())
+
+
+# =========================
+# 내보내기 캐시 (결과 내용 해시 기준, 디스크 파일)
+# =========================
+EXPORT_DIR = os.path.join("data", "exports")
+# 보관할 최대 파일 수 (오래 쓰지 않은 것부터 정리)
+EXPORT_MAX_FILES = 32
+
+
+def result_revision(result: dict) -> str:
+    payload = json.dumps(result, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _export_path(kind: str, revision: str) -> str:
+    return os.path.join(EXPORT_DIR, f"{revision}.{kind}")
+
+
+def _prune_exports():
+    files = [os.path.join(EXPORT_DIR, name) for name in os.listdir(EXPORT_DIR) if not name.endswith(".tmp")]
+    if len(files) <= EXPORT_MAX_FILES:
+        return
+    def mtime(path):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0
+    for path in sorted(files, key=mtime)[:-EXPORT_MAX_FILES]:
+        try:
+            os.remove(path)
+        except OSError:
+            # 이미 없음, 또는 (Windows) 다른 세션이 내려받는 중
+            pass
+
+
+def _build_export(kind: str, result: dict, path: str):
+    """ZIP은 임시 파일에서 청크 단위로 복사 - 결과 전체를 bytes로 만들지 않음"""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=EXPORT_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if kind == "zip":
+                with make_zip(result) as zip_file:
+                    shutil.copyfileobj(zip_file, f, 1024 * 1024)
+            else:
+                f.write(make_pdf(result))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    _prune_exports()
+
+
+def open_export(kind: str, revision: str, result: dict):
+    """
+    내보내기 파일을 열어 반환 (다 쓴 뒤 close) - 없으면 만들고, 연 뒤에는 정리돼도 끝까지 읽힘
+
+    같은 revision이면 같은 결과이므로 다시 만들지 않는다.
+    """
+    path = _export_path(kind, revision)
+    for _ in range(2):
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            # 없거나, 확인과 열기 사이에 다른 세션이 정리함
+            _build_export(kind, result, path)
+            continue
+        os.utime(path)
+        return f
+    return open(path, "rb")
 
 
 # =========================
 # Streamlit 버튼
 # =========================
 def render_download_buttons(result: dict):
+    """
+    다운로드를 요청했을 때만 ZIP/PDF 생성 (rerun마다 만들지 않음)
+
+    결과 내용이 같으면 디스크에 만들어 둔 파일을 바로 내려받고, 결과가 바뀌면 revision이 달라져 다시 만든다.
+    """
     if not isinstance(result, dict):
         st.warning("다운로드할 데이터가 없습니다.")
         return
 
     st.markdown("## ⬇️ 결과 다운로드")
 
-    zip_bytes = make_zip(result)
-    st.download_button(
-        "📦 ZIP 다운로드 (전체 데이터)",
-        zip_bytes,
-        file_name="performance_result.zip",
-        mime="application/zip",
-        use_container_width=True
-    )
-
-    try:
-        pdf_bytes = make_pdf(result)
-        st.download_button(
-            "📄 PDF 다운로드 (한글 완벽)",
-            pdf_bytes,
-            file_name="performance_result.pdf",
-            mime="application/pdf",
-            use_container_width=True
-        )
-    except Exception as e:
-        st.error("PDF 생성 실패")
-        st.code(str(e))
+    revision = result_revision(result)
+    # 세션에는 현재 결과의 요청 상태만 (결과가 바뀌면 이전 것은 버림)
+    state = st.session_state.get("export_requested")
+    if not state or state["revision"] != revision:
+        state = st.session_state["export_requested"] = {"revision": revision, "kinds": set()}
+    requested = state["kinds"]
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        if "zip" not in requested and st.button("📦 ZIP 만들기 (전체 데이터)", use_container_width=True):
+            requested.add("zip")
+        if "zip" in requested:
+            with open_export("zip", revision, result) as zip_file:
+                st.download_button(
+                    "📦 ZIP 다운로드 (전체 데이터)",
+                    zip_file,
+                    file_name="performance_result.zip",
+                    mime="application/zip",
+                    use_container_width=True
+                )
+
+    with col2:
+        if "pdf" not in requested and st.button("📄 PDF 만들기 (한글 완벽)", use_container_width=True):
+            requested.add("pdf")
+        if "pdf" in requested:
+            try:
+                with st.spinner("PDF를 생성하고 있습니다..."):
+                    pdf_file = open_export("pdf", revision, result)
+                with pdf_file:
+                    st.download_button(
+                        "📄 PDF 다운로드 (한글 완벽)",
+                        pdf_file,
+                        file_name="performance_result.pdf",
+                        mime="application/pdf",
+                        use_container_width=True
+                    )
+            except Exception as e:
+                requested.discard("pdf")
+                st.error("PDF 생성 실패")
+                st.code(str(e))
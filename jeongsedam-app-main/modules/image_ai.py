@@ -6,10 +6,8 @@ from typing import Dict, Any, List
 
 import streamlit as st
 from PIL import Image
-from openai import OpenAI
 
-# OpenAI client
-client = OpenAI()
+from modules.openai_client import generate_image
 
 
 # ---------------------------
@@ -47,7 +45,7 @@ def _prompt_from_result(r: Dict[str, Any]) -> str:
 # 이미지 생성 (핵심)
 # ---------------------------
 def _gen_images(prompt: str, n: int = 2, size: str = "1024x1024") -> List[Image.Image]:
-    res = client.images.generate(
+    res = generate_image(
         model="gpt-image-1",
         prompt=prompt,
         size=size,
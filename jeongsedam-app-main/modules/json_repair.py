@@ -0,0 +1,191 @@
+import re
+import json
+import time
+import threading
+from typing import Optional, Any, Tuple, List, Dict
+
+# 문자열 밖에서 JSON 구분자로 쓰인 스마트 따옴표
+_SMART_QUOTES = "“”„‟"
+# ```json / ``` 펜스 (줄 중간에 있어도 제거)
+_FENCE_RE = re.compile(r"```[a-zA-Z]*")
+# 잘린 출력 복구 시 되돌아가며 시도할 최대 후보 수
+MAX_REPAIR_CANDIDATES = 64
+
+
+class RepairStats:
+    """파싱 결과 집계 (프로세스 단위) - 정상 파싱 / 로컬 복구 성공 / 복구 실패"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clean = 0
+        self.repaired = 0
+        self.failed = 0
+        self.repair_seconds = 0.0
+
+    def record(self, outcome: str, seconds: float = 0.0):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self.repair_seconds += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempted = self.repaired + self.failed
+            return {
+                "clean": self.clean,
+                "repaired": self.repaired,
+                "failed": self.failed,
+                "repair_success_rate": self.repaired / attempted if attempted else 0.0,
+                "repair_seconds": self.repair_seconds,
+            }
+
+
+repair_stats = RepairStats()
+
+
+def _strip_trailing_comma(out: List[str]):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def _closers(stack: List[str]) -> str:
+    return "".join("}" if opener == "{" else "]" for opener in reversed(stack))
+
+
+def _scan(text: str, start: int) -> Tuple[List[str], bool]:
+    """
+    start 위치의 '{' 또는 '['부터 한 번 훑으며 정리한 JSON 후보 문자열 목록과 잘림 여부 반환
+
+    - 문자열 밖의 펜스/스마트 따옴표/닫는 괄호 앞 쉼표 정리
+    - 최상위 값이 닫히면 뒤따르는 설명 문장은 버림
+    - 중간에 끊긴 경우(토큰 한도) 열린 문자열/괄호를 닫은 후보를 먼저,
+      그 다음 마지막 완성 지점(쉼표/여는 괄호)까지 잘라낸 후보를 최근 것부터 반환 (잘림 True)
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    # (출력 길이, 그 시점의 괄호 스택) - 잘린 출력에서 되돌아갈 수 있는 지점
+    cut_points: List[Tuple[int, List[str]]] = []
+    in_string = False
+    closes_with = '"'
+    escape = False
+    i = start
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+                out.append(ch)
+            elif ch == "\\":
+                escape = True
+                out.append(ch)
+            elif ch in closes_with:
+                in_string = False
+                out.append('"')
+            elif ch == '"':
+                # 스마트 따옴표로 열린 문자열 안의 일반 따옴표
+                out.append('\\"')
+            else:
+                out.append(ch)
+        elif ch == "`":
+            fence = _FENCE_RE.match(text, i)
+            if fence:
+                i = fence.end()
+                continue
+            i += 1
+            continue
+        elif ch == '"' or ch in _SMART_QUOTES:
+            in_string = True
+            closes_with = '"' if ch == '"' else _SMART_QUOTES
+            out.append('"')
+        elif ch in "{[":
+            stack.append(ch)
+            out.append(ch)
+            cut_points.append((len(out), list(stack)))
+        elif ch in "}]":
+            expected = "{" if ch == "}" else "["
+            if stack and stack[-1] == expected:
+                _strip_trailing_comma(out)
+                stack.pop()
+                out.append(ch)
+                if not stack:
+                    return ["".join(out)], False
+        elif ch == ",":
+            cut_points.append((len(out), list(stack)))
+            out.append(ch)
+        else:
+            out.append(ch)
+        i += 1
+
+    # 잘린 출력: 열린 문자열/괄호를 닫은 후보
+    candidates = []
+    tail = list(out)
+    if in_string:
+        if escape:
+            tail.pop()
+        tail.append('"')
+    _strip_trailing_comma(tail)
+    candidates.append("".join(tail) + _closers(stack))
+    # 끊긴 키/숫자 등은 마지막 완성 지점까지 되돌려서 닫기
+    for length, snapshot in reversed(cut_points[-MAX_REPAIR_CANDIDATES:]):
+        head = out[:length]
+        _strip_trailing_comma(head)
+        candidates.append("".join(head) + _closers(snapshot))
+    return candidates, True
+
+
+def _repair(text: str) -> Tuple[Optional[Any], bool]:
+    if not text:
+        return None, False
+    starts = sorted(pos for pos in (text.find("{"), text.find("[")) if pos >= 0)
+    for start in starts:
+        candidates, truncated = _scan(text, start)
+        for candidate in candidates:
+            try:
+                return json.loads(candidate, strict=False), truncated
+            except ValueError:
+                continue
+    return None, False
+
+
+def repair_json(text: str) -> Optional[Any]:
+    """손상된 JSON 텍스트를 로컬에서 복구해 파싱 (실패 시 None)"""
+    return _repair(text)[0]
+
+
+def loads_tolerant(text: str) -> Tuple[Optional[Any], bool]:
+    """
+    엄격 파싱 → 실패 시 로컬 복구 순으로 시도
+
+    Returns:
+        (파싱 결과 또는 None, 복구 여부)
+    """
+    data, repaired, _ = loads_checked(text)
+    return data, repaired
+
+
+def loads_checked(text: str) -> Tuple[Optional[Any], bool, bool]:
+    """
+    loads_tolerant와 같되 잘림 여부도 반환
+
+    잘림은 최상위 값이 닫히기 전에 텍스트가 끝나 열린 문자열/괄호를 닫아야 했던 경우
+    (토큰 한도) - 펜스/뒤따르는 설명/후행 쉼표/스마트 따옴표만 정리한 경우는 False.
+
+    Returns:
+        (파싱 결과 또는 None, 복구 여부, 잘림 여부)
+    """
+    stripped = (text or "").strip()
+    if stripped.startswith("```"):
+        stripped = stripped.replace("```json", "").replace("```", "").strip()
+    try:
+        data = json.loads(stripped)
+        repair_stats.record("clean")
+        return data, False, False
+    except ValueError:
+        pass
+
+    started = time.perf_counter()
+    data, truncated = _repair(stripped)
+    repair_stats.record("repaired" if data is not None else "failed", time.perf_counter() - started)
+    return data, data is not None, truncated
@@ -1,236 +1,576 @@
 import os
 import json
-from typing import Dict, Any, Optional, Tuple
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Optional, Tuple, List, Iterator
 
-api_key = os.environ.get("OPENAI_API_KEY")
-if not api_key:
-    raise ValueError("OPENAI_API_KEY environment variable is not set")
+from modules.cache import ResponseCache, make_cache_key, CACHE_DIR
+from modules.json_repair import loads_tolerant, loads_checked
+from modules.openai_client import chat_completion
 
-client = OpenAI(api_key=api_key)
+# 동일 입력(프롬프트/모델/샘플링 파라미터) 분석 결과 캐시 - 재생성/새로고침 시 API 재호출 방지
+analysis_cache = ResponseCache(os.path.join(CACHE_DIR, "ai_responses.db"))
 
 def parse_json_response(text: str) -> Optional[Dict]:
-    text = text.strip()
-    if text.startswith("```"):
-        text = text.replace("```json", "").replace("```", "").strip()
-    try:
-        return json.loads(text)
-    except:
-        return None
-
-def generate_policy_analysis(
-    title: str,
-    category: str,
-    target_audience: str,
-    description: str,
-    keywords: str = "",
-    constraints: str = "",
-    model: str = "gpt-4o"
-) -> Tuple[Optional[Dict], str]:
+    """
+    JSON 파싱 (실패 시 잘림/후행 쉼표/앞뒤 설명/스마트 따옴표/펜스를 로컬에서 복구)
     
-    prompt = f"""
-당신은 정세담 정책 자동화 시스템의 AI입니다.
-정책의 기획부터 실행, 홍보, 성과관리까지 전체 프로세스를 설계합니다.
-
-[입력 정보]
-정책 제목: {title}
-정책 카테고리: {category}
-대상: {target_audience}
-정책 설명: {description}
-강조 키워드: {keywords}
-제약 조건: {constraints}
-
-[출력 규칙]
-- 반드시 JSON 형식으로만 출력
-- 한국 현실에 맞는 실행 가능한 내용
-- 과장 금지, 측정 가능한 지표 사용
-- 대상에 맞는 톤과 메시지
-
-[JSON 스키마]
-{{
-  "policy_planning": {{
+    복구 성공/실패 횟수는 modules.json_repair.repair_stats에 집계
+    """
+    data, _ = loads_tolerant(text or "")
+    return data if isinstance(data, dict) else None
+
+def _parse_analysis_response(text: str) -> Optional[Dict]:
+    """
+    분석/섹션 응답 파싱 - 출력이 잘려 있었으면 마지막 섹션을 버림
+
+    잘린 출력은 열린 괄호를 닫아 복구되므로 마지막 섹션이 중간에 끊긴 채 완성된 것처럼 보인다.
+    버린 섹션은 _missing_sections에 잡혀 섹션 단위로 다시 요청되고, 잘린 내용이 캐시되지 않음.
+    펜스/설명 문장/후행 쉼표/스마트 따옴표만 정리한 응답은 그대로 사용.
+    """
+    data, _, truncated = loads_checked(text or "")
+    if not isinstance(data, dict):
+        return None
+    if truncated and data:
+        data.pop(next(reversed(data)))
+    return data
+
+ANALYSIS_SAMPLING = {"temperature": 0.7, "max_tokens": 4000}
+
+# 분석 JSON 최상위 섹션 (출력 순서 = 화면 표시 순서)
+ANALYSIS_SECTION_LABELS = {
+    "policy_planning": "📋 정책 기획",
+    "execution_plan": "⚙️ 실행 계획",
+    "communication_strategy": "📣 커뮤니케이션 전략",
+    "content_briefs": "🎨 콘텐츠 제작 브리프",
+    "marketing_materials": "📝 마케팅 자료",
+    "performance_metrics": "📈 성과 지표 (KPI)",
+    "stakeholder_management": "🤝 이해관계자 관리",
+}
+
+# 섹션별 JSON 스키마 - 전체 프롬프트와 섹션 단위 병렬 프롬프트가 같은 정의를 공유
+ANALYSIS_SECTION_SCHEMAS = {
+    "policy_planning": """\
+  "policy_planning": {
     "objective": "정책 목표 (3-5문장)",
     "target_analysis": "대상 분석 (니즈, 특성, 접근법 3-5문장)",
     "key_strategies": ["핵심 전략 5-8개"],
     "expected_outcomes": ["기대 효과 5-7개"],
-    "timeline": {{
+    "timeline": {
       "preparation": "준비 단계 내용",
       "pilot": "시범 운영 내용",
       "expansion": "확대 적용 내용"
-    }}
-  }},
-  
-  "execution_plan": {{
+    }
+  }""",
+    "execution_plan": """\
+  "execution_plan": {
     "action_items": [
-      {{
+      {
         "phase": "단계명",
         "action": "실행 내용",
         "responsible": "담당 주체",
         "timeline": "소요 기간"
-      }}
+      }
     ],
-    "resources_needed": {{
+    "resources_needed": {
       "budget_range": "예산 범위 (구체적 금액 대신 범주)",
       "personnel": "필요 인력",
       "infrastructure": "필요 인프라"
-    }},
+    },
     "risk_management": [
-      {{
+      {
         "risk": "리스크 항목",
         "impact": "영향도",
         "mitigation": "완화 방안"
-      }}
+      }
     ]
-  }},
-  
-  "communication_strategy": {{
+  }""",
+    "communication_strategy": """\
+  "communication_strategy": {
     "key_messages": ["핵심 메시지 5-8개"],
     "channels": [
-      {{
+      {
         "channel": "채널명",
         "content_type": "콘텐츠 형식",
         "frequency": "발행 주기"
-      }}
+      }
     ],
-    "target_specific_messages": {{
+    "target_specific_messages": {
       "citizens": "시민 대상 메시지",
       "youth": "청년 대상 메시지",
       "elderly": "노인 대상 메시지",
       "parents": "학부모 대상 메시지"
-    }}
-  }},
-  
-  "content_briefs": {{
-    "image_brief_1": {{
+    }
+  }""",
+    "content_briefs": """\
+  "content_briefs": {
+    "image_brief_1": {
       "concept": "이미지 컨셉 (5-7문장)",
       "scene_description": "장면 상세 묘사 (10-15문장)",
       "visual_style": "비주얼 스타일 (촬영 기법, 조명, 색감)",
       "key_message": "전달할 핵심 메시지"
-    }},
-    "image_brief_2": {{
+    },
+    "image_brief_2": {
       "concept": "이미지 컨셉 (5-7문장)",
       "scene_description": "장면 상세 묘사 (10-15문장)",
       "visual_style": "비주얼 스타일 (촬영 기법, 조명, 색감)",
       "key_message": "전달할 핵심 메시지"
-    }},
-    "video_brief": {{
+    },
+    "video_brief": {
       "duration": "영상 길이",
       "narrative_arc": "스토리 구조 (5-8문장)",
       "scenes": [
-        {{
+        {
           "timestamp": "시간대",
           "scene": "장면 내용",
           "visuals": "비주얼 요소",
           "audio": "오디오 (내레이션/음악/효과음)",
           "message": "전달 메시지"
-        }}
+        }
       ],
       "style_guide": "영상 스타일 가이드",
       "call_to_action": "행동 유도 문구"
-    }}
-  }},
-  
-  "marketing_materials": {{
+    }
+  }""",
+    "marketing_materials": """\
+  "marketing_materials": {
     "slogan": "슬로건 (20-30자)",
     "tagline": "태그라인 (40-60자)",
     "elevator_pitch": "엘리베이터 피치 (150-200자)",
     "press_release": "보도자료 형식 (300-500자)",
     "social_media_posts": [
-      {{
+      {
         "platform": "플랫폼",
         "content": "게시물 내용",
         "hashtags": ["해시태그"]
-      }}
+      }
     ],
     "faq": [
-      {{
+      {
         "question": "자주 묻는 질문",
         "answer": "답변"
-      }}
+      }
     ]
-  }},
-  
-  "performance_metrics": {{
+  }""",
+    "performance_metrics": """\
+  "performance_metrics": {
     "kpi_framework": [
-      {{
+      {
         "category": "지표 카테고리",
         "metric": "측정 항목",
         "measurement_method": "측정 방법",
         "target_range": "목표 범위 (구간/추이)",
         "data_source": "데이터 출처"
-      }}
+      }
     ],
     "success_criteria": ["성공 기준 5-7개"],
-    "monitoring_plan": {{
+    "monitoring_plan": {
       "daily": "일간 모니터링 항목",
       "weekly": "주간 모니터링 항목",
       "monthly": "월간 모니터링 항목"
-    }},
+    },
     "improvement_triggers": ["개선이 필요한 시점을 알리는 지표 5-7개"]
-  }},
-  
-  "stakeholder_management": {{
+  }""",
+    "stakeholder_management": """\
+  "stakeholder_management": {
     "stakeholders": [
-      {{
+      {
         "group": "이해관계자 그룹",
         "interests": "관심사",
         "engagement_strategy": "소통 전략"
-      }}
+      }
     ],
     "objection_handling": [
-      {{
+      {
         "objection": "예상 반대 의견",
         "response": "대응 논리"
-      }}
+      }
     ]
-  }}
+  }""",
+}
+
+def _build_analysis_messages(
+    title: str,
+    category: str,
+    target_audience: str,
+    description: str,
+    keywords: str = "",
+    constraints: str = "",
+    sections: Optional[List[str]] = None
+) -> List[Dict[str, str]]:
+    """
+    분석 요청 메시지 구성 (공통 컨텍스트 헤더 + 요청 섹션의 스키마)
+    
+    sections=None이면 7개 섹션 전체
+    """
+    schema = ",\n  \n".join(ANALYSIS_SECTION_SCHEMAS[key] for key in (sections or ANALYSIS_SECTION_SCHEMAS))
+    
+    prompt = f"""
+당신은 정세담 정책 자동화 시스템의 AI입니다.
+정책의 기획부터 실행, 홍보, 성과관리까지 전체 프로세스를 설계합니다.
+
+[입력 정보]
+정책 제목: {title}
+정책 카테고리: {category}
+대상: {target_audience}
+정책 설명: {description}
+강조 키워드: {keywords}
+제약 조건: {constraints}
+
+[출력 규칙]
+- 반드시 JSON 형식으로만 출력
+- 한국 현실에 맞는 실행 가능한 내용
+- 과장 금지, 측정 가능한 지표 사용
+- 대상에 맞는 톤과 메시지
+
+[JSON 스키마]
+{{
+{schema}
 }}
 
 위 스키마를 정확히 따라 JSON만 출력하세요.
 """
+    
+    return [
+        {"role": "system", "content": "당신은 정책 전문가입니다. 항상 JSON 형식으로만 응답합니다."},
+        {"role": "user", "content": prompt}
+    ]
 
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "당신은 정책 전문가입니다. 항상 JSON 형식으로만 응답합니다."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=4000
-        )
-        
-        raw_text = response.choices[0].message.content
-        parsed_data = parse_json_response(raw_text)
-        
-        if parsed_data:
-            return parsed_data, raw_text
-        
-        retry_prompt = f"""
+def _retry_as_json(raw_text: str, model: str) -> Tuple[Optional[Dict], str]:
+    """JSON 파싱에 실패한 출력을 모델에 다시 보내 JSON으로 재출력"""
+    retry_prompt = f"""
 이전 응답이 올바른 JSON 형식이 아닙니다.
 아래 내용을 완벽한 JSON으로 다시 출력해주세요.
 
 {raw_text}
 """
-        
-        retry_response = client.chat.completions.create(
+    
+    retry_response = chat_completion(
+        model=model,
+        messages=[
+            {"role": "system", "content": "JSON 형식으로만 응답합니다."},
+            {"role": "user", "content": retry_prompt}
+        ],
+        temperature=0.3,
+        max_tokens=4000
+    )
+    
+    retry_text = retry_response.choices[0].message.content
+    return _parse_analysis_response(retry_text), retry_text
+
+def generate_policy_analysis(
+    title: str,
+    category: str,
+    target_audience: str,
+    description: str,
+    keywords: str = "",
+    constraints: str = "",
+    model: str = "gpt-4o",
+    use_cache: bool = True
+) -> Tuple[Optional[Dict], str]:
+    """
+    정책 전체 분석 생성
+    
+    use_cache=False면 캐시를 건너뛰고 새로 생성 (결과는 캐시에 덮어씀)
+    """
+    messages = _build_analysis_messages(title, category, target_audience, description, keywords, constraints)
+    cache_key = make_cache_key(model=model, messages=messages, **ANALYSIS_SAMPLING)
+    
+    if use_cache:
+        cached = analysis_cache.get_json(cache_key)
+        if cached:
+            return cached["parsed"], cached["raw"]
+
+    try:
+        response = chat_completion(
             model=model,
-            messages=[
-                {"role": "system", "content": "JSON 형식으로만 응답합니다."},
-                {"role": "user", "content": retry_prompt}
-            ],
-            temperature=0.3,
-            max_tokens=4000
+            messages=messages,
+            **ANALYSIS_SAMPLING
         )
         
-        retry_text = retry_response.choices[0].message.content
-        retry_parsed = parse_json_response(retry_text)
+        raw_text = response.choices[0].message.content
+        parsed_data = _parse_analysis_response(raw_text)
+        
+        if parsed_data is None:
+            # 로컬 복구도 실패한 경우에만 모델에 재출력 요청
+            parsed_data, raw_text = _retry_as_json(raw_text, model)
+            if parsed_data is None:
+                return None, raw_text
         
-        return retry_parsed, retry_text
+        # 잘린 출력을 복구하면 뒤쪽 섹션이 빠질 수 있음 - 빠진 섹션만 따로 요청
+        inputs = (title, category, target_audience, description, keywords, constraints)
+        for section, data in _iter_sections(inputs, _missing_sections(parsed_data), model, use_cache):
+            if data is None:
+                return None, f"Error: '{section}' 섹션 생성 실패"
+            parsed_data[section] = data
+        
+        analysis_cache.set_json(cache_key, {"parsed": parsed_data, "raw": raw_text})
+        return parsed_data, raw_text
         
     except Exception as e:
         return None, f"Error: {str(e)}"
 
+class JsonSectionScanner:
+    """
+    스트리밍되는 JSON 텍스트에서 최상위 객체의 각 키/값을 닫히는 즉시 꺼내는 점진 파서
+    
+    문자열/이스케이프/중첩 깊이만 추적하므로 청크가 어디서 잘려도 동작하고,
+    각 텍스트는 한 번씩만 훑는다. 최상위 '{' 앞의 코드펜스나 설명 문장은 무시.
+    """
+    
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+    
+    def _emit(self, end: int, out: List[Tuple[str, Any]]):
+        try:
+            value = json.loads(self.text[self._value_start:end])
+        except ValueError:
+            value = None
+        else:
+            out.append((self._key, value))
+        self._value_start = None
+    
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """청크를 추가하고 이번에 완성된 (키, 값) 목록 반환"""
+        self.text += chunk
+        text = self.text
+        out: List[Tuple[str, Any]] = []
+        i = self._pos
+        while i < len(text):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect_key:
+                        self._key = json.loads(text[self._string_start:i + 1])
+                        self._expect_key = False
+            elif self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._expect_key = True
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 1 and self._value_start is not None:
+                    self._emit(i, out)
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    self._emit(i + 1, out)
+            elif self._depth == 1:
+                if ch == ":":
+                    self._value_start = i + 1
+                elif ch == ",":
+                    if self._value_start is not None:
+                        self._emit(i, out)
+                    self._expect_key = True
+            i += 1
+        self._pos = i
+        return out
+
+def stream_policy_analysis(
+    title: str,
+    category: str,
+    target_audience: str,
+    description: str,
+    keywords: str = "",
+    constraints: str = "",
+    model: str = "gpt-4o",
+    use_cache: bool = True
+) -> Iterator[Tuple[str, Any]]:
+    """
+    정책 분석을 스트리밍으로 생성하며 최상위 섹션이 완성될 때마다 (섹션 키, 섹션 데이터) 반환
+    
+    전체 응답이 JSON으로 파싱되지 않으면(잘림 등) 재요청 결과에서 아직 보내지 않은 섹션만 이어서 반환.
+    결과 dict는 dict(stream_policy_analysis(...))로 얻을 수 있고, 완성된 결과는 캐시에 저장.
+    """
+    messages = _build_analysis_messages(title, category, target_audience, description, keywords, constraints)
+    cache_key = make_cache_key(model=model, messages=messages, **ANALYSIS_SAMPLING)
+    
+    if use_cache:
+        cached = analysis_cache.get_json(cache_key)
+        if cached:
+            yield from cached["parsed"].items()
+            return
+    
+    stream = chat_completion(
+        model=model,
+        messages=messages,
+        stream=True,
+        **ANALYSIS_SAMPLING
+    )
+    
+    scanner = JsonSectionScanner()
+    emitted: Dict[str, Any] = {}
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        for key, value in scanner.feed(delta):
+            emitted[key] = value
+            yield key, value
+    
+    raw_text = scanner.text
+    parsed_data = _parse_analysis_response(raw_text)
+    if parsed_data is None:
+        parsed_data, raw_text = _retry_as_json(raw_text, model)
+        if parsed_data is None:
+            # 아직 보내지 않은 섹션은 실패로 알려 호출 쪽이 일부만 저장하지 않도록
+            for section in ANALYSIS_SECTION_SCHEMAS:
+                if section not in emitted:
+                    yield section, None
+            return
+    # 스트리밍 중 닫힌 섹션은 완성본 - 복구 과정에서 버려졌어도 다시 요청하지 않음
+    parsed_data.update(emitted)
+    for key, value in parsed_data.items():
+        if key not in emitted:
+            yield key, value
+    
+    inputs = (title, category, target_audience, description, keywords, constraints)
+    complete = True
+    for section, data in _iter_sections(inputs, _missing_sections(parsed_data), model, use_cache):
+        complete = complete and data is not None
+        if data is not None:
+            parsed_data[section] = data
+        yield section, data
+    
+    if complete:
+        analysis_cache.set_json(cache_key, {"parsed": parsed_data, "raw": raw_text})
+
+ANALYSIS_MAX_WORKERS = 4
+SECTION_MAX_ATTEMPTS = 3
+
+def _generate_section(
+    section: str,
+    messages: List[Dict[str, str]],
+    model: str,
+    use_cache: bool
+) -> Tuple[Any, str]:
+    """
+    단일 섹션 생성 (섹션 단위 캐시 + 재시도)
+    
+    JSON이 깨졌거나 섹션 키가 없으면 같은 요청을 최대 SECTION_MAX_ATTEMPTS회까지 다시 보낸다.
+    """
+    cache_key = make_cache_key(model=model, messages=messages, **ANALYSIS_SAMPLING)
+    if use_cache:
+        cached = analysis_cache.get_json(cache_key)
+        if cached:
+            return cached["parsed"][section], cached["raw"]
+    
+    last_error = ""
+    for attempt in range(SECTION_MAX_ATTEMPTS):
+        try:
+            response = chat_completion(
+                model=model,
+                messages=messages,
+                **ANALYSIS_SAMPLING
+            )
+        except Exception as e:
+            last_error = f"Error: {str(e)}"
+            continue
+        
+        raw_text = response.choices[0].message.content
+        parsed_data = _parse_analysis_response(raw_text)
+        if parsed_data and section in parsed_data:
+            analysis_cache.set_json(cache_key, {"parsed": parsed_data, "raw": raw_text})
+            return parsed_data[section], raw_text
+        last_error = f"Error: '{section}' 섹션 JSON 파싱 실패"
+    
+    raise RuntimeError(last_error)
+
+def _missing_sections(parsed: Dict) -> List[str]:
+    return [section for section in ANALYSIS_SECTION_SCHEMAS if section not in parsed]
+
+def _iter_sections(
+    inputs: Tuple[str, ...],
+    sections: List[str],
+    model: str,
+    use_cache: bool,
+    max_workers: int = ANALYSIS_MAX_WORKERS
+) -> Iterator[Tuple[str, Any]]:
+    """섹션별 요청을 동시에 보내고 완료 순서대로 (섹션 키, 데이터 또는 None) 반환"""
+    if not sections:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(sections))) as executor:
+        futures = {
+            executor.submit(
+                _generate_section,
+                section,
+                _build_analysis_messages(*inputs, sections=[section]),
+                model,
+                use_cache
+            ): section
+            for section in sections
+        }
+        for future in as_completed(futures):
+            try:
+                data, _ = future.result()
+            except Exception:
+                data = None
+            yield futures[future], data
+
+def iter_policy_analysis_sections(
+    title: str,
+    category: str,
+    target_audience: str,
+    description: str,
+    keywords: str = "",
+    constraints: str = "",
+    model: str = "gpt-4o",
+    use_cache: bool = True,
+    max_workers: int = ANALYSIS_MAX_WORKERS
+) -> Iterator[Tuple[str, Any]]:
+    """
+    7개 섹션을 섹션별 프롬프트(공통 컨텍스트 헤더 공유)로 나눠 동시에 요청하고,
+    완료되는 순서대로 (섹션 키, 섹션 데이터) 반환
+    
+    동시 요청 수는 max_workers로 제한. 실패한 섹션은 (섹션 키, None)으로 반환.
+    """
+    inputs = (title, category, target_audience, description, keywords, constraints)
+    yield from _iter_sections(inputs, list(ANALYSIS_SECTION_SCHEMAS), model, use_cache, max_workers)
+
+def generate_policy_analysis_parallel(
+    title: str,
+    category: str,
+    target_audience: str,
+    description: str,
+    keywords: str = "",
+    constraints: str = "",
+    model: str = "gpt-4o",
+    use_cache: bool = True,
+    max_workers: int = ANALYSIS_MAX_WORKERS
+) -> Tuple[Optional[Dict], str]:
+    """
+    섹션 병렬 분석 (generate_policy_analysis와 같은 반환 형태)
+    
+    전체 소요 시간은 섹션 합이 아니라 가장 느린 섹션 기준. 한 섹션이라도 실패하면 None.
+    """
+    results = dict(iter_policy_analysis_sections(
+        title, category, target_audience, description, keywords, constraints,
+        model=model, use_cache=use_cache, max_workers=max_workers
+    ))
+    failed = [section for section, data in results.items() if data is None]
+    if failed:
+        return None, f"Error: 섹션 생성 실패 ({', '.join(failed)})"
+    
+    analysis = {section: results[section] for section in ANALYSIS_SECTION_SCHEMAS}
+    return analysis, json.dumps(analysis, ensure_ascii=False)
+
 def generate_image_prompt(brief: Dict[str, Any], style_override: str = "") -> str:
     concept = brief.get("concept", "")
     scene = brief.get("scene_description", "")
@@ -0,0 +1,233 @@
+"""
+여러 정책을 ZIP 하나로 내보내기 (기간/월/ID 목록)
+
+    python -m modules.bulk_export --month 2025-01 --pdf
+    python -m modules.bulk_export --start 2025-01-01 --end 2025-03-31 -o q1.zip
+    python -m modules.bulk_export --ids 3,7,12
+
+정책은 iter_policies 커서로 페이지 단위로 읽고, 콘텐츠/이미지는 정책 하나씩 ZIP에 바로
+기록하므로 정책 수와 관계없이 메모리 사용량이 일정하다 (이미지는 파일 저장소에서 청크 단위 복사).
+--pdf를 주면 정책 폴더마다 보고서 PDF(report.pdf)를 함께 넣는다 - 정책마다 따로 렌더링해 바로
+ZIP에 쓰므로 PDF도 한 번에 한 정책분만 메모리에 둔다 (여러 정책을 PDF 하나로 묶으면 ReportLab이
+save 전까지 모든 페이지를 들고 있어 정책 수에 비례해 커짐).
+
+작업 큐가 만드는 결과 파일(BULK_EXPORT_DIR/bulk_*.zip)은 prune_bulk_exports()가
+BULK_EXPORT_MAX_AGE보다 오래된 것부터 지운다 (CLI의 -o 출력은 지우지 않음).
+"""
+import os
+import re
+import sys
+import glob
+import json
+import time
+import argparse
+import tempfile
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from modules import database
+from modules.image_variants import mime_extension
+from modules.pdf_renderer import get_renderer
+from modules.zip_stream import ZipEntry, write_zip, spool_zip
+
+BULK_EXPORT_DIR = "data/exports"
+# 작업 큐 결과(bulk_*.zip)와 남은 임시 파일을 보관하는 시간 (초)
+BULK_EXPORT_MAX_AGE = 24 * 3600
+# 보고서 PDF에 넣는 정책당 이미지 수 / 사용할 파생본 (원본보다 훨씬 작음)
+PDF_IMAGES_PER_POLICY = 2
+PDF_IMAGE_VARIANT = "preview"
+
+_UNSAFE_CHARS = re.compile(r"[^0-9A-Za-z가-힣._-]+")
+
+
+def _safe_name(text: str, limit: int = 40) -> str:
+    return _UNSAFE_CHARS.sub("_", text or "").strip("_")[:limit] or "untitled"
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, indent=2)
+
+
+def _latest_contents(policy_id: int) -> Dict[str, Any]:
+    """content_type별 최신 콘텐츠만 (get_policy_contents는 최신순)"""
+    latest: Dict[str, Any] = {}
+    for content in database.get_policy_contents(policy_id):
+        latest.setdefault(content['content_type'], content['content_data'])
+    return latest
+
+
+def bulk_export_entries(
+    filters: Dict[str, Any],
+    include_media: bool = True,
+    include_pdf: bool = False,
+    progress: Optional[Callable[[int, int, Dict[str, Any]], None]] = None,
+    render_pdf: Optional[Callable[[Dict[str, Any], Dict[str, Any], List[str], List[str]], bytes]] = None
+) -> Iterator[ZipEntry]:
+    """
+    필터(iter_policies와 같은 키: start_date/end_date, year_month, date_str, category, ids)에 맞는
+    정책을 한 건씩 ZIP 항목으로 생성
+
+    정책별 폴더: policies/<id>_<제목>/ 아래 policy_info.json, <content_type>.json, images/,
+    report.pdf(include_pdf). 마지막에 index.json(목록), README.txt
+    render_pdf(policy, analysis, images, video_prompts)는 보고서 렌더링 함수
+    (기본: 이 스레드에서 PdfRenderer.policy_report, 작업 큐는 렌더링 프로세스로 넘김)
+    """
+    if render_pdf is None:
+        render_pdf = get_renderer().policy_report
+    total = database.count_policies(**filters)
+    index_rows = []
+    for done, policy in enumerate(database.iter_policies(**filters), 1):
+        folder = f"policies/{policy['id']:05d}_{_safe_name(policy['title'])}"
+        contents = _latest_contents(policy['id'])
+        media = database.list_generated_media(policy['id'], media_type='image') \
+            if include_media or include_pdf else []
+
+        yield f"{folder}/policy_info.json", _dumps(policy)
+        for content_type, content_data in contents.items():
+            yield f"{folder}/{_safe_name(content_type)}.json", _dumps(content_data)
+        if include_media:
+            for idx, item in enumerate(reversed(media), 1):
+                if item['handle'] is not None:
+                    yield f"{folder}/images/image_{idx}.{mime_extension(item['mime_type'])}", item['handle']
+
+        if include_pdf:
+            pdf_images = [
+                os.path.abspath((item['variants'].get(PDF_IMAGE_VARIANT) or item['handle']).path)
+                for item in reversed(media) if item['handle'] is not None
+            ][:PDF_IMAGES_PER_POLICY]
+            yield f"{folder}/report.pdf", render_pdf(policy, contents.get('analysis') or {}, pdf_images, [])
+
+        index_rows.append({
+            "id": policy['id'],
+            "title": policy['title'],
+            "category": policy['category'],
+            "status": policy['status'],
+            "created_at": policy['created_at'],
+            "folder": folder,
+            "content_types": sorted(contents),
+            "images": len(media),
+        })
+        if progress:
+            progress(done, total, policy)
+
+    yield "index.json", _dumps({"filters": filters, "count": len(index_rows), "policies": index_rows})
+    yield "README.txt", f"""정세담 정책 프로그램 - 일괄 내보내기
+
+생성일시: {datetime.now().isoformat()}
+조건: {json.dumps(filters, ensure_ascii=False)}
+정책 수: {len(index_rows)}
+
+- index.json: 포함된 정책 목록
+- policies/<ID>_<제목>/: 정책 정보, 콘텐츠(JSON), 이미지{", 보고서(report.pdf)" if include_pdf else ""}
+"""
+
+
+def prune_bulk_exports(directory: str = BULK_EXPORT_DIR, max_age: float = BULK_EXPORT_MAX_AGE) -> int:
+    """
+    작업 큐 결과(bulk_*.zip)와 중단된 작업의 임시 파일(*.zip.tmp) 중 max_age초보다 오래된 것 삭제
+
+    삭제한 파일 수 반환. 이미 열린 파일은 (POSIX에서) 내려받기가 끝날 때까지 읽힌다.
+    """
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in glob.glob(os.path.join(directory, "bulk_*.zip")) + glob.glob(os.path.join(directory, "*.zip.tmp")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            # 다른 작업이 먼저 지웠거나 (Windows) 내려받는 중
+            pass
+    return removed
+
+
+def bulk_export_filters(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    month: Optional[str] = None,
+    ids: Optional[List[int]] = None,
+    category: Optional[str] = None
+) -> Dict[str, Any]:
+    """CLI/UI 입력 → iter_policies 필터"""
+    filters: Dict[str, Any] = {}
+    if ids:
+        filters["ids"] = list(ids)
+    if month:
+        filters["year_month"] = month[:7]
+    if start_date or end_date:
+        filters["start_date"] = start_date or "0000-01-01"
+        filters["end_date"] = end_date or "9999-12-31"
+    if category:
+        filters["category"] = category
+    if not filters:
+        raise ValueError("기간(start/end), 월(month), ID 목록 중 하나는 필요합니다")
+    return filters
+
+
+def export_policies(
+    output,
+    filters: Dict[str, Any],
+    include_media: bool = True,
+    include_pdf: bool = False,
+    progress: Optional[Callable[[int, int, Dict[str, Any]], None]] = None,
+    render_pdf: Optional[Callable[..., bytes]] = None
+):
+    """
+    일괄 내보내기 ZIP을 output(경로 또는 쓰기 가능한 파일 객체)에 기록
+
+    경로면 같은 폴더의 임시 파일에 쓴 뒤 이름을 바꿔, 중간에 실패해도 깨진 ZIP이 남지 않음
+    """
+    entries = bulk_export_entries(filters, include_media, include_pdf, progress=progress, render_pdf=render_pdf)
+    if not isinstance(output, (str, os.PathLike)):
+        write_zip(output, entries)
+        return
+    directory = os.path.dirname(os.path.abspath(output))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(suffix=".zip.tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write_zip(f, entries)
+        os.replace(temp_path, output)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def spool_bulk_export(filters: Dict[str, Any], include_media: bool = True, include_pdf: bool = False, progress=None):
+    """UI용: SpooledTemporaryFile(처음 위치)로 반환 (다 쓴 뒤 close)"""
+    return spool_zip(bulk_export_entries(filters, include_media, include_pdf, progress=progress))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="정책 일괄 내보내기 (ZIP)")
+    parser.add_argument("--start", help="시작일 YYYY-MM-DD")
+    parser.add_argument("--end", help="종료일 YYYY-MM-DD")
+    parser.add_argument("--month", help="월 YYYY-MM")
+    parser.add_argument("--ids", help="정책 ID 목록 (쉼표 구분)")
+    parser.add_argument("--category", help="카테고리로 추가 필터")
+    parser.add_argument("--pdf", action="store_true", help="정책별 보고서 PDF 포함")
+    parser.add_argument("--no-media", action="store_true", help="이미지 제외")
+    parser.add_argument("-o", "--output", default=None, help=f"출력 ZIP 경로 (기본: {BULK_EXPORT_DIR}/policies_<조건>.zip)")
+    args = parser.parse_args()
+
+    ids = [int(v) for v in args.ids.split(",") if v.strip()] if args.ids else None
+    try:
+        filters = bulk_export_filters(args.start, args.end, args.month, ids, args.category)
+    except ValueError as e:
+        parser.error(str(e))
+    database.init_database()
+
+    label = args.month or (f"{args.start or ''}_{args.end or ''}" if args.start or args.end else "ids")
+    output = args.output or os.path.join(BULK_EXPORT_DIR, f"policies_{_safe_name(label)}.zip")
+
+    def report(done: int, total: int, policy: Dict[str, Any]):
+        print(f"\r[{done}/{total}] {policy['title'][:40]}", end="", file=sys.stderr, flush=True)
+
+    export_policies(output, filters, include_media=not args.no_media, include_pdf=args.pdf, progress=report)
+    print(file=sys.stderr)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
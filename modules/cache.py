@@ -0,0 +1,310 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import sqlite3
+import tempfile
+import threading
+import unicodedata
+from io import BytesIO
+from typing import Optional, Dict, Any, BinaryIO
+
+CACHE_DIR = "data/cache"
+
+
+def normalize_text(text: str) -> str:
+    """NFC 정규화 + 줄 끝 공백/앞뒤 공백 제거 (의미 없는 공백 차이로 캐시가 갈라지지 않도록)"""
+    text = unicodedata.normalize("NFC", text)
+    return "\n".join(line.rstrip() for line in text.strip().splitlines())
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return normalize_text(value)
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_cache_key(**parts: Any) -> str:
+    """프롬프트/모델/샘플링 파라미터 등을 정규화한 뒤 sha256 해시"""
+    payload = json.dumps(_normalize(parts), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite 기반 영구 응답 캐시
+
+    - ttl_seconds가 지난 항목은 조회 시 삭제 (미스 처리)
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 조회되지 않은 항목부터 삭제 (LRU)
+    - 적중/미스 횟수는 프로세스 단위로 집계
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 7 * 24 * 3600, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed
+                ON cache_entries (accessed_at)
+            """)
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            row = conn.execute(
+                "SELECT value, created_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            conn = self._db()
+            conn.execute("""
+                INSERT INTO cache_entries (key, value, size, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE
+                SET value = excluded.value, size = excluded.size,
+                    created_at = excluded.created_at, accessed_at = excluded.accessed_at
+            """, (key, value, size, now, now))
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute(
+            "SELECT key, size FROM cache_entries ORDER BY accessed_at"
+        ).fetchall():
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def get_json(self, key: str) -> Optional[Any]:
+        value = self.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set_json(self, key: str, value: Any):
+        self.set(key, json.dumps(value, ensure_ascii=False))
+
+    def clear(self):
+        with self._lock:
+            self._db().execute("DELETE FROM cache_entries")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = self._db().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": total,
+        }
+
+
+class FileCache:
+    """
+    파일 기반 바이너리 캐시 (생성 이미지 등 큰 값)
+
+    - 값은 directory/ab/<key> 파일로, 크기/접근 시각 색인은 directory/index.db에 저장
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 조회되지 않은 항목부터 파일째 삭제 (LRU)
+    - 적중/미스 횟수는 프로세스 단위로 집계
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(
+                os.path.join(self.directory, "index.db"), check_same_thread=False, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS file_entries (
+                    key TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_file_entries_accessed
+                ON file_entries (accessed_at)
+            """)
+            self._conn = conn
+        return self._conn
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            conn = self._db()
+            try:
+                with open(self.path(key), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                conn.execute("DELETE FROM file_entries WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            conn.execute("UPDATE file_entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return data
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """
+        적중 시 열린 파일 객체 반환 (다 쓴 뒤 close)
+
+        LRU 정리와 같은 잠금 안에서 열기 때문에 경로를 받은 뒤 여는 사이에 지워질 일이 없고,
+        열어 둔 파일은 그 뒤에 정리되더라도 끝까지 읽을 수 있다.
+        """
+        path = self.path(key)
+        with self._lock:
+            conn = self._db()
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                conn.execute("DELETE FROM file_entries WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            conn.execute("UPDATE file_entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return f
+
+    def get_path(self, key: str) -> Optional[str]:
+        """
+        적중 시 파일 경로만 반환
+
+        경로는 다른 요청의 LRU 정리로 언제든 지워질 수 있으므로, 내용을 읽을 때는 open(key)
+        """
+        path = self.path(key)
+        with self._lock:
+            conn = self._db()
+            if not os.path.exists(path):
+                conn.execute("DELETE FROM file_entries WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            conn.execute("UPDATE file_entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return path
+
+    def set(self, key: str, data: bytes):
+        self.set_stream(key, BytesIO(data))
+
+    def set_stream(self, key: str, fileobj: BinaryIO) -> str:
+        """파일 객체 내용을 청크 단위로 복사해 저장하고 경로 반환"""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                shutil.copyfileobj(fileobj, f, 1024 * 1024)
+                size = f.tell()
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            conn.execute("""
+                INSERT INTO file_entries (key, size, created_at, accessed_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE
+                SET size = excluded.size, created_at = excluded.created_at, accessed_at = excluded.accessed_at
+            """, (key, size, now, now))
+            self._evict(conn)
+        return path
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM file_entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute(
+            "SELECT key, size FROM file_entries ORDER BY accessed_at"
+        ).fetchall():
+            conn.execute("DELETE FROM file_entries WHERE key = ?", (key,))
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                # 이미 없음, 또는 (Windows) 다른 요청이 열어 둔 파일
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            conn = self._db()
+            for (key,) in conn.execute("SELECT key FROM file_entries").fetchall():
+                try:
+                    os.remove(self.path(key))
+                except FileNotFoundError:
+                    pass
+            conn.execute("DELETE FROM file_entries")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = self._db().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM file_entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": total,
+        }
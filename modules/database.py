@@ -1,97 +1,591 @@
+import os
 import sqlite3
 import json
+import threading
+import atexit
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Iterator
 from contextlib import contextmanager
 
+from modules import media_store, image_variants
+
 DB_PATH = "data/policies.db"
 
+# 커넥션 풀 설정
+POOL_MAX_SIZE = 8
+CACHE_SIZE_KB = 16384
+STATEMENT_CACHE_SIZE = 256
+BUSY_TIMEOUT_MS = 5000
+
+
+class ConnectionPool:
+    """
+    SQLite 커넥션 풀
+
+    - 유휴 커넥션을 최대 max_size개까지 재사용 (connect/close 비용 제거)
+    - 같은 스레드 안에서 get_db()가 중첩되면 같은 커넥션을 재사용
+    - WAL 저널 + synchronous=NORMAL 로 읽기/쓰기 동시 진행 및 fsync 최소화
+    - 커넥션마다 prepared statement 캐시(cached_statements)를 유지
+    """
+
+    def __init__(self, db_path: str, max_size: int = POOL_MAX_SIZE):
+        self.db_path = db_path
+        self.max_size = max_size
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def release(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self.acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self.release(conn)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None or _pool.db_path != DB_PATH:
+        with _pool_lock:
+            if _pool is None or _pool.db_path != DB_PATH:
+                if _pool is not None:
+                    _pool.close_all()
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+
+def close_pool():
+    """풀에 남아 있는 유휴 커넥션 모두 닫기 (프로세스 종료/테스트용)"""
+    if _pool is not None:
+        _pool.close_all()
+
+
+atexit.register(close_pool)
+
+
 @contextmanager
 def get_db():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    try:
+    with get_pool().connection() as conn:
         yield conn
-    finally:
-        conn.close()
+
+_migrated_paths = set()
+_migration_lock = threading.Lock()
 
 def init_database():
-    with get_db() as conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS policies (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                category TEXT NOT NULL,
-                target_audience TEXT NOT NULL,
-                description TEXT,
-                status TEXT DEFAULT 'draft',
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-        """)
-        
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS policy_contents (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                policy_id INTEGER NOT NULL,
-                content_type TEXT NOT NULL,
-                content_data TEXT NOT NULL,
-                metadata TEXT,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (policy_id) REFERENCES policies(id)
-            )
-        """)
-        
+    """
+    스키마 마이그레이션 실행 (프로세스당 DB 파일별 1회)
+    
+    Streamlit은 매 rerun마다 이 함수를 호출하므로, 이미 최신이면 아무 쿼리도 하지 않음
+    """
+    if DB_PATH in _migrated_paths:
+        return
+    with _migration_lock:
+        if DB_PATH in _migrated_paths:
+            return
+        with get_db() as conn:
+            run_migrations(conn)
+        _migrated_paths.add(DB_PATH)
+
+def run_migrations(conn: sqlite3.Connection) -> int:
+    """
+    PRAGMA user_version 기준으로 아직 적용되지 않은 MIGRATIONS를 순서대로 적용
+    
+    BEGIN IMMEDIATE로 쓰기 잠금을 잡으므로 여러 프로세스가 동시에 시작해도 한 번만 적용됨.
+    중간에 실패하면 전체 롤백되어 user_version도 그대로 남음.
+    
+    Returns:
+        적용 후 스키마 버전
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        for version, migration in MIGRATIONS:
+            if version <= current:
+                continue
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            current = version
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return current
+
+def _migrate_base_tables(conn: sqlite3.Connection):
+    """v1: 기본 테이블 (구버전 init_database로 이미 만들어진 DB도 그대로 통과)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS policies (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            category TEXT NOT NULL,
+            target_audience TEXT NOT NULL,
+            description TEXT,
+            status TEXT DEFAULT 'draft',
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """)
+    
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS policy_contents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            policy_id INTEGER NOT NULL,
+            content_type TEXT NOT NULL,
+            content_data TEXT NOT NULL,
+            metadata TEXT,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (policy_id) REFERENCES policies(id)
+        )
+    """)
+    
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS policy_performance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            policy_id INTEGER NOT NULL,
+            view_count INTEGER DEFAULT 0,
+            engagement_score REAL DEFAULT 0.0,
+            feedback_data TEXT,
+            metrics_data TEXT,
+            updated_at TEXT NOT NULL,
+            FOREIGN KEY (policy_id) REFERENCES policies(id)
+        )
+    """)
+    
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS generated_media (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            policy_id INTEGER NOT NULL,
+            media_type TEXT NOT NULL,
+            media_url TEXT,
+            media_data BLOB,
+            prompt TEXT,
+            generation_params TEXT,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (policy_id) REFERENCES policies(id)
+        )
+    """)
+
+def _ensure_column(conn: sqlite3.Connection, table: str, column: str, declaration: str):
+    columns = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+def _migrate_policy_dates(conn: sqlite3.Connection):
+    """
+    v2: created_at 파생 컬럼(created_date, created_ym) 추가 + 기존 행 백필 + 인덱스 생성
+    
+    date()/strftime()로 감싼 조건은 인덱스를 못 타므로, 날짜 조회는 이 컬럼으로 범위 검색
+    """
+    _ensure_column(conn, "policies", "created_date", "TEXT")
+    _ensure_column(conn, "policies", "created_ym", "TEXT")
+    conn.execute("""
+        UPDATE policies
+        SET created_date = substr(created_at, 1, 10),
+            created_ym = substr(created_at, 1, 7)
+        WHERE created_date IS NULL
+    """)
+    # 파생 컬럼 없이 INSERT 하는 경로(구버전 앱 등)도 자동으로 채움
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_policies_created_parts
+        AFTER INSERT ON policies
+        WHEN NEW.created_date IS NULL
+        BEGIN
+            UPDATE policies
+            SET created_date = substr(NEW.created_at, 1, 10),
+                created_ym = substr(NEW.created_at, 1, 7)
+            WHERE id = NEW.id;
+        END
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_policies_created_date
+        ON policies (created_date, created_at)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_policies_created_ym
+        ON policies (created_ym, created_at)
+    """)
+
+def _migrate_policy_search(conn: sqlite3.Connection):
+    """
+    v3: 정책 전문 검색용 FTS5 인덱스 (제목/설명/카테고리/분석 JSON)
+    
+    한국어는 공백 단위 토큰화로는 부분 문자열이 검색되지 않으므로 trigram 토크나이저 사용.
+    FTS5/trigram을 지원하지 않는 SQLite에서는 건너뛰고 LIKE 검색으로 동작.
+    """
+    exists = conn.execute("""
+        SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'policies_fts'
+    """).fetchone()
+    if not exists:
+        try:
+            conn.execute("""
+                CREATE VIRTUAL TABLE policies_fts USING fts5(
+                    title, description, category, analysis,
+                    tokenize = 'trigram'
+                )
+            """)
+        except sqlite3.OperationalError:
+            return
         conn.execute("""
-            CREATE TABLE IF NOT EXISTS policy_performance (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                policy_id INTEGER NOT NULL,
-                view_count INTEGER DEFAULT 0,
-                engagement_score REAL DEFAULT 0.0,
-                feedback_data TEXT,
-                metrics_data TEXT,
-                updated_at TEXT NOT NULL,
-                FOREIGN KEY (policy_id) REFERENCES policies(id)
-            )
+            INSERT INTO policies_fts (rowid, title, description, category, analysis)
+            SELECT p.id, p.title, COALESCE(p.description, ''), p.category,
+                   COALESCE((
+                       SELECT c.content_data FROM policy_contents c
+                       WHERE c.policy_id = p.id AND c.content_type = 'analysis'
+                       ORDER BY c.created_at DESC LIMIT 1
+                   ), '')
+            FROM policies p
         """)
-        
+    
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_policies_fts_insert
+        AFTER INSERT ON policies
+        BEGIN
+            INSERT INTO policies_fts (rowid, title, description, category, analysis)
+            VALUES (NEW.id, NEW.title, COALESCE(NEW.description, ''), NEW.category, '');
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_policies_fts_update
+        AFTER UPDATE OF title, description, category ON policies
+        BEGIN
+            UPDATE policies_fts
+            SET title = NEW.title, description = COALESCE(NEW.description, ''), category = NEW.category
+            WHERE rowid = NEW.id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_policies_fts_delete
+        AFTER DELETE ON policies
+        BEGIN
+            DELETE FROM policies_fts WHERE rowid = OLD.id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_policy_contents_fts_analysis
+        AFTER INSERT ON policy_contents
+        WHEN NEW.content_type = 'analysis'
+        BEGIN
+            UPDATE policies_fts SET analysis = NEW.content_data WHERE rowid = NEW.policy_id;
+        END
+    """)
+
+MEDIA_COLUMNS = "id, policy_id, media_type, media_url, content_hash, byte_size, width, height, mime_type, prompt, generation_params, created_at"
+
+def _migrate_media_store(conn: sqlite3.Connection):
+    """
+    v4: generated_media.media_data BLOB → 콘텐츠 주소 파일 저장소(modules/media_store) 이전
+    
+    BLOB은 sqlite3 blob 핸들로 청크 단위 스트리밍하므로 이미지 전체를 메모리에 올리지 않음.
+    파일 저장소에 먼저 쓰고 행을 갱신하므로, 도중에 롤백되어도 남는 것은 중복 제거되는 파일뿐.
+    이전이 끝난 뒤 DB 파일 크기를 줄이려면 vacuum_database() 실행.
+    """
+    _ensure_column(conn, "generated_media", "content_hash", "TEXT")
+    _ensure_column(conn, "generated_media", "byte_size", "INTEGER")
+    _ensure_column(conn, "generated_media", "width", "INTEGER")
+    _ensure_column(conn, "generated_media", "height", "INTEGER")
+    _ensure_column(conn, "generated_media", "mime_type", "TEXT")
+    
+    pending = [row["id"] for row in conn.execute("""
+        SELECT id FROM generated_media WHERE media_data IS NOT NULL
+    """)]
+    for media_id in pending:
+        with conn.blobopen("generated_media", "media_data", media_id, readonly=True) as blob:
+            header = blob.read(64 * 1024)
+            
+            def chunks():
+                yield header
+                while True:
+                    chunk = blob.read(media_store.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+            
+            content_hash, size = media_store.put_stream(chunks())
+        info = media_store.probe_image(header)
         conn.execute("""
-            CREATE TABLE IF NOT EXISTS generated_media (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                policy_id INTEGER NOT NULL,
-                media_type TEXT NOT NULL,
-                media_url TEXT,
-                media_data BLOB,
-                prompt TEXT,
-                generation_params TEXT,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (policy_id) REFERENCES policies(id)
-            )
-        """)
-        
-        conn.commit()
+            UPDATE generated_media
+            SET content_hash = ?, byte_size = ?, width = ?, height = ?, mime_type = ?, media_data = NULL
+            WHERE id = ?
+        """, (content_hash, size, info["width"], info["height"], info["mime_type"], media_id))
+
+def _migrate_listing_index(conn: sqlite3.Connection):
+    """v5: 키셋 페이지네이션용 (created_at, id) 인덱스"""
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_policies_created_at
+        ON policies (created_at, id)
+    """)
+
+def _migrate_policy_id_indexes(conn: sqlite3.Connection):
+    """v6: policy_id 외래키 복합 인덱스 (정책별 콘텐츠/미디어/성과 조회가 테이블 스캔이 되지 않도록)"""
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_policy_contents_policy
+        ON policy_contents (policy_id, content_type, created_at)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_generated_media_policy
+        ON generated_media (policy_id, media_type, created_at)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_policy_performance_policy
+        ON policy_performance (policy_id)
+    """)
+
+def _migrate_performance_unique(conn: sqlite3.Connection):
+    """v7: policy_performance.policy_id UNIQUE (정책당 1행, ON CONFLICT 업서트용)"""
+    conn.execute("""
+        DELETE FROM policy_performance
+        WHERE id NOT IN (SELECT MAX(id) FROM policy_performance GROUP BY policy_id)
+    """)
+    conn.execute("DROP INDEX IF EXISTS idx_policy_performance_policy")
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_policy_performance_policy
+        ON policy_performance (policy_id)
+    """)
+
+def _migrate_media_variants(conn: sqlite3.Connection):
+    """v8: 이미지 파생본(썸네일/미리보기/전체) 테이블 - 원본 content_hash 기준이라 같은 이미지는 한 번만 생성"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS media_variants (
+            content_hash TEXT NOT NULL,
+            variant TEXT NOT NULL,
+            variant_hash TEXT NOT NULL,
+            mime_type TEXT,
+            width INTEGER,
+            height INTEGER,
+            byte_size INTEGER,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (content_hash, variant)
+        )
+    """)
+
+def _migrate_policy_revision(conn: sqlite3.Connection):
+    """v9: policies.revision - 콘텐츠/미디어/상태가 바뀔 때마다 증가 (내보내기 캐시 키)"""
+    _ensure_column(conn, "policies", "revision", "INTEGER NOT NULL DEFAULT 0")
+
+# 스키마 변경은 반드시 여기에 새 버전을 추가하는 방식으로만 한다.
+# 이미 배포된 버전의 함수는 수정하지 말 것 (각 함수는 구버전 DB에서도 안전하도록 멱등하게 작성).
+MIGRATIONS = [
+    (1, _migrate_base_tables),
+    (2, _migrate_policy_dates),
+    (3, _migrate_policy_search),
+    (4, _migrate_media_store),
+    (5, _migrate_listing_index),
+    (6, _migrate_policy_id_indexes),
+    (7, _migrate_performance_unique),
+    (8, _migrate_media_variants),
+    (9, _migrate_policy_revision),
+]
+
+def vacuum_database():
+    """BLOB 이전 등으로 생긴 빈 페이지 회수 (실행 중 다른 쓰기 작업이 없을 때 수동 실행)"""
+    with get_db() as conn:
+        conn.execute("VACUUM")
+
+def _has_search_index(conn: sqlite3.Connection) -> bool:
+    return conn.execute("""
+        SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'policies_fts'
+    """).fetchone() is not None
+
+# 키셋 페이지네이션 커서: 목록은 (created_at, id), 전문 검색은 (rank, id)
+Cursor = Tuple[Any, int]
+
+POLICY_PAGE_SIZE = 200
+
+def next_cursor(rows: List[Dict[str, Any]], limit: Optional[int]) -> Optional[Cursor]:
+    """마지막 페이지가 아니면 다음 페이지 커서 반환"""
+    if not rows or limit is None or len(rows) < limit:
+        return None
+    last = rows[-1]
+    if last.get('rank') is not None:
+        return (last['rank'], last['id'])
+    return (last['created_at'], last['id'])
+
+def _select_policies(
+    conn: sqlite3.Connection,
+    where: str,
+    params: List[Any],
+    limit: Optional[int],
+    cursor: Optional[Cursor]
+) -> List[sqlite3.Row]:
+    """created_at DESC, id DESC 순서의 키셋 페이지 조회 (OFFSET 없음 - 페이지당 비용 일정)"""
+    sql = f"SELECT * FROM policies WHERE {where}"
+    params = list(params)
+    if cursor:
+        sql += " AND (created_at < ? OR (created_at = ? AND id < ?))"
+        params.extend([cursor[0], cursor[0], cursor[1]])
+    sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(limit if limit is not None else -1)
+    return conn.execute(sql, params).fetchall()
+
+def _policy_filter(
+    date_str: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    year_month: Optional[str] = None,
+    category: Optional[str] = None,
+    ids: Optional[List[int]] = None
+) -> Tuple[str, List[Any]]:
+    clauses = []
+    params: List[Any] = []
+    if date_str:
+        clauses.append("created_date = ?")
+        params.append(date_str[:10])
+    if start_date and end_date:
+        clauses.append("created_date BETWEEN ? AND ?")
+        params.extend([start_date[:10], end_date[:10]])
+    if year_month:
+        clauses.append("created_ym = ?")
+        params.append(year_month)
+    if category:
+        clauses.append("category = ?")
+        params.append(category)
+    if ids is not None:
+        clauses.append(f"id IN ({', '.join('?' for _ in ids) or 'NULL'})")
+        params.extend(ids)
+    return (" AND ".join(clauses) or "1 = 1"), params
+
+def get_policies_page(
+    limit: int = 20,
+    cursor: Optional[Cursor] = None,
+    **filters
+) -> Tuple[List[Dict[str, Any]], Optional[Cursor]]:
+    """
+    정책 목록 한 페이지 + 다음 페이지 커서
+    
+    filters: date_str, start_date/end_date, year_month('YYYY-MM'), category, ids
+    """
+    where, params = _policy_filter(**filters)
+    with get_db() as conn:
+        rows = [dict(row) for row in _select_policies(conn, where, params, limit, cursor)]
+    return rows, next_cursor(rows, limit)
+
+def count_policies(**filters) -> int:
+    """iter_policies/get_policies_page와 같은 필터의 정책 수"""
+    where, params = _policy_filter(**filters)
+    with get_db() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM policies WHERE {where}", params).fetchone()[0]
+
+def iter_policies(page_size: int = POLICY_PAGE_SIZE, **filters) -> Iterator[Dict[str, Any]]:
+    """
+    정책을 페이지 단위로 끌어오며 한 건씩 반환 (전체 결과를 메모리에 만들지 않음)
+    
+    페이지 사이에는 커넥션을 반납하므로 순회 중 다른 쓰기 작업을 막지 않음
+    """
+    cursor = None
+    while True:
+        rows, cursor = get_policies_page(limit=page_size, cursor=cursor, **filters)
+        yield from rows
+        if cursor is None:
+            return
+
+@contextmanager
+def transaction():
+    """
+    단위 작업(unit of work) 트랜잭션
+    
+    블록 안의 쓰기 함수(create_policy, save_policy_content 등)는 모두 같은 커넥션/트랜잭션에
+    합류하고, 블록이 끝날 때 한 번만 커밋(fsync 1회). 예외가 나면 전부 롤백.
+    이미 트랜잭션 안에서 호출되면 바깥 트랜잭션에 그대로 합류.
+    """
+    with get_db() as conn:
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
 
 def create_policy(title: str, category: str, target_audience: str, description: str = "") -> int:
     now = datetime.now().isoformat()
-    with get_db() as conn:
+    with transaction() as conn:
         cursor = conn.execute("""
-            INSERT INTO policies (title, category, target_audience, description, status, created_at, updated_at)
-            VALUES (?, ?, ?, ?, 'draft', ?, ?)
-        """, (title, category, target_audience, description, now, now))
-        conn.commit()
+            INSERT INTO policies (title, category, target_audience, description, status, created_at, updated_at, created_date, created_ym)
+            VALUES (?, ?, ?, ?, 'draft', ?, ?, ?, ?)
+        """, (title, category, target_audience, description, now, now, now[:10], now[:7]))
         return cursor.lastrowid
 
+def _bump_revision(conn: sqlite3.Connection, policy_id: int, now: str):
+    """정책 revision 증가 - 이전 revision으로 캐시된 내보내기 파일은 더 이상 조회되지 않음"""
+    conn.execute("""
+        UPDATE policies SET revision = revision + 1, updated_at = ? WHERE id = ?
+    """, (now, policy_id))
+
+def get_policy_revision(policy_id: int) -> Optional[int]:
+    with get_db() as conn:
+        row = conn.execute("SELECT revision FROM policies WHERE id = ?", (policy_id,)).fetchone()
+        return row[0] if row else None
+
 def update_policy_status(policy_id: int, status: str):
     now = datetime.now().isoformat()
-    with get_db() as conn:
+    with transaction() as conn:
         conn.execute("""
-            UPDATE policies SET status = ?, updated_at = ? WHERE id = ?
+            UPDATE policies SET status = ?, updated_at = ?, revision = revision + 1 WHERE id = ?
         """, (status, now, policy_id))
-        conn.commit()
 
 def save_policy_content(policy_id: int, content_type: str, content_data: Dict[str, Any], metadata: Optional[Dict] = None):
     now = datetime.now().isoformat()
-    with get_db() as conn:
+    with transaction() as conn:
         conn.execute("""
             INSERT INTO policy_contents (policy_id, content_type, content_data, metadata, created_at)
             VALUES (?, ?, ?, ?, ?)
@@ -102,23 +596,212 @@ def save_policy_content(policy_id: int, content_type: str, content_data: Dict[st
             json.dumps(metadata or {}, ensure_ascii=False),
             now
         ))
-        conn.commit()
+        _bump_revision(conn, policy_id, now)
 
-def save_generated_media(policy_id: int, media_type: str, media_data: bytes, prompt: str, params: Dict[str, Any]):
-    now = datetime.now().isoformat()
+def _store_media_row(policy_id: int, media_type: str, media_data: bytes, prompt: str, params: Dict[str, Any], now: str) -> tuple:
+    """바이트는 파일 저장소에 먼저 쓰고 generated_media INSERT용 값 반환"""
+    content_hash = media_store.put_bytes(media_data)
+    info = media_store.probe_image(media_data)
+    return (
+        policy_id,
+        media_type,
+        content_hash,
+        len(media_data),
+        info["width"],
+        info["height"],
+        info["mime_type"],
+        prompt,
+        json.dumps(params, ensure_ascii=False),
+        now
+    )
+
+def _encode_for_storage(media: List[Tuple[str, bytes]]) -> List[bytes]:
+    """
+    이미지는 저장 인코딩 정책(image_variants.ENCODING_POLICY["storage"])으로 재인코딩, 나머지는 그대로
+    
+    현재 스레드에서 바로 인코딩 - 프로세스 풀(spawn)에 넘기면 저장 요청이 풀 기동과 결과를 기다려야 함.
+    Pillow 인코더는 인코딩 중 GIL을 놓으므로 다른 세션 스레드는 계속 진행된다.
+    """
+    return [
+        image_variants.encode_for_storage(data) if media_type == "image" else data
+        for media_type, data in media
+    ]
+
+def _row_handle(row: tuple) -> media_store.MediaHandle:
+    """_store_media_row 결과 → 저장된 원본 MediaHandle"""
+    return media_store.MediaHandle(row[2], mime_type=row[6], width=row[4], height=row[5], byte_size=row[3])
+
+INSERT_MEDIA_SQL = """
+    INSERT INTO generated_media (policy_id, media_type, content_hash, byte_size, width, height, mime_type, prompt, generation_params, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_variant_pending: set = set()
+_variant_cond = threading.Condition()
+
+def _store_variants(content_hash: str, future):
+    """프로세스 풀에서 만든 파생본을 파일 저장소에 쓰고 media_variants에 기록 (풀 콜백 스레드)"""
+    try:
+        if future.cancelled():
+            return
+        variants = future.result()
+        now = datetime.now().isoformat()
+        rows = [
+            (content_hash, name, media_store.put_bytes(v["data"]), v["mime_type"], v["width"], v["height"], len(v["data"]), now)
+            for name, v in variants.items()
+        ]
+        with transaction() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO media_variants
+                (content_hash, variant, variant_hash, mime_type, width, height, byte_size, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+    except Exception as e:
+        print(f"Media variant error ({content_hash[:12]}): {str(e)}")
+    finally:
+        with _variant_cond:
+            _variant_pending.discard(content_hash)
+            _variant_cond.notify_all()
+
+def _schedule_variants(media_rows: List[tuple], media_data: List[bytes]):
+    """
+    이미지 행의 파생본 생성을 프로세스 풀에 맡김 (저장 요청은 인코딩을 기다리지 않음)
+    
+    이미 파생본이 있거나 생성 중인 원본은 건너뜀. 완료 대기는 flush_media_variants()
+    """
+    targets = {}
+    for row, data in zip(media_rows, media_data):
+        content_hash, mime_type = row[2], row[6]
+        if row[1] == "image" and mime_type and mime_type.startswith("image/"):
+            targets[content_hash] = data
+    if not targets:
+        return
+    placeholders = ",".join("?" * len(targets))
     with get_db() as conn:
-        conn.execute("""
-            INSERT INTO generated_media (policy_id, media_type, media_data, prompt, generation_params, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            policy_id,
-            media_type,
-            media_data,
-            prompt,
-            json.dumps(params, ensure_ascii=False),
-            now
-        ))
-        conn.commit()
+        done = {r[0] for r in conn.execute(
+            f"SELECT DISTINCT content_hash FROM media_variants WHERE content_hash IN ({placeholders})",
+            list(targets)
+        )}
+    for content_hash, data in targets.items():
+        with _variant_cond:
+            if content_hash in done or content_hash in _variant_pending:
+                continue
+            _variant_pending.add(content_hash)
+        future = image_variants.submit_variants(data)
+        future.add_done_callback(lambda f, h=content_hash: _store_variants(h, f))
+
+def flush_media_variants(timeout: Optional[float] = None) -> bool:
+    """진행 중인 파생본 생성/기록이 모두 끝날 때까지 대기 (시간 안에 끝나면 True)"""
+    with _variant_cond:
+        return _variant_cond.wait_for(lambda: not _variant_pending, timeout)
+
+def backfill_media_variants(batch_size: int = 50) -> int:
+    """파생본이 없는 기존 이미지에 대해 생성 예약 (예약한 원본 수 반환)"""
+    with get_db() as conn:
+        rows = conn.execute("""
+            SELECT DISTINCT m.content_hash, m.mime_type FROM generated_media m
+            WHERE m.media_type = 'image' AND m.content_hash IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM media_variants v WHERE v.content_hash = m.content_hash)
+        """).fetchall()
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        _schedule_variants(
+            [(None, "image", r["content_hash"], None, None, None, r["mime_type"]) for r in batch],
+            [media_store.read_bytes(r["content_hash"]) for r in batch]
+        )
+    return len(rows)
+
+def get_media_variants(content_hashes: List[str]) -> Dict[str, Dict[str, media_store.MediaHandle]]:
+    """원본 content_hash별 파생본 핸들 {content_hash: {variant: MediaHandle}} (아직 없으면 빠짐)"""
+    results: Dict[str, Dict[str, media_store.MediaHandle]] = {}
+    hashes = [h for h in dict.fromkeys(content_hashes) if h]
+    if not hashes:
+        return results
+    with get_db() as conn:
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            rows = conn.execute(f"""
+                SELECT content_hash, variant, variant_hash, mime_type, width, height, byte_size
+                FROM media_variants WHERE content_hash IN ({",".join("?" * len(chunk))})
+            """, chunk).fetchall()
+            for row in rows:
+                results.setdefault(row["content_hash"], {})[row["variant"]] = media_store.MediaHandle(
+                    row["variant_hash"],
+                    mime_type=row["mime_type"],
+                    width=row["width"],
+                    height=row["height"],
+                    byte_size=row["byte_size"]
+                )
+    return results
+
+def save_generated_media(policy_id: int, media_type: str, media_data: bytes, prompt: str, params: Dict[str, Any]) -> media_store.MediaHandle:
+    """
+    미디어 1건 저장 후 저장된 원본의 MediaHandle 반환
+
+    이미지는 저장 인코딩으로 바뀌므로 content_hash는 넘긴 bytes의 해시와 다르다 -
+    파생본/내보내기 캐시 키는 반환된 핸들 기준으로.
+    """
+    now = datetime.now().isoformat()
+    media_data = _encode_for_storage([(media_type, media_data)])[0]
+    row = _store_media_row(policy_id, media_type, media_data, prompt, params, now)
+    with transaction() as conn:
+        conn.execute(INSERT_MEDIA_SQL, row)
+        _bump_revision(conn, policy_id, now)
+    _schedule_variants([row], [media_data])
+    return _row_handle(row)
+
+def save_generation_run(
+    policy_id: Optional[int] = None,
+    policy: Optional[Dict[str, str]] = None,
+    contents: Optional[Dict[str, Dict[str, Any]]] = None,
+    media: Optional[List[Dict[str, Any]]] = None,
+    status: Optional[str] = None
+) -> int:
+    """
+    생성 1회분(정책 + 콘텐츠 + 미디어 + 상태 변경)을 한 트랜잭션으로 저장
+    
+    Args:
+        policy_id: 기존 정책에 추가할 때 정책 ID (없으면 policy로 새로 생성)
+        policy: 새 정책 정보 {"title", "category", "target_audience", "description"}
+        contents: {content_type: content_data}
+        media: [{"media_type", "media_data", "prompt", "params"}] - executemany로 일괄 INSERT.
+            저장 후 각 항목의 "handle"에 저장된 원본의 MediaHandle을 넣음 (저장 인코딩 후 content_hash)
+        status: 변경할 정책 상태
+    
+    Returns:
+        정책 ID
+    """
+    if policy_id is None and not policy:
+        raise ValueError("policy_id 또는 policy 중 하나는 필요합니다")
+    
+    now = datetime.now().isoformat()
+    # 재인코딩/파일 쓰기는 트랜잭션 밖에서 먼저 (콘텐츠 주소 저장이라 롤백돼도 중복 제거되는 파일만 남음)
+    media = media or []
+    media_data = _encode_for_storage([(m.get("media_type", "image"), m["media_data"]) for m in media])
+    media_rows = [
+        _store_media_row(None, m.get("media_type", "image"), data, m.get("prompt", ""), m.get("params", {}), now)
+        for m, data in zip(media, media_data)
+    ]
+    
+    with transaction() as conn:
+        if policy_id is None:
+            policy_id = create_policy(
+                title=policy["title"],
+                category=policy["category"],
+                target_audience=policy["target_audience"],
+                description=policy.get("description", "")
+            )
+        for content_type, content_data in (contents or {}).items():
+            save_policy_content(policy_id, content_type, content_data)
+        if media_rows:
+            conn.executemany(INSERT_MEDIA_SQL, [(policy_id,) + row[1:] for row in media_rows])
+            _bump_revision(conn, policy_id, now)
+        if status:
+            update_policy_status(policy_id, status)
+    _schedule_variants(media_rows, media_data)
+    for m, row in zip(media, media_rows):
+        m["handle"] = _row_handle(row)
+    return policy_id
 
 def get_policy(policy_id: int) -> Optional[Dict[str, Any]]:
     with get_db() as conn:
@@ -127,28 +810,62 @@ def get_policy(policy_id: int) -> Optional[Dict[str, Any]]:
             return dict(row)
         return None
 
-def get_all_policies(limit: int = 50) -> List[Dict[str, Any]]:
+def get_all_policies(limit: int = 50, cursor: Optional[Cursor] = None) -> List[Dict[str, Any]]:
     with get_db() as conn:
-        rows = conn.execute("""
-            SELECT * FROM policies ORDER BY created_at DESC LIMIT ?
-        """, (limit,)).fetchall()
+        rows = _select_policies(conn, "1 = 1", [], limit, cursor)
         return [dict(row) for row in rows]
 
-def search_policies(keyword: str, category: Optional[str] = None, limit: int = 30) -> List[Dict[str, Any]]:
+def search_policies(
+    keyword: str,
+    category: Optional[str] = None,
+    limit: int = 30,
+    cursor: Optional[Cursor] = None
+) -> List[Dict[str, Any]]:
+    """
+    키워드 검색 (FTS5 bm25 순위 + snippet)
+    
+    trigram 인덱스는 3글자 이상 문자열만 매칭할 수 있으므로,
+    - 모든 단어가 3글자 이상이면 단어별 AND 검색
+    - 짧은 단어가 섞여 있으면 검색어 전체를 하나의 구문으로 검색
+    - 검색어 전체가 3글자 미만이면 제목/설명 LIKE 검색으로 대체 (rank/snippet = None)
+    다음 페이지는 next_cursor(결과, limit)로 얻은 커서를 넘겨 조회
+    """
+    terms = keyword.split()
+    if terms and any(len(term) < 3 for term in terms):
+        terms = [" ".join(terms)]
     with get_db() as conn:
+        if terms and len(terms[0]) >= 3 and _has_search_index(conn):
+            match_query = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+            sql = """
+                SELECT * FROM (
+                    SELECT p.*,
+                           bm25(policies_fts, 10.0, 5.0, 2.0, 1.0) AS rank,
+                           snippet(policies_fts, -1, '[', ']', '…', 16) AS snippet
+                    FROM policies_fts
+                    JOIN policies p ON p.id = policies_fts.rowid
+                    WHERE policies_fts MATCH ?
+                )
+                WHERE 1 = 1
+            """
+            params: List[Any] = [match_query]
+            if category:
+                sql += " AND category = ?"
+                params.append(category)
+            if cursor:
+                sql += " AND (rank > ? OR (rank = ? AND id > ?))"
+                params.extend([cursor[0], cursor[0], cursor[1]])
+            sql += " ORDER BY rank, id LIMIT ?"
+            params.append(limit)
+            rows = conn.execute(sql, params).fetchall()
+            return [dict(row) for row in rows]
+        
+        where = "(title LIKE ? OR description LIKE ?)"
+        params = [f"%{keyword}%", f"%{keyword}%"]
         if category:
-            rows = conn.execute("""
-                SELECT * FROM policies 
-                WHERE (title LIKE ? OR description LIKE ?) AND category = ?
-                ORDER BY created_at DESC LIMIT ?
-            """, (f"%{keyword}%", f"%{keyword}%", category, limit)).fetchall()
-        else:
-            rows = conn.execute("""
-                SELECT * FROM policies 
-                WHERE title LIKE ? OR description LIKE ?
-                ORDER BY created_at DESC LIMIT ?
-            """, (f"%{keyword}%", f"%{keyword}%", limit)).fetchall()
-        return [dict(row) for row in rows]
+            where += " AND category = ?"
+            params.append(category)
+        rows = _select_policies(conn, where, params, limit, cursor)
+        return [dict(row, rank=None, snippet=None) for row in rows]
 
 def get_policy_contents(policy_id: int) -> List[Dict[str, Any]]:
     with get_db() as conn:
@@ -166,68 +883,189 @@ def get_policy_contents(policy_id: int) -> List[Dict[str, Any]]:
 def get_generated_media(policy_id: int, media_type: Optional[str] = None) -> List[Dict[str, Any]]:
     with get_db() as conn:
         if media_type:
-            rows = conn.execute("""
-                SELECT * FROM generated_media WHERE policy_id = ? AND media_type = ? ORDER BY created_at DESC
+            rows = conn.execute(f"""
+                SELECT {MEDIA_COLUMNS} FROM generated_media WHERE policy_id = ? AND media_type = ? ORDER BY created_at DESC
             """, (policy_id, media_type)).fetchall()
         else:
-            rows = conn.execute("""
-                SELECT * FROM generated_media WHERE policy_id = ? ORDER BY created_at DESC
+            rows = conn.execute(f"""
+                SELECT {MEDIA_COLUMNS} FROM generated_media WHERE policy_id = ? ORDER BY created_at DESC
             """, (policy_id,)).fetchall()
         
         results = []
         for row in rows:
             data = dict(row)
             data['generation_params'] = json.loads(data['generation_params']) if data['generation_params'] else {}
+            data['media_data'] = media_store.read_bytes(data['content_hash']) if data['content_hash'] else None
             results.append(data)
         return results
 
-def update_performance_metrics(policy_id: int, metrics: Dict[str, Any]):
-    now = datetime.now().isoformat()
+def list_generated_media(policy_id: int, media_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    미디어 메타데이터만 조회 (바이트는 읽지 않음)
+    
+    각 항목의 'handle'(media_store.MediaHandle)로 필요할 때 바이트를 읽거나 디코딩.
+    'variants'는 {thumb/preview/full: MediaHandle} (파생본 생성 전이면 빈 dict)
+    """
     with get_db() as conn:
-        existing = conn.execute("""
-            SELECT id FROM policy_performance WHERE policy_id = ?
-        """, (policy_id,)).fetchone()
-        
-        if existing:
-            conn.execute("""
-                UPDATE policy_performance 
-                SET metrics_data = ?, updated_at = ?
-                WHERE policy_id = ?
-            """, (json.dumps(metrics, ensure_ascii=False), now, policy_id))
+        if media_type:
+            rows = conn.execute("""
+                SELECT id, media_type, content_hash, byte_size, width, height, mime_type, prompt, created_at
+                FROM generated_media WHERE policy_id = ? AND media_type = ? ORDER BY created_at DESC
+            """, (policy_id, media_type)).fetchall()
         else:
-            conn.execute("""
-                INSERT INTO policy_performance (policy_id, metrics_data, updated_at)
-                VALUES (?, ?, ?)
-            """, (policy_id, json.dumps(metrics, ensure_ascii=False), now))
-        conn.commit()
+            rows = conn.execute("""
+                SELECT id, media_type, content_hash, byte_size, width, height, mime_type, prompt, created_at
+                FROM generated_media WHERE policy_id = ? ORDER BY created_at DESC
+            """, (policy_id,)).fetchall()
+        
+        results = []
+        for row in rows:
+            data = dict(row)
+            data['handle'] = media_store.MediaHandle(
+                data['content_hash'],
+                mime_type=data['mime_type'],
+                width=data['width'],
+                height=data['height'],
+                byte_size=data['byte_size']
+            ) if data['content_hash'] else None
+            results.append(data)
+    variants = get_media_variants([data['content_hash'] for data in results])
+    for data in results:
+        data['variants'] = variants.get(data['content_hash'], {})
+    return results
+
+def update_performance_metrics(policy_id: int, metrics: Dict[str, Any]):
+    now = datetime.now().isoformat()
+    with transaction() as conn:
+        conn.execute("""
+            INSERT INTO policy_performance (policy_id, metrics_data, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT (policy_id) DO UPDATE
+            SET metrics_data = excluded.metrics_data, updated_at = excluded.updated_at
+        """, (policy_id, json.dumps(metrics, ensure_ascii=False), now))
+
+def increment_performance(policy_id: int, views: int = 0, engagement: float = 0.0):
+    """조회수/참여도 원자적 증가 (읽고-수정-쓰기 없이 단일 UPSERT)"""
+    _apply_performance_increments({policy_id: [views, engagement]})
+
+def _apply_performance_increments(increments: Dict[int, List[float]]):
+    now = datetime.now().isoformat()
+    with transaction() as conn:
+        conn.executemany("""
+            INSERT INTO policy_performance (policy_id, view_count, engagement_score, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (policy_id) DO UPDATE
+            SET view_count = view_count + excluded.view_count,
+                engagement_score = engagement_score + excluded.engagement_score,
+                updated_at = excluded.updated_at
+        """, [
+            (policy_id, int(views), float(engagement), now)
+            for policy_id, (views, engagement) in increments.items()
+        ])
 
-def get_policies_by_date(date_str: str) -> List[Dict[str, Any]]:
+class PerformanceCounter:
+    """
+    조회수/참여도 증가분을 메모리에 모았다가 flush_interval초마다 한 트랜잭션으로 반영
+    
+    화면 렌더링마다 record_view()를 불러도 DB 쓰기는 주기당 1회
+    """
+    
+    def __init__(self, flush_interval: float = 10.0):
+        self.flush_interval = flush_interval
+        self._pending: Dict[int, List[float]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def _add(self, policy_id: int, views: int, engagement: float):
+        with self._lock:
+            entry = self._pending.setdefault(policy_id, [0, 0.0])
+            entry[0] += views
+            entry[1] += engagement
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="performance-counter", daemon=True)
+                self._thread.start()
+    
+    def record_view(self, policy_id: int, count: int = 1):
+        self._add(policy_id, count, 0.0)
+    
+    def record_engagement(self, policy_id: int, score: float):
+        self._add(policy_id, 0, score)
+    
+    def flush(self) -> int:
+        """쌓인 증가분 반영 후 반영한 정책 수 반환 (실패하면 증가분을 되돌려 다음 주기에 재시도)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            _apply_performance_increments(pending)
+        except Exception:
+            with self._lock:
+                for policy_id, (views, engagement) in pending.items():
+                    entry = self._pending.setdefault(policy_id, [0, 0.0])
+                    entry[0] += views
+                    entry[1] += engagement
+            raise
+        return len(pending)
+    
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Performance counter flush error: {str(e)}")
+    
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+performance_counter = PerformanceCounter()
+
+def record_view(policy_id: int, count: int = 1):
+    performance_counter.record_view(policy_id, count)
+
+def record_engagement(policy_id: int, score: float):
+    performance_counter.record_engagement(policy_id, score)
+
+def flush_performance_counters() -> int:
+    return performance_counter.flush()
+
+atexit.register(performance_counter.stop)
+# 풀/커넥션 정리(close_pool)보다 먼저 실행되도록 나중에 등록
+atexit.register(flush_media_variants, 30)
+
+def get_policies_by_date(
+    date_str: str,
+    limit: Optional[int] = None,
+    cursor: Optional[Cursor] = None
+) -> List[Dict[str, Any]]:
     """특정 날짜에 생성된 정책 목록 조회 (YYYY-MM-DD)"""
+    where, params = _policy_filter(date_str=date_str)
     with get_db() as conn:
-        rows = conn.execute("""
-            SELECT * FROM policies 
-            WHERE date(created_at) = date(?)
-            ORDER BY created_at DESC
-        """, (date_str,)).fetchall()
+        rows = _select_policies(conn, where, params, limit, cursor)
         return [dict(row) for row in rows]
 
-def get_policies_by_date_range(start_date: str, end_date: str) -> List[Dict[str, Any]]:
+def get_policies_by_date_range(
+    start_date: str,
+    end_date: str,
+    limit: Optional[int] = None,
+    cursor: Optional[Cursor] = None
+) -> List[Dict[str, Any]]:
     """날짜 범위로 정책 목록 조회"""
+    where, params = _policy_filter(start_date=start_date, end_date=end_date)
     with get_db() as conn:
-        rows = conn.execute("""
-            SELECT * FROM policies 
-            WHERE date(created_at) BETWEEN date(?) AND date(?)
-            ORDER BY created_at DESC
-        """, (start_date, end_date)).fetchall()
+        rows = _select_policies(conn, where, params, limit, cursor)
         return [dict(row) for row in rows]
 
-def get_policies_by_month(year: int, month: int) -> List[Dict[str, Any]]:
+def get_policies_by_month(
+    year: int,
+    month: int,
+    limit: Optional[int] = None,
+    cursor: Optional[Cursor] = None
+) -> List[Dict[str, Any]]:
     """특정 월의 정책 목록 조회"""
+    where, params = _policy_filter(year_month=f"{year:04d}-{month:02d}")
     with get_db() as conn:
-        rows = conn.execute("""
-            SELECT * FROM policies 
-            WHERE strftime('%Y', created_at) = ? 
-            AND strftime('%m', created_at) = ?
-            ORDER BY created_at DESC
-        """, (str(year), f"{month:02d}")).fetchall()
+        rows = _select_policies(conn, where, params, limit, cursor)
         return [dict(row) for row in rows]
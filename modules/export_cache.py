@@ -0,0 +1,78 @@
+import os
+from io import BytesIO
+from typing import Any, Callable, Dict, Optional, BinaryIO, Union
+
+from modules.cache import FileCache, make_cache_key, CACHE_DIR
+from modules.database import get_policy_revision
+
+# PDF/ZIP 내보내기 결과 캐시 - (정책 ID, revision, 옵션)이 같으면 다시 만들지 않음
+export_cache = FileCache(os.path.join(CACHE_DIR, "exports"), max_bytes=1024 * 1024 * 1024)
+
+
+def export_key(kind: str, policy_id: int, revision: int, options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    내보내기 캐시 키
+
+    revision은 save_policy_content/save_generated_media/update_policy_status가 올리므로
+    정책이 바뀌면 키가 달라져 이전 파일은 조회되지 않고 LRU로 정리된다.
+    options에는 DB 밖의 입력(세션의 영상 프롬프트, 포함할 이미지 해시 등)을 넣는다.
+    """
+    return make_cache_key(kind=kind, policy_id=policy_id, revision=revision, options=options or {})
+
+
+def open_export(kind: str, policy_id: int, options: Optional[Dict[str, Any]] = None) -> Optional[BinaryIO]:
+    """캐시된 내보내기 파일을 열어 반환 (없으면 None, 다 쓴 뒤 close)"""
+    revision = get_policy_revision(policy_id)
+    if revision is None:
+        return None
+    return export_cache.open(export_key(kind, policy_id, revision, options))
+
+
+def get_or_build_export(
+    kind: str,
+    policy_id: int,
+    build: Callable[[], Union[bytes, BinaryIO]],
+    options: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    캐시된 내보내기 파일 경로 반환, 없으면 build()로 만들어 저장 (다운로드를 요청할 때만 호출)
+
+    build는 bytes 또는 파일 객체(create_zip_export의 임시 파일 등)를 반환. 파일 객체는
+    청크 단위로 캐시에 복사한 뒤 닫는다.
+    """
+    revision = get_policy_revision(policy_id)
+    key = export_key(kind, policy_id, revision or 0, options)
+    path = export_cache.get_path(key)
+    if path is not None:
+        return path
+    result = build()
+    if isinstance(result, (bytes, bytearray)):
+        export_cache.set(key, bytes(result))
+        return export_cache.path(key)
+    try:
+        return export_cache.set_stream(key, result)
+    finally:
+        result.close()
+
+
+def open_or_build_export(
+    kind: str,
+    policy_id: int,
+    build: Callable[[], Union[bytes, BinaryIO]],
+    options: Optional[Dict[str, Any]] = None
+) -> BinaryIO:
+    """
+    get_or_build_export와 같지만 열린 파일 객체를 반환 (다른 내보내기에 포함할 때)
+
+    만든 직후 LRU로 정리됐으면(캐시 한도보다 큰 결과 등) 캐시를 거치지 않고 한 번 더 만든다.
+    """
+    key = export_key(kind, policy_id, get_policy_revision(policy_id) or 0, options)
+    cached = export_cache.open(key)
+    if cached is not None:
+        return cached
+    get_or_build_export(kind, policy_id, build, options)
+    cached = export_cache.open(key)
+    if cached is not None:
+        return cached
+    result = build()
+    return BytesIO(bytes(result)) if isinstance(result, (bytes, bytearray)) else result
@@ -0,0 +1,274 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Optional, Dict, Any, List
+
+from modules.cache import make_cache_key
+from modules.export_cache import export_key, get_or_build_export, open_or_build_export
+from modules.database import get_policy_revision
+
+# 동시에 진행하는 내보내기 작업 수 / ReportLab 렌더링 프로세스 수
+EXPORT_MAX_JOBS = 2
+EXPORT_RENDER_WORKERS = max(1, min(2, (os.cpu_count() or 1) - 1))
+# 끝난 작업 상태를 보관하는 시간 (UI 폴링용)
+FINISHED_JOB_TTL = 3600
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_ERROR = "error"
+
+
+def render_pdf(policy: Dict[str, Any], analysis: Dict[str, Any], images: List[Any], video_prompts: List[str]) -> bytes:
+    """렌더링 프로세스에서 실행 (images는 파일 경로 또는 bytes)"""
+    from modules.pdf_renderer import get_renderer
+    return get_renderer().policy_report(policy, analysis, images=images or None, video_prompts=video_prompts or None)
+
+
+def _pdf_image_source(image: Any) -> Any:
+    # 핸들은 경로만 넘겨 프로세스 간에 이미지 바이트를 복사하지 않음
+    return os.path.abspath(image.path) if hasattr(image, "path") else image
+
+
+class ExportJob:
+    """내보내기 작업 1건의 상태 (UI는 snapshot()으로 폴링)"""
+
+    def __init__(self, kind: str, policy_id: int, key: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.policy_id = policy_id
+        self.key = key
+        self.status = JOB_QUEUED
+        self.progress = 0.0
+        self.message = "대기 중"
+        self.path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    def update(self, progress: float, message: str):
+        self.progress = max(self.progress, min(progress, 1.0))
+        self.message = message
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_DONE, JOB_ERROR)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "policy_id": self.policy_id,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "path": self.path,
+            "error": self.error,
+            "elapsed": (self.finished_at or time.time()) - self.created_at,
+        }
+
+
+class ExportJobQueue:
+    """
+    PDF/ZIP 내보내기 작업 큐 (프로세스 단위 싱글턴 export_jobs로 사용)
+
+    - 작업 진행은 작업 스레드(EXPORT_MAX_JOBS개), CPU를 쓰는 ReportLab 렌더링은
+      spawn 프로세스 풀에서 실행하므로 Streamlit 세션 스레드/GIL을 붙잡지 않음
+    - 결과는 내보내기 캐시(modules/export_cache)에 저장되고, 같은 키의 작업이
+      진행 중이면 새로 만들지 않고 그 작업을 반환
+    """
+
+    def __init__(self, max_jobs: int = EXPORT_MAX_JOBS, render_workers: int = EXPORT_RENDER_WORKERS):
+        self.max_jobs = max_jobs
+        self.render_workers = render_workers
+        self._jobs: Dict[str, ExportJob] = {}
+        self._active: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._render_pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix="export-job")
+        return self._executor
+
+    def _render(self, *args) -> bytes:
+        with self._lock:
+            if self._render_pool is None:
+                try:
+                    self._render_pool = ProcessPoolExecutor(
+                        max_workers=self.render_workers, mp_context=get_context("spawn")
+                    )
+                except Exception:
+                    self._render_pool = None
+            pool = self._render_pool
+        if pool is None:
+            return render_pdf(*args)
+        future: Future = pool.submit(render_pdf, *args)
+        return future.result()
+
+    def submit(
+        self,
+        kind: str,
+        policy_id: int,
+        options: Dict[str, Any],
+        policy: Dict[str, Any],
+        analysis: Dict[str, Any],
+        pdf_images: Optional[List[Any]] = None,
+        zip_images: Optional[List[Any]] = None,
+        video_prompts: Optional[List[str]] = None
+    ) -> ExportJob:
+        """
+        작업 등록 후 바로 반환 (진행 상황은 get(job.id)로 조회)
+
+        Args:
+            kind: "pdf" 또는 "zip" (ZIP은 PDF를 캐시에서 가져오거나 먼저 만든 뒤 포함)
+            options: 내보내기 캐시 키 옵션 (kind가 zip이면 {"pdf": PDF 옵션, ...} 형태로 PDF 옵션 포함)
+            pdf_images / zip_images: MediaHandle 또는 bytes
+        """
+        if kind not in ("pdf", "zip"):
+            raise ValueError(f"알 수 없는 내보내기 종류: {kind}")
+        key = export_key(kind, policy_id, get_policy_revision(policy_id) or 0, options)
+        job, created = self._new_job(kind, policy_id, key)
+        if not created:
+            return job
+        inputs = {
+            "options": options,
+            "policy": policy,
+            "analysis": analysis,
+            "pdf_images": [_pdf_image_source(image) for image in (pdf_images or [])],
+            "zip_images": list(zip_images or []),
+            "video_prompts": list(video_prompts or []),
+        }
+        self._get_executor().submit(self._run, job, inputs)
+        self.prune()
+        return job
+
+    def submit_bulk(self, filters: Dict[str, Any], include_media: bool = True, include_pdf: bool = False) -> ExportJob:
+        """
+        여러 정책 일괄 내보내기 작업 등록 (modules/bulk_export, 진행률은 정책 단위)
+
+        결과는 내보내기 캐시가 아닌 BULK_EXPORT_DIR의 파일 - 정책별 revision으로 무효화할 수 없으므로
+        매번 새로 만든다 (같은 조건의 작업이 진행 중이면 그 작업을 반환). 오래된 결과 파일은
+        작업을 시작할 때 정리 (bulk_export.BULK_EXPORT_MAX_AGE).
+        """
+        key = make_cache_key(kind="bulk", filters=filters, include_media=include_media, include_pdf=include_pdf)
+        job, created = self._new_job("bulk", 0, key)
+        if created:
+            self._get_executor().submit(self._run_bulk, job, filters, include_media, include_pdf)
+            self.prune()
+        return job
+
+    def _new_job(self, kind: str, policy_id: int, key: str):
+        """같은 키의 작업이 진행 중이면 (그 작업, False), 아니면 (새 작업, True)"""
+        with self._lock:
+            active = self._jobs.get(self._active.get(key, ""))
+            if active is not None and not active.finished:
+                return active, False
+            job = ExportJob(kind, policy_id, key)
+            self._jobs[job.id] = job
+            self._active[key] = job.id
+        return job, True
+
+    def _pdf_builder(self, job: ExportJob, inputs: Dict[str, Any]):
+        def build() -> bytes:
+            job.update(0.1, "PDF 렌더링 중")
+            return self._render(
+                inputs["policy"], inputs["analysis"], inputs["pdf_images"], inputs["video_prompts"]
+            )
+        return build
+
+    def _run(self, job: ExportJob, inputs: Dict[str, Any]):
+        self._execute(job, lambda: self._export(job, inputs))
+
+    def _run_bulk(self, job: ExportJob, filters: Dict[str, Any], include_media: bool, include_pdf: bool):
+        from modules.bulk_export import BULK_EXPORT_DIR, export_policies, prune_bulk_exports
+
+        def on_policy(done: int, total: int, policy: Dict[str, Any]):
+            job.update(0.05 + 0.9 * done / max(total, 1), f"{done}/{total} {policy['title'][:20]}")
+
+        def work() -> str:
+            prune_bulk_exports()
+            path = os.path.join(BULK_EXPORT_DIR, f"bulk_{job.key[:16]}.zip")
+            # 정책별 보고서 PDF는 렌더링 프로세스에서 (이미지는 파일 경로로 넘김)
+            export_policies(
+                path, filters, include_media=include_media, include_pdf=include_pdf,
+                progress=on_policy, render_pdf=self._render
+            )
+            return path
+        self._execute(job, work)
+
+    def _execute(self, job: ExportJob, work):
+        job.status = JOB_RUNNING
+        job.update(0.05, "시작")
+        try:
+            job.path = work()
+            job.status = JOB_DONE
+            job.update(1.0, "완료")
+        except Exception as e:
+            job.status = JOB_ERROR
+            job.error = str(e)
+            job.message = "실패"
+            print(f"Export job error ({job.kind}, policy {job.policy_id}): {str(e)}")
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                if self._active.get(job.key) == job.id:
+                    del self._active[job.key]
+
+    def _export(self, job: ExportJob, inputs: Dict[str, Any]) -> str:
+        from modules.export_manager import create_zip_export
+
+        if job.kind == "pdf":
+            return get_or_build_export("pdf", job.policy_id, self._pdf_builder(job, inputs), inputs["options"])
+
+        def build_zip():
+            # 경로 대신 열린 파일로 받아 ZIP을 쓰는 동안 LRU 정리로 PDF가 사라지지 않도록
+            with open_or_build_export(
+                "pdf", job.policy_id, self._pdf_builder(job, inputs), inputs["options"].get("pdf", {})
+            ) as pdf_file:
+                job.update(0.6, "ZIP 기록 중")
+                # PDF, JSON(최대 9개), README + 이미지/영상 프롬프트 (진행률은 1.0에서 멈춤)
+                total = len(inputs["zip_images"]) + len(inputs["video_prompts"]) + 11
+                written = [0]
+
+                def on_entry(name: str):
+                    written[0] += 1
+                    job.update(0.6 + 0.4 * min(written[0] / total, 1.0), f"ZIP 기록 중 ({name})")
+
+                return create_zip_export(
+                    inputs["policy"],
+                    inputs["analysis"],
+                    images=inputs["zip_images"],
+                    video_prompts=inputs["video_prompts"] or None,
+                    pdf_bytes=pdf_file,
+                    progress=on_entry
+                )
+        return get_or_build_export("zip", job.policy_id, build_zip, inputs["options"])
+
+    def get(self, job_id: Optional[str]) -> Optional[ExportJob]:
+        with self._lock:
+            return self._jobs.get(job_id) if job_id else None
+
+    def jobs_for_policy(self, policy_id: int) -> List[ExportJob]:
+        with self._lock:
+            return [job for job in self._jobs.values() if job.policy_id == policy_id]
+
+    def prune(self, max_age: float = FINISHED_JOB_TTL):
+        """끝난 지 max_age초가 지난 작업 상태 정리"""
+        cutoff = time.time() - max_age
+        with self._lock:
+            for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+                del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+        if self._render_pool is not None:
+            self._render_pool.shutdown(wait=wait)
+
+
+export_jobs = ExportJobQueue()
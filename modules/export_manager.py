@@ -1,214 +1,82 @@
-import io
 import json
-import zipfile
 from datetime import datetime
-from typing import Dict, Any, List
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, PageBreak, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-from reportlab.lib.enums import TA_LEFT, TA_CENTER
+from pathlib import Path
+from typing import Dict, Any, List, Iterator, BinaryIO, Union, Optional, Callable
 
-def create_pdf_report(policy_data: Dict[str, Any], analysis_data: Dict[str, Any]) -> bytes:
-    """
-    정책 보고서 PDF 생성 (한글 지원)
+from modules.image_variants import image_extension, mime_extension
+from modules.zip_stream import ZipEntry, spool_zip, iter_zip
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, indent=2)
+
+def image_zip_name(idx: int, image: Any) -> str:
+    """images/image_N.<확장자> - 핸들은 메타데이터의 MIME, bytes는 파일 시그니처로 판별"""
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return f"images/image_{idx}.{image_extension(bytes(image[:12]))}"
+    return f"images/image_{idx}.{mime_extension(getattr(image, 'mime_type', None))}"
+
+PDF_ZIP_NAME = "정책_보고서_전체.pdf"
+
+def zip_export_entries(
+    policy_data: Dict[str, Any],
+    analysis_data: Dict[str, Any],
+    images: List[Any] = None,
+    video_prompts: List[str] = None,
+    pdf_bytes: Union[bytes, Path, BinaryIO] = None
+) -> Iterator[ZipEntry]:
     """
-    buffer = io.BytesIO()
-    
-    pdfmetrics.registerFont(UnicodeCIDFont("HYSMyeongJo-Medium"))
-    
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=50,
-        leftMargin=50,
-        topMargin=50,
-        bottomMargin=50,
-    )
-    
-    styles = getSampleStyleSheet()
-    styles["Normal"].fontName = "HYSMyeongJo-Medium"
-    styles["Normal"].fontSize = 10
-    styles["Normal"].leading = 14
-    
-    title_style = ParagraphStyle(
-        "CustomTitle",
-        parent=styles["Heading1"],
-        fontName="HYSMyeongJo-Medium",
-        fontSize=18,
-        alignment=TA_CENTER,
-        spaceAfter=30
-    )
+    내보내기 ZIP 항목을 순서대로 생성
     
-    heading_style = ParagraphStyle(
-        "CustomHeading",
-        parent=styles["Heading2"],
-        fontName="HYSMyeongJo-Medium",
-        fontSize=14,
-        spaceAfter=12
-    )
-    
-    story = []
-    
-    story.append(Paragraph("정세담 정책 프로그램", title_style))
-    story.append(Paragraph("정책 분석 및 실행 보고서", styles["Normal"]))
-    story.append(Spacer(1, 20))
-    story.append(Paragraph(f"생성일시: {datetime.now().strftime('%Y년 %m월 %d일 %H시 %M분')}", styles["Normal"]))
-    story.append(PageBreak())
+    images 항목은 bytes 또는 MediaHandle, pdf_bytes는 bytes, 파일 경로 또는 열린 파일 -
+    핸들/경로/파일은 ZIP에 쓸 차례에 청크 단위로 읽음
+    """
+    if pdf_bytes:
+        yield PDF_ZIP_NAME, pdf_bytes
     
-    story.append(Paragraph("1. 정책 개요", heading_style))
-    story.append(Paragraph(f"정책명: {policy_data.get('title', '')}", styles["Normal"]))
-    story.append(Paragraph(f"카테고리: {policy_data.get('category', '')}", styles["Normal"]))
-    story.append(Paragraph(f"대상: {policy_data.get('target_audience', '')}", styles["Normal"]))
-    story.append(Spacer(1, 12))
-    story.append(Paragraph(f"설명: {policy_data.get('description', '')}", styles["Normal"]))
-    story.append(PageBreak())
+    yield "policy_info.json", _dumps(policy_data)
+    yield "analysis_full.json", _dumps(analysis_data)
     
     if "policy_planning" in analysis_data:
-        planning = analysis_data["policy_planning"]
-        story.append(Paragraph("2. 정책 기획", heading_style))
-        story.append(Paragraph(f"목표: {planning.get('objective', '')}", styles["Normal"]))
-        story.append(Spacer(1, 12))
-        
-        strategies = planning.get("key_strategies", [])
-        if strategies:
-            story.append(Paragraph("핵심 전략:", styles["Normal"]))
-            for idx, strategy in enumerate(strategies, 1):
-                story.append(Paragraph(f"{idx}. {strategy}", styles["Normal"]))
-        story.append(PageBreak())
+        yield "01_planning.json", _dumps(analysis_data["policy_planning"])
     
     if "execution_plan" in analysis_data:
-        execution = analysis_data["execution_plan"]
-        story.append(Paragraph("3. 실행 계획", heading_style))
-        
-        action_items = execution.get("action_items", [])
-        if action_items:
-            story.append(Paragraph("실행 항목:", styles["Normal"]))
-            for item in action_items:
-                story.append(Paragraph(
-                    f"• {item.get('phase', '')}: {item.get('action', '')}",
-                    styles["Normal"]
-                ))
-        story.append(PageBreak())
+        yield "02_execution.json", _dumps(analysis_data["execution_plan"])
     
     if "marketing_materials" in analysis_data:
-        marketing = analysis_data["marketing_materials"]
-        story.append(Paragraph("4. 마케팅 자료", heading_style))
-        story.append(Paragraph(f"슬로건: {marketing.get('slogan', '')}", styles["Normal"]))
-        story.append(Paragraph(f"태그라인: {marketing.get('tagline', '')}", styles["Normal"]))
-        story.append(Spacer(1, 12))
-        story.append(Paragraph(f"{marketing.get('elevator_pitch', '')}", styles["Normal"]))
-        story.append(PageBreak())
+        yield "03_marketing.json", _dumps(analysis_data["marketing_materials"])
     
-    if "performance_metrics" in analysis_data:
-        metrics = analysis_data["performance_metrics"]
-        story.append(Paragraph("5. 성과 지표", heading_style))
+    if "content_briefs" in analysis_data:
+        briefs = analysis_data["content_briefs"]
+        
+        if "image_brief_1" in briefs:
+            yield "04_image_brief_1.json", _dumps(briefs["image_brief_1"])
+        
+        if "image_brief_2" in briefs:
+            yield "04_image_brief_2.json", _dumps(briefs["image_brief_2"])
         
-        kpi_framework = metrics.get("kpi_framework", [])
-        if kpi_framework:
-            for kpi in kpi_framework:
-                story.append(Paragraph(
-                    f"• {kpi.get('metric', '')}: {kpi.get('measurement_method', '')}",
-                    styles["Normal"]
-                ))
-        story.append(PageBreak())
+        if "video_brief" in briefs:
+            yield "05_video_brief.json", _dumps(briefs["video_brief"])
     
-    story.append(Paragraph("6. 데이터 상세", heading_style))
-    json_str = json.dumps(analysis_data, ensure_ascii=False, indent=2)
-    for line in json_str.split("\n")[:100]:
-        clean_line = line.replace("<", "&lt;").replace(">", "&gt;")
-        story.append(Paragraph(clean_line, styles["Normal"]))
+    if "performance_metrics" in analysis_data:
+        yield "06_kpi.json", _dumps(analysis_data["performance_metrics"])
     
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.read()
-
-def create_zip_export(
-    policy_data: Dict[str, Any],
-    analysis_data: Dict[str, Any],
-    images: List[bytes] = None,
-    video_prompts: List[str] = None
-) -> bytes:
-    """
-    모든 자료를 ZIP으로 압축
-    """
-    buffer = io.BytesIO()
+    if images:
+        for idx, image in enumerate(images, 1):
+            yield image_zip_name(idx, image), image
     
-    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr(
-            "policy_info.json",
-            json.dumps(policy_data, ensure_ascii=False, indent=2)
-        )
-        
-        zf.writestr(
-            "analysis_full.json",
-            json.dumps(analysis_data, ensure_ascii=False, indent=2)
-        )
-        
-        if "policy_planning" in analysis_data:
-            zf.writestr(
-                "01_planning.json",
-                json.dumps(analysis_data["policy_planning"], ensure_ascii=False, indent=2)
-            )
-        
-        if "execution_plan" in analysis_data:
-            zf.writestr(
-                "02_execution.json",
-                json.dumps(analysis_data["execution_plan"], ensure_ascii=False, indent=2)
-            )
-        
-        if "marketing_materials" in analysis_data:
-            zf.writestr(
-                "03_marketing.json",
-                json.dumps(analysis_data["marketing_materials"], ensure_ascii=False, indent=2)
-            )
-        
-        if "content_briefs" in analysis_data:
-            briefs = analysis_data["content_briefs"]
-            
-            if "image_brief_1" in briefs:
-                zf.writestr(
-                    "04_image_brief_1.json",
-                    json.dumps(briefs["image_brief_1"], ensure_ascii=False, indent=2)
-                )
-            
-            if "image_brief_2" in briefs:
-                zf.writestr(
-                    "04_image_brief_2.json",
-                    json.dumps(briefs["image_brief_2"], ensure_ascii=False, indent=2)
-                )
-            
-            if "video_brief" in briefs:
-                zf.writestr(
-                    "05_video_brief.json",
-                    json.dumps(briefs["video_brief"], ensure_ascii=False, indent=2)
-                )
-        
-        if "performance_metrics" in analysis_data:
-            zf.writestr(
-                "06_kpi.json",
-                json.dumps(analysis_data["performance_metrics"], ensure_ascii=False, indent=2)
-            )
-        
-        if images:
-            for idx, img_bytes in enumerate(images, 1):
-                zf.writestr(f"images/image_{idx}.png", img_bytes)
-        
-        if video_prompts:
-            for idx, prompt in enumerate(video_prompts, 1):
-                zf.writestr(f"video_prompts/prompt_{idx}.txt", prompt)
-        
-        zf.writestr(
-            "README.txt",
-            f"""정세담 정책 프로그램 - 내보내기 파일
+    if video_prompts:
+        for idx, prompt in enumerate(video_prompts, 1):
+            yield f"video_prompts/prompt_{idx}.txt", prompt
+    
+    pdf_line = f"- {PDF_ZIP_NAME}: 정책 보고서 (분석 전체 + 이미지 + 영상 프롬프트)\n" if pdf_bytes else ""
+    yield "README.txt", f"""정세담 정책 프로그램 - 내보내기 파일
 
 생성일시: {datetime.now().isoformat()}
 정책명: {policy_data.get('title', '')}
 카테고리: {policy_data.get('category', '')}
 
 폴더 구조:
-- policy_info.json: 정책 기본 정보
+{pdf_line}- policy_info.json: 정책 기본 정보
 - analysis_full.json: 전체 분석 데이터
 - 01_planning.json: 정책 기획
 - 02_execution.json: 실행 계획
@@ -219,7 +87,33 @@ def create_zip_export(
 - images/: 생성된 이미지 파일
 - video_prompts/: 영상 프롬프트
 """
-        )
+
+def create_zip_export(
+    policy_data: Dict[str, Any],
+    analysis_data: Dict[str, Any],
+    images: List[Any] = None,
+    video_prompts: List[str] = None,
+    pdf_bytes: Union[bytes, Path, BinaryIO] = None,
+    progress: Optional[Callable[[str], None]] = None
+) -> BinaryIO:
+    """
+    모든 자료를 ZIP으로 압축 (pdf_bytes를 주면 보고서 PDF 포함)
     
-    buffer.seek(0)
-    return buffer.read()
+    SpooledTemporaryFile(처음 위치)을 반환 - 큰 아카이브는 디스크로 넘어가 메모리에 두 번 올라가지 않음.
+    st.download_button에 그대로 넘기거나 read() 후 close(). HTTP 응답 등 청크가 필요하면 iter_zip_export.
+    progress는 항목을 하나 쓸 때마다 항목 이름으로 호출 (내보내기 작업 진행률)
+    """
+    return spool_zip(
+        zip_export_entries(policy_data, analysis_data, images, video_prompts, pdf_bytes),
+        progress=progress
+    )
+
+def iter_zip_export(
+    policy_data: Dict[str, Any],
+    analysis_data: Dict[str, Any],
+    images: List[Any] = None,
+    video_prompts: List[str] = None,
+    pdf_bytes: Union[bytes, Path, BinaryIO] = None
+) -> Iterator[bytes]:
+    """create_zip_export와 같은 내용을 청크 단위로 생성"""
+    return iter_zip(zip_export_entries(policy_data, analysis_data, images, video_prompts, pdf_bytes))
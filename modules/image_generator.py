@@ -1,37 +1,86 @@
 import os
+import time
 import base64
 from io import BytesIO
-from typing import List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from typing import List, Tuple, Optional, Dict, Any, Iterator
 from PIL import Image
-from openai import OpenAI
 
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+from modules.cache import FileCache, make_cache_key, CACHE_DIR
+from modules.openai_client import generate_image, INTERACTIVE, BATCH
+
+# 일괄 생성 시 동시 요청 수 (실제 처리량은 공용 스케줄러의 모델별 RPM 한도를 따름)
+BATCH_MAX_WORKERS = 4
+
+# 동일 프롬프트/크기/품질/모델 이미지 캐시 - 같은 브리프로 다시 생성할 때 API 재호출 방지
+image_cache = FileCache(os.path.join(CACHE_DIR, "images"))
+
+def fetch_image_bytes(
+    prompt: str,
+    size: str = "1024x1024",
+    quality: str = "standard",
+    model: str = "dall-e-3",
+    n: int = 1,
+    priority: int = INTERACTIVE,
+    deadline: Optional[float] = None,
+    variant: int = 0,
+    use_cache: bool = True
+) -> List[bytes]:
+    """
+    이미지 원본 바이트 n개 (캐시 우선)
+    
+    캐시 키는 최종 프롬프트 + 크기 + 품질 + 모델 + 변형 번호. 같은 요청에서 여러 장이 필요하면
+    variant를 달리 주고, 의도적으로 새 변형을 원하면 use_cache=False (결과는 캐시에 덮어씀)
+    """
+    keys = [
+        make_cache_key(prompt=prompt, size=size, quality=quality, model=model, variant=variant + i)
+        for i in range(n)
+    ]
+    if use_cache:
+        cached = [image_cache.get(key) for key in keys]
+        if all(data is not None for data in cached):
+            return cached
+    
+    response = generate_image(
+        priority=priority,
+        deadline=deadline,
+        model=model,
+        prompt=prompt,
+        size=size,
+        n=n,
+        quality=quality,
+        response_format="b64_json"
+    )
+    results = [base64.b64decode(img_data.b64_json) for img_data in response.data]
+    for key, img_bytes in zip(keys, results):
+        image_cache.set(key, img_bytes)
+    return results
 
 def generate_images(
     prompt: str,
     size: str = "1024x1024",
     n: int = 1,
-    quality: str = "standard"
+    quality: str = "standard",
+    priority: int = INTERACTIVE,
+    use_cache: bool = True
 ) -> List[Tuple[Image.Image, bytes]]:
     """
-    이미지 생성 함수
+    이미지 생성 함수 (공용 스케줄러 경유 - 일괄 작업은 priority=BATCH)
     
     Returns:
         List[Tuple[Image.Image, bytes]]: (PIL Image 객체, raw bytes) 튜플의 리스트
     """
     try:
-        response = client.images.generate(
-            model="dall-e-3" if n == 1 else "dall-e-2",
-            prompt=prompt,
+        results = []
+        for img_bytes in fetch_image_bytes(
+            prompt,
             size=size,
-            n=n,
             quality=quality,
-            response_format="b64_json"
-        )
-        
-        results = []
-        for img_data in response.data:
-            img_bytes = base64.b64decode(img_data.b64_json)
+            model="dall-e-3" if n == 1 else "dall-e-2",
+            n=n,
+            priority=priority,
+            use_cache=use_cache
+        ):
             img = Image.open(BytesIO(img_bytes)).convert("RGB")
             results.append((img, img_bytes))
         
@@ -44,7 +93,8 @@ def generate_images(
 def generate_policy_image(
     brief: dict,
     size: str = "1024x1024",
-    quality: str = "standard"
+    quality: str = "standard",
+    use_cache: bool = True
 ) -> Optional[Tuple[Image.Image, bytes]]:
     """
     정책 이미지 생성 (brief 기반)
@@ -74,32 +124,97 @@ Requirements:
 - Natural color palette
 """
     
-    results = generate_images(prompt, size=size, n=1, quality=quality)
+    results = generate_images(prompt, size=size, n=1, quality=quality, use_cache=use_cache)
     if results:
         return results[0]
     return None
 
-def batch_generate_images(
+def _generate_one(
+    index: int,
+    prompt: str,
+    size: str,
+    quality: str,
+    model: str,
+    deadline: Optional[float],
+    variant: int,
+    use_cache: bool
+) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"index": index, "prompt": prompt, "status": "ok", "image": None, "bytes": None, "error": None}
+    try:
+        img_bytes = fetch_image_bytes(
+            prompt,
+            size=size,
+            quality=quality,
+            model=model,
+            priority=BATCH,
+            deadline=deadline,
+            variant=variant,
+            use_cache=use_cache
+        )[0]
+        result["image"] = Image.open(BytesIO(img_bytes)).convert("RGB")
+        result["bytes"] = img_bytes
+    except Exception as e:
+        timed_out = isinstance(e, TimeoutError) or "timeout" in type(e).__name__.lower()
+        result["status"] = "timeout" if timed_out else "error"
+        result["error"] = str(e)
+    return result
+
+def iter_generate_images(
     prompts: List[str],
     size: str = "1024x1024",
-    quality: str = "standard"
-) -> List[Tuple[Image.Image, bytes]]:
+    quality: str = "standard",
+    model: str = "dall-e-3",
+    max_workers: int = BATCH_MAX_WORKERS,
+    timeout: Optional[float] = None,
+    use_cache: bool = True
+) -> Iterator[Dict[str, Any]]:
     """
-    여러 이미지를 순차적으로 생성
+    여러 이미지를 동시에 생성하며 완료되는 순서대로 결과 반환
+    
+    결과: {"index", "prompt", "status": "ok" | "error" | "timeout", "image", "bytes", "error"}
+    timeout(초)이 지나면 대기 중인 요청은 취소하고, 진행 중인 요청은 HTTP 타임아웃으로 끊은 뒤
+    남은 프롬프트를 모두 "timeout"으로 반환. 같은 프롬프트가 여러 번 있으면 서로 다른 변형으로 생성
     """
-    all_results = []
-    for prompt in prompts:
-        results = generate_images(prompt, size=size, n=1, quality=quality)
-        all_results.extend(results)
-    return all_results
+    deadline = time.monotonic() + timeout if timeout else None
+    variants = [prompts[:idx].count(prompt) for idx, prompt in enumerate(prompts)]
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(prompts))))
+    futures = {
+        executor.submit(_generate_one, idx, prompt, size, quality, model, deadline, variants[idx], use_cache): idx
+        for idx, prompt in enumerate(prompts)
+    }
+    pending = set(futures)
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            pending.discard(future)
+            yield future.result()
+    except FuturesTimeout:
+        for future in sorted(pending, key=futures.get):
+            future.cancel()
+            idx = futures[future]
+            yield {
+                "index": idx, "prompt": prompts[idx], "status": "timeout",
+                "image": None, "bytes": None, "error": f"{timeout}초 안에 완료되지 않음"
+            }
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
-def create_thumbnail(image: Image.Image, max_size: Tuple[int, int] = (300, 300)) -> Image.Image:
+def batch_generate_images(
+    prompts: List[str],
+    size: str = "1024x1024",
+    quality: str = "standard",
+    model: str = "dall-e-3",
+    max_workers: int = BATCH_MAX_WORKERS,
+    timeout: Optional[float] = None,
+    use_cache: bool = True
+) -> List[Dict[str, Any]]:
     """
-    썸네일 생성
+    여러 이미지를 동시에 생성 (공용 스케줄러 한도 안에서)
+    
+    Returns:
+        입력 순서대로 정렬된 프롬프트별 결과 (iter_generate_images 결과 형식)
     """
-    img_copy = image.copy()
-    img_copy.thumbnail(max_size, Image.Resampling.LANCZOS)
-    return img_copy
+    results = list(iter_generate_images(prompts, size, quality, model, max_workers, timeout, use_cache))
+    return sorted(results, key=lambda r: r["index"])
 
 def images_to_bytes(images: List[Image.Image], format: str = "PNG") -> List[bytes]:
     """
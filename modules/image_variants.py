@@ -0,0 +1,198 @@
+import os
+import json
+import atexit
+import threading
+from io import BytesIO
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Optional, Dict, Any, Tuple
+
+from PIL import Image
+
+# 용도별 인코딩 정책 (MEDIA_ENCODING_POLICY 환경변수 JSON으로 항목별 덮어쓰기)
+#   encoder: png(무손실, 압축만) / png-optimized(256색 양자화) / webp-lossless / webp / jpeg
+#   max_side: 긴 변 최대 픽셀 (None이면 원본 해상도)
+# storage는 저장소에 넣는 원본, thumb/preview/full은 저장 후 백그라운드로 만드는 파생본
+DEFAULT_ENCODING_POLICY: Dict[str, Dict[str, Any]] = {
+    "storage": {"encoder": "webp-lossless", "quality": 80, "max_side": None},
+    "thumb": {"encoder": "webp", "quality": 75, "max_side": 320},
+    "preview": {"encoder": "jpeg", "quality": 85, "max_side": 1024},
+    "full": {"encoder": "webp", "quality": 90, "max_side": None},
+}
+# 파생본 이름, 작은 것부터 (pick_variant가 이 순서로 고름)
+VARIANT_ORDER = ["thumb", "preview", "full"]
+VARIANT_MAX_WORKERS = max(1, min(2, (os.cpu_count() or 1) - 1))
+
+_MIME_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+def _load_encoding_policy() -> Dict[str, Dict[str, Any]]:
+    policy = {use: dict(spec) for use, spec in DEFAULT_ENCODING_POLICY.items()}
+    override = os.environ.get("MEDIA_ENCODING_POLICY")
+    if override:
+        try:
+            for use, spec in json.loads(override).items():
+                policy.setdefault(use, {}).update(spec)
+        except ValueError:
+            pass
+    return policy
+
+
+ENCODING_POLICY = _load_encoding_policy()
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def create_thumbnail(image: Image.Image, max_size: Tuple[int, int] = (300, 300)) -> Image.Image:
+    """
+    썸네일 생성 (비율 유지, 축소만)
+    """
+    img_copy = image.copy()
+    img_copy.thumbnail(max_size, Image.Resampling.LANCZOS)
+    return img_copy
+
+
+def encode_image(img: Image.Image, encoder: str, quality: int = 85) -> Tuple[bytes, str]:
+    """
+    정책의 encoder로 인코딩
+
+    Returns:
+        (바이트, MIME 타입)
+    """
+    buffer = BytesIO()
+    if encoder in ("png", "png-optimized"):
+        if encoder == "png-optimized" and img.mode != "P":
+            # RGBA는 median cut을 지원하지 않으므로 fast octree
+            method = Image.Quantize.FASTOCTREE if img.mode == "RGBA" else Image.Quantize.MEDIANCUT
+            img = img.quantize(colors=256, method=method, dither=Image.Dither.FLOYDSTEINBERG)
+        # optimize=True(zlib 최대 압축)는 풀컬러 1024px에서 수 초 걸리므로 팔레트 이미지에만
+        img.save(buffer, format="PNG", optimize=encoder == "png-optimized")
+        return buffer.getvalue(), _MIME_TYPES["png"]
+    if encoder in ("webp", "webp-lossless"):
+        lossless = encoder == "webp-lossless"
+        # 무손실에서 quality는 압축 노력도 (높을수록 작고 느림)
+        img.save(buffer, format="WEBP", lossless=lossless, quality=quality, method=4)
+        return buffer.getvalue(), _MIME_TYPES["webp"]
+    if encoder == "jpeg":
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+        return buffer.getvalue(), _MIME_TYPES["jpeg"]
+    raise ValueError(f"알 수 없는 이미지 인코더: {encoder}")
+
+
+def _encode(img: Image.Image, spec: Dict[str, Any]) -> Dict[str, Any]:
+    if spec.get("max_side") and max(img.size) > spec["max_side"]:
+        img = create_thumbnail(img, (spec["max_side"], spec["max_side"]))
+    data, mime_type = encode_image(img, spec["encoder"], spec.get("quality", 85))
+    return {"data": data, "mime_type": mime_type, "width": img.width, "height": img.height}
+
+
+def _open(data: bytes) -> Image.Image:
+    img = Image.open(BytesIO(data))
+    img.load()
+    if img.mode not in ("RGB", "RGBA", "L"):
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+    return img
+
+
+def make_variants(data: bytes, policy: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    원본 이미지를 한 번 디코딩해 VARIANT_ORDER의 파생본을 모두 인코딩 (프로세스 풀 워커에서 실행)
+
+    Returns:
+        {이름: {"data", "mime_type", "width", "height"}}
+    """
+    policy = policy or ENCODING_POLICY
+    img = _open(data)
+    return {name: _encode(img, policy[name]) for name in VARIANT_ORDER}
+
+
+def encode_for_storage(data: bytes, policy: Optional[Dict[str, Dict[str, Any]]] = None) -> bytes:
+    """
+    저장용 재인코딩 (policy["storage"]) - 결과가 원본보다 크거나 디코딩할 수 없으면 원본 그대로
+    """
+    spec = (policy or ENCODING_POLICY)["storage"]
+    try:
+        encoded = _encode(_open(data), spec)["data"]
+    except Exception:
+        return data
+    return encoded if len(encoded) < len(data) else data
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # fork는 스레드(Streamlit/DB 풀)가 있는 프로세스에서 안전하지 않으므로 spawn
+                _pool = ProcessPoolExecutor(max_workers=VARIANT_MAX_WORKERS, mp_context=get_context("spawn"))
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def _submit(fn, *args) -> Future:
+    """프로세스 풀에 제출 (풀을 띄울 수 없는 환경이면 현재 프로세스에서 실행한 완료된 Future)"""
+    try:
+        return _get_pool().submit(fn, *args)
+    except Exception:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def submit_variants(data: bytes) -> Future:
+    """파생본 생성을 프로세스 풀에 제출 (요청 스레드는 인코딩을 기다리지 않음)"""
+    # 부모 프로세스의 정책을 넘겨 워커의 환경변수와 어긋나지 않도록
+    return _submit(make_variants, data, ENCODING_POLICY)
+
+
+def pick_variant(variants: Dict[str, Any], min_side: Optional[int] = None) -> Optional[str]:
+    """
+    긴 변이 min_side 이상인 가장 작은 파생본 이름 (없으면 가장 큰 것, 파생본이 없으면 None)
+
+    variants 값은 width/height 속성을 가진 객체 (media_store.MediaHandle)
+    """
+    available = [name for name in VARIANT_ORDER if variants.get(name) is not None]
+    if not available:
+        return None
+    if min_side is None:
+        return available[-1]
+    for name in available:
+        variant = variants[name]
+        if max(variant.width or 0, variant.height or 0) >= min_side:
+            return name
+    return available[-1]
+
+
+def image_extension(data: bytes) -> str:
+    """파일 시그니처로 확장자 판별 (ZIP 항목 이름용, 모르면 png)"""
+    if data[:3] == b"\xff\xd8\xff":
+        return "jpg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return "png"
+
+
+def image_mime_type(data: bytes) -> str:
+    extension = image_extension(data)
+    return _MIME_TYPES["jpeg" if extension == "jpg" else extension]
+
+
+def mime_extension(mime_type: Optional[str]) -> str:
+    """MIME 타입 → 확장자 (바이트를 읽지 않고 MediaHandle 메타데이터로 ZIP 항목 이름을 정할 때)"""
+    return {"image/jpeg": "jpg", "image/webp": "webp", "image/gif": "gif", "image/avif": "avif"}.get(mime_type or "", "png")
@@ -0,0 +1,173 @@
+import os
+import mmap
+import hashlib
+import tempfile
+from io import BytesIO
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterable, Tuple, BinaryIO
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+MEDIA_ROOT = "data/media"
+CHUNK_SIZE = 1024 * 1024
+
+_MIME_TYPES = {
+    "PNG": "image/png",
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+    "GIF": "image/gif",
+    "AVIF": "image/avif",
+}
+
+
+def media_path(content_hash: str) -> str:
+    """sha256 해시 → data/media/ab/cd/abcd... (2단계 fan-out)"""
+    return os.path.join(MEDIA_ROOT, content_hash[:2], content_hash[2:4], content_hash)
+
+
+def exists(content_hash: str) -> bool:
+    return os.path.exists(media_path(content_hash))
+
+
+def _commit_temp(temp_path: str, content_hash: str):
+    path = media_path(content_hash)
+    if os.path.exists(path):
+        # 동일 내용이 이미 저장되어 있음 (중복 제거)
+        os.remove(temp_path)
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(temp_path, path)
+
+
+def put_stream(chunks: Iterable[bytes]) -> Tuple[str, int]:
+    """
+    청크 단위로 저장 (전체를 메모리에 올리지 않음)
+
+    Returns:
+        (sha256 해시, 바이트 크기)
+    """
+    tmp_dir = os.path.join(MEDIA_ROOT, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                f.write(chunk)
+        content_hash = digest.hexdigest()
+        _commit_temp(temp_path, content_hash)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return content_hash, size
+
+
+def put_bytes(data: bytes) -> str:
+    """바이트 저장 후 sha256 해시 반환 (이미 있으면 쓰지 않음)"""
+    content_hash = hashlib.sha256(data).hexdigest()
+    if not exists(content_hash):
+        put_stream([data])
+    return content_hash
+
+
+def read_bytes(content_hash: str) -> bytes:
+    with open(media_path(content_hash), "rb") as f:
+        return f.read()
+
+
+def open_file(content_hash: str) -> BinaryIO:
+    return open(media_path(content_hash), "rb")
+
+
+def iter_chunks(content_hash: str, chunk_size: int = CHUNK_SIZE) -> Iterable[bytes]:
+    with open_file(content_hash) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+@contextmanager
+def open_mmap(content_hash: str):
+    """읽기 전용 mmap (페이지 캐시를 그대로 사용, 복사 없음)"""
+    with open_file(content_hash) as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield memoryview(b"")
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+def probe_image(data: bytes) -> Dict[str, Any]:
+    """이미지 헤더만 읽어 크기/MIME 추출 (디코딩 없음)"""
+    info: Dict[str, Any] = {"width": None, "height": None, "mime_type": None}
+    if Image is None or not data:
+        return info
+    try:
+        with Image.open(BytesIO(data)) as img:
+            info["width"], info["height"] = img.size
+            info["mime_type"] = _MIME_TYPES.get(img.format, Image.MIME.get(img.format))
+    except Exception:
+        pass
+    return info
+
+
+class MediaHandle:
+    """
+    저장된 미디어에 대한 지연 로딩 핸들
+
+    목록 조회 시에는 메타데이터만 들고 있다가, 실제로 화면에 그릴 때
+    처음 한 번만 파일을 읽고 디코딩한다 (디코딩 결과는 핸들에 캐시).
+    """
+
+    def __init__(
+        self,
+        content_hash: str,
+        mime_type: Optional[str] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        byte_size: Optional[int] = None
+    ):
+        self.content_hash = content_hash
+        self.mime_type = mime_type
+        self.width = width
+        self.height = height
+        self.byte_size = byte_size
+        self._image = None
+
+    @property
+    def path(self) -> str:
+        return media_path(self.content_hash)
+
+    def read(self) -> bytes:
+        """원본 바이트 (캐시하지 않음 - 세션 메모리에 바이트를 들고 있지 않도록)"""
+        return read_bytes(self.content_hash)
+
+    def iter_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterable[bytes]:
+        """청크 단위 읽기 (ZIP 스트리밍 등 전체를 메모리에 올리지 않을 때)"""
+        return iter_chunks(self.content_hash, chunk_size)
+
+    @property
+    def image(self):
+        if self._image is None:
+            if Image is None:
+                raise RuntimeError("Pillow가 설치되어 있지 않습니다")
+            with open_file(self.content_hash) as f:
+                img = Image.open(f)
+                img.load()
+            self._image = img
+        return self._image
+
+    def __repr__(self) -> str:
+        return f"MediaHandle({self.content_hash[:12]}, {self.mime_type}, {self.width}x{self.height})"
@@ -0,0 +1,300 @@
+import os
+import json
+import time
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Iterator, List
+
+import httpx
+from openai import OpenAI, RateLimitError
+
+# 우선순위 (숫자가 작을수록 먼저) - 화면에서 기다리는 요청이 일괄 작업보다 앞선다
+INTERACTIVE = 0
+BATCH = 1
+
+# HTTP 연결 풀 (프로세스 전체에서 keep-alive 연결 재사용)
+MAX_CONNECTIONS = 32
+MAX_KEEPALIVE_CONNECTIONS = 16
+KEEPALIVE_EXPIRY = 60.0
+REQUEST_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+MAX_RETRIES = 2
+
+# 동시에 진행 중인 요청 수 상한과, 그중 일괄 작업이 못 쓰는 (대화형 전용) 슬롯 수
+MAX_IN_FLIGHT = 8
+INTERACTIVE_RESERVED = 2
+
+# 모델별 분당 요청/토큰 한도 (OPENAI_RATE_LIMITS 환경변수 JSON으로 덮어쓰기)
+DEFAULT_RATE_LIMITS: Dict[str, Dict[str, int]] = {
+    "gpt-4o": {"rpm": 500, "tpm": 30000},
+    "gpt-4o-mini": {"rpm": 500, "tpm": 200000},
+    "gpt-4.1-mini": {"rpm": 500, "tpm": 200000},
+    "dall-e-3": {"rpm": 7},
+    "dall-e-2": {"rpm": 50},
+    "gpt-image-1": {"rpm": 5},
+}
+FALLBACK_RATE_LIMIT = {"rpm": 60, "tpm": 30000}
+
+
+def _load_rate_limits() -> Dict[str, Dict[str, int]]:
+    limits = {model: dict(limit) for model, limit in DEFAULT_RATE_LIMITS.items()}
+    override = os.environ.get("OPENAI_RATE_LIMITS")
+    if override:
+        try:
+            for model, limit in json.loads(override).items():
+                limits.setdefault(model, {}).update(limit)
+        except ValueError:
+            pass
+    return limits
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (한글 비중이 높아 글자 2개당 1토큰 정도로 보수적으로 추정)"""
+    return max(1, len(text) // 2)
+
+
+class _Bucket:
+    """분당 한도를 초당 균등하게 채우는 토큰 버킷"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        # 한도보다 큰 요청은 버킷이 가득 찼을 때 통과 (영원히 막히지 않도록)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+
+class RateScheduler:
+    """
+    모델별 RPM/TPM 토큰 버킷 + 전체 동시 요청 상한 + 우선순위 대기열
+
+    - 대기 중인 요청은 (우선순위, 도착 순서)로 정렬되고, 같은 모델에서는
+      가장 앞선 요청만 한도를 확인한다 (뒤의 작은 일괄 요청이 끼어들지 않음)
+    - 다른 모델 요청은 서로 막지 않는다 (head-of-line blocking 방지)
+    - 429를 받으면 해당 모델을 retry-after 동안 멈춘다
+    - 실제 사용 토큰은 응답의 usage로 정산
+    """
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, interactive_reserved: int = INTERACTIVE_RESERVED):
+        self.max_in_flight = max_in_flight
+        self.interactive_reserved = interactive_reserved
+        self.limits = _load_rate_limits()
+        self.in_flight = 0
+        self._cond = threading.Condition()
+        self._waiting: List[tuple] = []
+        self._seq = itertools.count()
+        self._rpm: Dict[str, _Bucket] = {}
+        self._tpm: Dict[str, Optional[_Bucket]] = {}
+        self._paused_until: Dict[str, float] = {}
+        self.stats = {"granted": 0, "rate_limited": 0, "wait_seconds": 0.0}
+
+    def _buckets(self, model: str):
+        if model not in self._rpm:
+            limit = self.limits.get(model, FALLBACK_RATE_LIMIT)
+            self._rpm[model] = _Bucket(limit.get("rpm", FALLBACK_RATE_LIMIT["rpm"]))
+            self._tpm[model] = _Bucket(limit["tpm"]) if limit.get("tpm") else None
+        return self._rpm[model], self._tpm[model]
+
+    def _wait_time(self, model: str, tokens: int, priority: int, now: float) -> Optional[float]:
+        """지금 통과 가능하면 0, 시간이 지나면 가능하면 대기 초, 슬롯이 나야 하면 None"""
+        capacity = self.max_in_flight if priority == INTERACTIVE else self.max_in_flight - self.interactive_reserved
+        if self.in_flight >= capacity:
+            return None
+        rpm, tpm = self._buckets(model)
+        rpm.refill(now)
+        wait = max(rpm.wait_time(1), self._paused_until.get(model, 0.0) - now)
+        if tpm is not None:
+            tpm.refill(now)
+            wait = max(wait, tpm.wait_time(tokens))
+        return max(wait, 0.0)
+
+    def acquire(self, model: str, tokens: int = 0, priority: int = INTERACTIVE, deadline: Optional[float] = None):
+        """슬롯 획득까지 대기 (deadline은 time.monotonic() 기준, 지나면 TimeoutError)"""
+        entry = (priority, next(self._seq), model)
+        started = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    # 같은 모델에서 나보다 앞선 대기 요청이 있으면 양보
+                    ahead = any(w < entry and w[2] == model for w in self._waiting)
+                    wait = None if ahead else self._wait_time(model, tokens, priority, now)
+                    if wait == 0.0:
+                        break
+                    timeout = wait if wait is not None else 1.0
+                    if deadline is not None:
+                        if now >= deadline:
+                            raise TimeoutError("rate limit slot wait exceeded deadline")
+                        timeout = min(timeout, deadline - now)
+                    self._cond.wait(timeout=timeout)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+            rpm, tpm = self._buckets(model)
+            rpm.level -= 1
+            if tpm is not None:
+                tpm.level -= tokens
+            self.in_flight += 1
+            self.stats["granted"] += 1
+            self.stats["wait_seconds"] += time.monotonic() - started
+            self._cond.notify_all()
+
+    def release(self, model: str, estimated_tokens: int = 0, used_tokens: Optional[int] = None):
+        with self._cond:
+            self.in_flight -= 1
+            _, tpm = self._buckets(model)
+            if tpm is not None and used_tokens is not None:
+                # 추정치와 실제 사용량 차이 정산
+                tpm.level = min(tpm.capacity, tpm.level + estimated_tokens - used_tokens)
+            self._cond.notify_all()
+
+    def pause(self, model: str, seconds: float):
+        with self._cond:
+            self._paused_until[model] = max(self._paused_until.get(model, 0.0), time.monotonic() + seconds)
+            self.stats["rate_limited"] += 1
+            self._cond.notify_all()
+
+    def pause_for(self, model: str, error: RateLimitError):
+        """429 응답의 retry-after (없으면 10초) 동안 해당 모델 요청 중지"""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            self.pause(model, float(retry_after) if retry_after else 10.0)
+        except ValueError:
+            self.pause(model, 10.0)
+
+    @contextmanager
+    def slot(self, model: str, tokens: int = 0, priority: int = INTERACTIVE, deadline: Optional[float] = None):
+        """
+        with scheduler.slot(model, tokens) as usage:
+            response = ...
+            usage["total_tokens"] = response.usage.total_tokens
+        """
+        self.acquire(model, tokens, priority, deadline)
+        usage: Dict[str, Any] = {}
+        try:
+            yield usage
+        except RateLimitError as e:
+            self.pause_for(model, e)
+            raise
+        finally:
+            self.release(model, tokens, usage.get("total_tokens"))
+
+
+_client: Optional[OpenAI] = None
+_scheduler: Optional[RateScheduler] = None
+_lock = threading.Lock()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def _client_options() -> Dict[str, Any]:
+    """
+    OPENAI_BASE_URL로 접속 주소 변경 (예: tools/mock_openai 오프라인 서버)
+
+    대체 서버는 키를 검사하지 않으므로 키가 없으면 임의 값을 넣는다
+    """
+    base_url = os.environ.get("OPENAI_BASE_URL") or None
+    api_key = os.environ.get("OPENAI_API_KEY") or ("offline" if base_url else None)
+    return {"api_key": api_key, "base_url": base_url, "max_retries": MAX_RETRIES}
+
+
+def get_client() -> OpenAI:
+    """프로세스 공용 동기 클라이언트 (keep-alive 연결 풀 공유)"""
+    global _client
+    with _lock:
+        if _client is None:
+            _client = OpenAI(
+                http_client=httpx.Client(limits=_limits(), timeout=REQUEST_TIMEOUT),
+                **_client_options(),
+            )
+        return _client
+
+
+def get_scheduler() -> RateScheduler:
+    global _scheduler
+    with _lock:
+        if _scheduler is None:
+            _scheduler = RateScheduler()
+        return _scheduler
+
+
+def _chat_tokens(kwargs: Dict[str, Any]) -> int:
+    text = "".join(str(m.get("content", "")) for m in kwargs.get("messages", []))
+    return estimate_tokens(text) + kwargs.get("max_tokens", 1000)
+
+
+def _usage_tokens(response) -> Optional[int]:
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", None) if usage is not None else None
+
+
+def chat_completion(priority: int = INTERACTIVE, **kwargs):
+    """
+    스케줄러를 거친 chat.completions.create
+
+    stream=True면 스트림을 모두 읽을 때까지 동시 요청 슬롯을 유지하는 제너레이터 반환
+    """
+    model = kwargs["model"]
+    tokens = _chat_tokens(kwargs)
+    if kwargs.get("stream"):
+        return _stream_chat(priority, model, tokens, kwargs)
+    with get_scheduler().slot(model, tokens, priority) as usage:
+        response = get_client().chat.completions.create(**kwargs)
+        usage["total_tokens"] = _usage_tokens(response)
+        return response
+
+
+def _stream_chat(priority: int, model: str, tokens: int, kwargs: Dict[str, Any]) -> Iterator[Any]:
+    with get_scheduler().slot(model, tokens, priority):
+        yield from get_client().chat.completions.create(**kwargs)
+
+
+def create_response(priority: int = INTERACTIVE, **kwargs):
+    """스케줄러를 거친 responses.create"""
+    model = kwargs["model"]
+    tokens = estimate_tokens(str(kwargs.get("input", ""))) + kwargs.get("max_output_tokens", 1000)
+    with get_scheduler().slot(model, tokens, priority) as usage:
+        response = get_client().responses.create(**kwargs)
+        usage["total_tokens"] = _usage_tokens(response)
+        return response
+
+
+def _client_until(deadline: Optional[float]) -> OpenAI:
+    """deadline까지 남은 시간을 HTTP 타임아웃으로 건 클라이언트 (시간이 지나면 진행 중 요청도 끊김)"""
+    client = get_client()
+    if deadline is None:
+        return client
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("deadline exceeded before request")
+    return client.with_options(timeout=remaining, max_retries=0)
+
+
+def generate_image(priority: int = INTERACTIVE, deadline: Optional[float] = None, **kwargs):
+    """
+    스케줄러를 거친 images.generate (이미지 모델은 분당 요청 수만 제한)
+
+    deadline(time.monotonic() 기준)을 주면 슬롯 대기와 HTTP 요청 모두 그 시각에 중단
+    """
+    with get_scheduler().slot(kwargs["model"], 0, priority, deadline):
+        return _client_until(deadline).images.generate(**kwargs)
+
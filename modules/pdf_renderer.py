@@ -0,0 +1,378 @@
+import io
+import json
+import threading
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Union
+
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, StyleSheet1, getSampleStyleSheet
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import CondPageBreak, Flowable, Image, KeepTogether, PageBreak, Paragraph, SimpleDocTemplate, Spacer
+
+# ReportLab 내장 한글 CID 폰트 (등록 실패 시 Helvetica - 한글은 깨지지만 PDF는 만들어짐)
+FONT_NAME = "HYSMyeongJo-Medium"
+FALLBACK_FONT = "Helvetica"
+PAGE_SIZE = A4
+DEFAULT_MARGIN = 50
+REPORT_HEADING = "정책 보고서"
+# 보고서 이미지 최대 크기 (pt, 비율 유지)
+REPORT_IMAGE_SIZE = (450, 200)
+# 보고서에서 번호 붙은 절로 그리는 분석 항목 - 그 밖의 항목은 뒤에 JSON 그대로
+REPORT_SECTIONS = (
+    "policy_planning",
+    "execution_plan",
+    "communication_strategy",
+    "content_briefs",
+    "marketing_materials",
+    "performance_metrics",
+    "stakeholder_management",
+)
+
+_lock = threading.Lock()
+_font_name: Optional[str] = None
+_renderer: Optional["PdfRenderer"] = None
+
+
+def register_fonts() -> str:
+    """한글 폰트를 프로세스당 한 번만 등록하고 사용할 폰트 이름 반환"""
+    global _font_name
+    if _font_name is None:
+        with _lock:
+            if _font_name is None:
+                try:
+                    pdfmetrics.registerFont(UnicodeCIDFont(FONT_NAME))
+                    _font_name = FONT_NAME
+                except Exception:
+                    _font_name = FALLBACK_FONT
+    return _font_name
+
+
+def escape(text: Any) -> str:
+    """Paragraph 마크업으로 해석되지 않도록 &, <, > 이스케이프"""
+    return str(text).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+class PdfRenderer:
+    """
+    폰트/스타일/페이지 템플릿을 미리 만들어 두고 보고서마다 재사용하는 PDF 렌더러 (get_renderer()로 공유)
+
+    - styles의 스타일로 story를 만들고 build(story) - 모든 페이지에 같은 바닥글(제목, 쪽 번호)
+    - 정책 보고서: policy_report() (표지, 분석 항목, 이미지, 영상 프롬프트)
+    문단은 페이지 폭에 맞춰 줄바꿈(한글은 글자 단위). 스타일은 만든 뒤 수정하지 않으므로
+    여러 스레드에서 함께 써도 된다.
+    """
+
+    def __init__(self, font_name: Optional[str] = None):
+        self.font_name = font_name or register_fonts()
+        self.styles = self._build_styles(self.font_name)
+
+    @staticmethod
+    def _build_styles(font_name: str) -> StyleSheet1:
+        styles = getSampleStyleSheet()
+        for name in styles.byName:
+            styles[name].fontName = font_name
+            styles[name].wordWrap = "CJK"
+        styles["Normal"].fontSize = 10
+        styles["Normal"].leading = 14
+        styles.add(ParagraphStyle(
+            "ReportTitle",
+            parent=styles["Heading1"],
+            fontName=font_name,
+            fontSize=18,
+            alignment=TA_CENTER,
+            spaceAfter=30
+        ))
+        styles.add(ParagraphStyle(
+            "ReportHeading",
+            parent=styles["Heading2"],
+            fontName=font_name,
+            fontSize=14,
+            spaceAfter=12
+        ))
+        styles.add(ParagraphStyle(
+            "ReportLabel",
+            parent=styles["Normal"],
+            fontSize=11,
+            leading=16,
+            spaceBefore=4
+        ))
+        styles.add(ParagraphStyle(
+            "ReportItem",
+            parent=styles["Normal"],
+            leftIndent=12
+        ))
+        styles.add(ParagraphStyle(
+            "ReportCode",
+            parent=styles["Normal"],
+            fontSize=9,
+            leading=12
+        ))
+        return styles
+
+    def paragraph(self, text: Any, style: str = "Normal") -> Paragraph:
+        """일반 텍스트 문단 (마크업 이스케이프)"""
+        return Paragraph(escape(text), self.styles[style])
+
+    def text_lines(self, text: str, style: str = "Normal", limit: Optional[int] = None) -> List[Flowable]:
+        """여러 줄 텍스트(JSON 등)를 줄마다 문단으로 (limit는 최대 줄 수, 빈 줄은 간격)"""
+        lines = text.split("\n")
+        leading = self.styles[style].leading
+        return [
+            self.paragraph(line, style) if line.strip() else Spacer(1, leading)
+            for line in (lines[:limit] if limit else lines)
+        ]
+
+    def document(self, fileobj: BinaryIO, margin: int = DEFAULT_MARGIN) -> SimpleDocTemplate:
+        return SimpleDocTemplate(
+            fileobj,
+            pagesize=PAGE_SIZE,
+            rightMargin=margin,
+            leftMargin=margin,
+            topMargin=margin,
+            bottomMargin=margin,
+        )
+
+    def _draw_footer(self, c: Canvas, doc: SimpleDocTemplate, footer: str):
+        c.saveState()
+        c.setFont(self.font_name, 8)
+        y = doc.bottomMargin / 2
+        if footer:
+            c.drawString(doc.leftMargin, y, footer[:60])
+        c.drawRightString(PAGE_SIZE[0] - doc.rightMargin, y, str(doc.page))
+        c.restoreState()
+
+    def build(self, story: Iterable[Flowable], margin: int = DEFAULT_MARGIN, footer: str = "") -> bytes:
+        """story를 A4 PDF로 렌더링 (모든 페이지 바닥글: footer, 쪽 번호)"""
+        buffer = io.BytesIO()
+        on_page = lambda c, doc: self._draw_footer(c, doc, footer)
+        self.document(buffer, margin).build(list(story), onFirstPage=on_page, onLaterPages=on_page)
+        return buffer.getvalue()
+
+    def image(self, source: Union[bytes, str], max_size=REPORT_IMAGE_SIZE) -> Image:
+        """이미지 flowable (bytes 또는 파일 경로, 비율 유지하며 max_size 안으로)"""
+        width, height = ImageReader(source if isinstance(source, str) else io.BytesIO(source)).getSize()
+        scale = min(max_size[0] / width, max_size[1] / height)
+        return Image(
+            source if isinstance(source, str) else io.BytesIO(source),
+            width=width * scale,
+            height=height * scale,
+            hAlign="LEFT"
+        )
+
+    def policy_report(
+        self,
+        policy: Dict[str, Any],
+        analysis: Optional[Dict[str, Any]],
+        images: Optional[List[Union[bytes, str]]] = None,
+        video_prompts: Optional[List[str]] = None,
+        heading: str = REPORT_HEADING
+    ) -> bytes:
+        """
+        정책 보고서 PDF - 표지, 분석 항목 전체, 이미지, 영상 프롬프트
+
+        images는 bytes 또는 이미지 파일 경로 (경로는 ReportLab이 직접 읽음)
+        """
+        footer = f"{heading} - {policy['title']}" if policy.get("title") else heading
+        return self.build(self.policy_report_story(policy, analysis, images, video_prompts, heading), footer=footer)
+
+    def policy_report_story(
+        self,
+        policy: Dict[str, Any],
+        analysis: Optional[Dict[str, Any]],
+        images: Optional[List[Union[bytes, str]]] = None,
+        video_prompts: Optional[List[str]] = None,
+        heading: str = REPORT_HEADING
+    ) -> List[Flowable]:
+        """policy_report의 본문 flowable 목록"""
+        p = self.paragraph
+        story: List[Flowable] = []
+
+        def section(text):
+            # 페이지 끝에 제목만 남지 않도록
+            story.append(CondPageBreak(150))
+            story.append(p(text, "ReportHeading"))
+
+        def label(text):
+            story.append(p(text, "ReportLabel"))
+
+        def item(text):
+            story.append(p(text, "ReportItem"))
+
+        # 표지
+        story.append(p(heading, "ReportTitle"))
+        if policy.get("title"):
+            story.append(p(f"제목: {policy['title']}", "ReportLabel"))
+        for name, key in (("카테고리", "category"), ("대상", "target_audience"), ("생성일", "created_at")):
+            if policy.get(key):
+                story.append(p(f"{name}: {policy[key]}"))
+        if policy.get("description"):
+            story.append(Spacer(1, 12))
+            story.append(p(f"설명: {policy['description']}"))
+
+        if not analysis:
+            return story
+
+        story.append(PageBreak())
+
+        # ===== 1. 정책 기획 =====
+        if "policy_planning" in analysis:
+            section("1. 정책 기획")
+            planning = analysis["policy_planning"]
+
+            if planning.get("objective"):
+                label(f"[목표] {planning['objective']}")
+
+            if planning.get("target_analysis"):
+                label(f"[대상 분석] {planning['target_analysis']}")
+
+            if planning.get("key_strategies"):
+                label("[핵심 전략]")
+                for idx, s in enumerate(planning["key_strategies"][:8], 1):
+                    item(f"{idx}. {s}")
+
+            if planning.get("expected_outcomes"):
+                label("[기대 효과]")
+                for o in planning["expected_outcomes"][:5]:
+                    item(f"• {o}")
+
+        # ===== 2. 실행 계획 =====
+        if "execution_plan" in analysis:
+            section("2. 실행 계획")
+            execution = analysis["execution_plan"]
+
+            if execution.get("action_items"):
+                label("[실행 항목]")
+                for idx, action in enumerate(execution["action_items"][:8], 1):
+                    item(f"{idx}. {action.get('action', '')}")
+
+            if execution.get("resources_needed"):
+                res = execution["resources_needed"]
+                label("[필요 자원]")
+                if res.get("budget_range"):
+                    item(f"예산: {res['budget_range']}")
+                if res.get("personnel"):
+                    item(f"인력: {res['personnel']}")
+
+        # ===== 3. 커뮤니케이션 전략 =====
+        if "communication_strategy" in analysis:
+            section("3. 커뮤니케이션 전략")
+            comm = analysis["communication_strategy"]
+
+            if comm.get("key_messages"):
+                label("[핵심 메시지]")
+                for idx, msg in enumerate(comm["key_messages"][:8], 1):
+                    item(f"{idx}. {msg}")
+
+            if comm.get("channels"):
+                label("[채널 전략]")
+                for ch in comm["channels"][:5]:
+                    item(f"• {ch.get('channel', '')}: {ch.get('content_type', '')}")
+
+        # ===== 4. 콘텐츠 제작 브리프 =====
+        if "content_briefs" in analysis:
+            section("4. 콘텐츠 제작 브리프")
+            briefs = analysis["content_briefs"]
+
+            for key, name in (("image_brief_1", "이미지 브리프 1"), ("image_brief_2", "이미지 브리프 2")):
+                if key in briefs:
+                    label(f"[{name}]")
+                    item(f"컨셉: {briefs[key].get('concept', '')}")
+                    item(f"장면: {briefs[key].get('scene_description', '')}")
+
+            if "video_brief" in briefs:
+                label("[영상 브리프]")
+                item(f"스토리: {briefs['video_brief'].get('narrative_arc', '')}")
+
+        # ===== 5. 마케팅 자료 =====
+        if "marketing_materials" in analysis:
+            section("5. 마케팅 자료")
+            mk = analysis["marketing_materials"]
+
+            if mk.get("slogan"):
+                label(f"[슬로건] {mk['slogan']}")
+
+            if mk.get("tagline"):
+                label(f"[태그라인] {mk['tagline']}")
+
+            if mk.get("elevator_pitch"):
+                label(f"[엘리베이터 피치] {mk['elevator_pitch']}")
+
+            if mk.get("social_media_posts"):
+                label("[소셜미디어 콘텐츠]")
+                for idx, post in enumerate(mk["social_media_posts"][:5], 1):
+                    item(f"{idx}. {post.get('platform', '')}: {post.get('content', '')}")
+
+        # ===== 6. 성과 지표 (KPI) =====
+        if "performance_metrics" in analysis:
+            section("6. 성과 지표 (KPI)")
+            metrics = analysis["performance_metrics"]
+
+            if metrics.get("kpi_framework"):
+                label("[KPI 프레임워크]")
+                for idx, kpi in enumerate(metrics["kpi_framework"][:8], 1):
+                    item(f"{idx}. {kpi.get('metric', '')}")
+                    if kpi.get("target_range"):
+                        item(f"   목표: {kpi['target_range']}")
+
+            if metrics.get("success_criteria"):
+                label("[성공 기준]")
+                for sc in metrics["success_criteria"][:5]:
+                    item(f"• {sc}")
+
+        # ===== 7. 이해관계자 관리 =====
+        if "stakeholder_management" in analysis:
+            section("7. 이해관계자 관리")
+            sh = analysis["stakeholder_management"]
+
+            if sh.get("stakeholders"):
+                label("[이해관계자 분석]")
+                for idx, s in enumerate(sh["stakeholders"][:6], 1):
+                    item(f"{idx}. {s.get('group', '')}: {s.get('interests', '')}")
+
+            if sh.get("objection_handling"):
+                label("[반대 의견 대응]")
+                for obj in sh["objection_handling"][:4]:
+                    item(f"• 반대: {obj.get('objection', '')}")
+                    item(f"  대응: {obj.get('response', '')}")
+
+        # ===== 그 밖의 항목 (다른 형식의 분석 결과는 JSON 그대로, 잘라내지 않음) =====
+        for key, value in analysis.items():
+            if key in REPORT_SECTIONS:
+                continue
+            section(str(key).upper())
+            text = json.dumps(value, ensure_ascii=False, indent=2) if isinstance(value, (dict, list)) else str(value)
+            story.extend(self.text_lines(text, "ReportCode"))
+
+        # ===== 8. 생성된 이미지 =====
+        if images:
+            section("8. 생성된 이미지")
+            for idx, source in enumerate(images[:4], 1):
+                try:
+                    story.append(KeepTogether([self.image(source), p(f"이미지 {idx}"), Spacer(1, 12)]))
+                except Exception:
+                    pass
+
+        # ===== 9. 영상 프롬프트 =====
+        if video_prompts:
+            story.append(PageBreak())
+            story.append(p("9. 영상 프롬프트", "ReportHeading"))
+            for idx, prompt in enumerate(video_prompts[:9], 1):
+                label(f"[영상 {idx}]")
+                story.append(p(prompt[:600], "ReportItem"))
+                story.append(Spacer(1, 8))
+
+        return story
+
+
+def get_renderer() -> PdfRenderer:
+    """프로세스 공용 렌더러 (처음 호출할 때 폰트 등록/스타일 생성)"""
+    global _renderer
+    if _renderer is None:
+        font_name = register_fonts()
+        with _lock:
+            if _renderer is None:
+                _renderer = PdfRenderer(font_name)
+    return _renderer
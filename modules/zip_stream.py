@@ -0,0 +1,116 @@
+import os
+import shutil
+import zipfile
+import tempfile
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple, BinaryIO
+
+# 이 크기까지는 메모리, 넘으면 임시 파일로 넘어감
+SPOOL_MAX_MEMORY = 16 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+# 다시 deflate해도 거의 줄지 않는 형식 (ZIP_STORED로 저장)
+COMPRESSED_EXTENSIONS = {"png", "jpg", "jpeg", "webp", "gif", "avif", "pdf", "zip", "mp4"}
+
+# (ZIP 안 경로, 내용) - 내용은 str/bytes, iter_chunks()가 있는 핸들(MediaHandle 등), 파일 경로(os.PathLike),
+# 열린 바이너리 파일 객체(닫는 것은 호출하는 쪽), 또는 호출 시점에 bytes/str을 만드는 함수
+# (항목을 쓸 차례가 되어서야 읽거나 생성)
+ZipEntry = Tuple[str, Any]
+
+
+def zip_compress_type(filename: str) -> int:
+    """이미 압축된 형식은 ZIP_STORED, 나머지(JSON/텍스트 등)는 ZIP_DEFLATED"""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return zipfile.ZIP_STORED if extension in COMPRESSED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+
+def _write_entry(zf: zipfile.ZipFile, name: str, content: Any):
+    if callable(content):
+        content = content()
+    if content is None:
+        return
+    compress_type = zip_compress_type(name)
+    if isinstance(content, os.PathLike):
+        zf.write(content, name, compress_type=compress_type)
+        return
+    if hasattr(content, "iter_chunks"):
+        # 파일 저장소에서 청크 단위로 복사 (이미지 전체를 메모리에 올리지 않음)
+        info = zipfile.ZipInfo(name)
+        info.compress_type = compress_type
+        with zf.open(info, "w", force_zip64=True) as dest:
+            for chunk in content.iter_chunks():
+                dest.write(chunk)
+        return
+    if hasattr(content, "read"):
+        info = zipfile.ZipInfo(name)
+        info.compress_type = compress_type
+        with zf.open(info, "w", force_zip64=True) as dest:
+            shutil.copyfileobj(content, dest, CHUNK_SIZE)
+        return
+    zf.writestr(name, content, compress_type=compress_type)
+
+
+def write_zip(fileobj: BinaryIO, entries: Iterable[ZipEntry], progress: Optional[Callable[[str], None]] = None):
+    """항목을 하나씩 fileobj에 기록 (seek 불가능한 스트림도 가능, progress는 항목마다 이름과 함께 호출)"""
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, content in entries:
+            _write_entry(zf, name, content)
+            if progress:
+                progress(name)
+
+
+def spool_zip(
+    entries: Iterable[ZipEntry],
+    max_memory: int = SPOOL_MAX_MEMORY,
+    progress: Optional[Callable[[str], None]] = None
+) -> BinaryIO:
+    """
+    SpooledTemporaryFile에 ZIP을 기록하고 처음 위치로 되감아 반환
+
+    작은 아카이브는 메모리에서 끝나고, 큰 아카이브는 디스크로 넘어가므로
+    아카이브 전체를 bytes로 한 번 더 복사하는 일이 없다. 다 쓴 뒤 close() 할 것.
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    try:
+        write_zip(spooled, entries, progress)
+    except BaseException:
+        spooled.close()
+        raise
+    spooled.seek(0)
+    return spooled
+
+
+class _ChunkSink:
+    """ZipFile이 쓰는 내용을 모아 두었다가 iter_zip이 꺼내 가는 쓰기 전용 스트림 (seek 불가)"""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self._chunks = self._chunks, []
+        return iter(chunks)
+
+
+def iter_zip(entries: Iterable[ZipEntry]) -> Iterator[bytes]:
+    """
+    ZIP을 청크 단위로 생성 (HTTP 응답 등에 바로 흘려보낼 때)
+
+    항목 하나를 쓸 때마다 그동안 쌓인 바이트를 내보내므로, 메모리에는
+    가장 큰 항목 하나의 압축 결과 정도만 남는다 (핸들 항목은 청크 단위).
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, content in entries:
+            _write_entry(zf, name, content)
+            yield from sink.drain()
+    yield from sink.drain()
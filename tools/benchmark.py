@@ -0,0 +1,289 @@
+"""
+정책 파이프라인 벤치마크 (오프라인 대체 서버 사용)
+
+    python -m tools.benchmark --policies 20 --payload-chars 80,400 --concurrency 4
+    python -m tools.benchmark --compare data/benchmarks/baseline.json
+
+정책 1건 = 정책 생성 → AI 분석(요청+파싱) → 이미지 프롬프트 → 이미지 생성/디코딩
+→ DB 저장 → PDF → ZIP. 단계별 p50/p95/p99와 최대 RSS를 출력하고 JSON으로 저장한다.
+DB/미디어/캐시는 임시 디렉터리를 사용하므로 data/의 실제 데이터는 건드리지 않는다.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from io import BytesIO
+from datetime import datetime
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from tools.mock_openai import MockConfig, serve, base_url
+
+STAGES = [
+    "policy_create",
+    "analysis",
+    "analysis_parse",
+    "image_prompt",
+    "image_generate",
+    "image_decode",
+    "db_persist",
+    "pdf",
+    "zip",
+    "total",
+]
+BENCH_DIR = "data/benchmarks"
+# 대체 서버 대상이므로 스케줄러 한도가 측정을 왜곡하지 않도록 충분히 크게
+UNTHROTTLED_MODELS = ["gpt-4o", "gpt-4o-mini", "dall-e-2", "dall-e-3"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """선형 보간 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "n": len(samples),
+        "mean_ms": sum(samples) / len(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples) * 1000 if samples else 0.0,
+    }
+
+
+def peak_rss_mb() -> float:
+    # Linux는 KB, macOS는 byte 단위
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Timer:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[name].append(time.perf_counter() - started)
+
+
+def run_policy(index: int, payload_chars: int, images_per_policy: int, image_size: str, timer: Timer):
+    from PIL import Image
+    from modules import database
+    from modules.ai_engine import generate_policy_analysis, generate_image_prompt, parse_json_response
+    from modules.image_generator import generate_images
+    from modules.export_manager import create_zip_export
+    from modules.pdf_renderer import get_renderer
+
+    started = time.perf_counter()
+    policy = {
+        "title": f"벤치마크 정책 {index} ({payload_chars}자)",
+        "category": "환경(대기/미세먼지)",
+        "target_audience": "시민",
+        "description": "미세먼지 저감을 위한 생활 밀착형 정책 " * 4,
+    }
+
+    with timer.stage("policy_create"):
+        policy_id = database.create_policy(**policy)
+
+    with timer.stage("analysis"):
+        analysis, raw = generate_policy_analysis(**policy, use_cache=False)
+    if not analysis:
+        raise RuntimeError(f"analysis failed: {raw[:200]}")
+    with timer.stage("analysis_parse"):
+        parse_json_response(raw)
+
+    briefs = analysis.get("content_briefs", {})
+    brief_list = [briefs.get(f"image_brief_{i}", {}) for i in (1, 2)]
+    with timer.stage("image_prompt"):
+        prompts = [generate_image_prompt(brief_list[i % len(brief_list)]) for i in range(images_per_policy)]
+
+    images: List[bytes] = []
+    for prompt in prompts:
+        with timer.stage("image_generate"):
+            results = generate_images(prompt, size=image_size)
+        for _, img_bytes in results:
+            with timer.stage("image_decode"):
+                Image.open(BytesIO(img_bytes)).convert("RGB")
+            images.append(img_bytes)
+
+    with timer.stage("db_persist"):
+        database.save_generation_run(
+            policy_id=policy_id,
+            contents={"analysis": analysis},
+            media=[
+                {"media_type": "image", "media_data": img, "prompt": prompt, "params": {"size": image_size}}
+                for img, prompt in zip(images, prompts)
+            ],
+            status="completed"
+        )
+
+    with timer.stage("pdf"):
+        get_renderer().policy_report(policy, analysis, images=images)
+    with timer.stage("zip"):
+        create_zip_export(policy, analysis, images).close()
+
+    timer.samples["total"].append(time.perf_counter() - started)
+
+
+def run_scenario(args, payload_chars: int, config: MockConfig) -> Dict[str, Any]:
+    config.payload_chars = payload_chars
+    timer = Timer()
+    errors = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [
+            executor.submit(run_policy, i, payload_chars, args.images, args.image_size, timer)
+            for i in range(args.policies)
+        ]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                errors += 1
+                print(f"  ! {e}", file=sys.stderr)
+    wall = time.perf_counter() - started
+    completed = args.policies - errors
+    return {
+        "payload_chars": payload_chars,
+        "policies": args.policies,
+        "errors": errors,
+        "wall_seconds": wall,
+        "policies_per_second": completed / wall if wall else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": {name: summarize(timer.samples[name]) for name in STAGES if timer.samples.get(name)},
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    base_scenarios = {s["payload_chars"]: s for s in (baseline or {}).get("scenarios", [])}
+    for scenario in report["scenarios"]:
+        print(
+            f"\n[payload {scenario['payload_chars']}자] {scenario['policies']}건, "
+            f"{scenario['wall_seconds']:.2f}s, {scenario['policies_per_second']:.2f} 건/s, "
+            f"오류 {scenario['errors']}, peak RSS {scenario['peak_rss_mb']:.1f}MB"
+        )
+        print(f"  {'stage':<16}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+        previous = base_scenarios.get(scenario["payload_chars"], {}).get("stages", {})
+        for name, stats in scenario["stages"].items():
+            line = f"  {name:<16}" + "".join(f"{stats[k]:>10.1f}" for k in ("p50_ms", "p95_ms", "p99_ms", "max_ms"))
+            if name in previous and previous[name]["p95_ms"]:
+                change = (stats["p95_ms"] - previous[name]["p95_ms"]) / previous[name]["p95_ms"] * 100
+                line += f"   p95 {change:+.1f}%"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="정책 파이프라인 벤치마크")
+    parser.add_argument("--policies", type=int, default=10, help="시나리오당 정책 수")
+    parser.add_argument("--payload-chars", default="80", help="스키마 문자열 필드당 글자 수 (쉼표로 여러 개)")
+    parser.add_argument("--images", type=int, default=2, help="정책당 이미지 수")
+    parser.add_argument("--image-size", default="1024x1024")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시에 처리할 정책 수")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="대체 서버 텍스트 응답 지연")
+    parser.add_argument("--image-latency-ms", type=float, default=None)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--base-url", default=None, help="이미 떠 있는 서버 사용 (지정하지 않으면 내장 대체 서버)")
+    parser.add_argument("--rate-limits", action="store_true", help="스케줄러 기본 RPM/TPM 한도 적용")
+    parser.add_argument("--save", default=None, help="결과 JSON 경로 (기본: data/benchmarks/<시각>.json)")
+    parser.add_argument("--compare", default=None, help="비교할 기준 결과 JSON")
+    parser.add_argument("--keep-data", action="store_true", help="임시 DB/미디어 디렉터리 유지")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        image_latency_ms=args.image_latency_ms,
+        error_rate=args.error_rate,
+        truncate_rate=args.truncate_rate,
+    )
+    server = None
+    if args.base_url:
+        os.environ["OPENAI_BASE_URL"] = args.base_url
+    else:
+        server = serve(config, port=0)
+        os.environ["OPENAI_BASE_URL"] = base_url(server)
+    if not args.rate_limits:
+        os.environ["OPENAI_RATE_LIMITS"] = json.dumps(
+            {model: {"rpm": 10 ** 6, "tpm": 10 ** 9} for model in UNTHROTTLED_MODELS}
+        )
+
+    # DB/미디어/응답·이미지 캐시를 임시 디렉터리로 격리 (이미지 캐시가 남으면 다음 실행부터 생성 대신 적중을 측정)
+    from modules import database, media_store, ai_engine, image_generator
+    from modules.cache import ResponseCache, FileCache
+
+    workdir = tempfile.mkdtemp(prefix="policy-bench-")
+    database.DB_PATH = os.path.join(workdir, "policies.db")
+    media_store.MEDIA_ROOT = os.path.join(workdir, "media")
+    ai_engine.analysis_cache = ResponseCache(os.path.join(workdir, "ai_responses.db"))
+    image_generator.image_cache = FileCache(os.path.join(workdir, "images"))
+    database.init_database()
+
+    try:
+        scenarios = []
+        for payload_chars in (int(v) for v in args.payload_chars.split(",") if v):
+            print(f"running payload={payload_chars} policies={args.policies} concurrency={args.concurrency} ...")
+            scenarios.append(run_scenario(args, payload_chars, config))
+    finally:
+        database.flush_media_variants(60)
+        database.close_pool()
+        if server is not None:
+            server.shutdown()
+        if args.keep_data:
+            print(f"data kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "args": vars(args),
+        "peak_rss_mb": peak_rss_mb(),
+        "scenarios": scenarios,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    path = args.save or os.path.join(BENCH_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nsaved: {path}")
+
+
+if __name__ == "__main__":
+    main()
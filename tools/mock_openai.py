@@ -0,0 +1,458 @@
+"""
+오프라인 OpenAI 대체 서버 (부하 테스트/개발용)
+
+    python -m tools.mock_openai --port 8765 --latency-ms 800 --error-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=mock streamlit run app.py
+
+- POST /v1/chat/completions (stream 포함), /v1/responses, /v1/images/generations
+- 프롬프트 안의 [JSON 스키마]를 그대로 채운 결정적 응답 생성 (요청 해시로 시드)
+- 지연/지터, 429·500 오류 주입, 응답 잘림(max_tokens 초과 흉내) 주입
+- --fixtures 디렉터리의 기록 응답 재생, --record-upstream 지정 시 실제 API 응답을 기록
+"""
+import os
+import json
+import time
+import zlib
+import base64
+import struct
+import random
+import hashlib
+import argparse
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional, Tuple
+
+DEFAULT_PORT = 8765
+
+
+class MockConfig:
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        stream_chunk_ms: float = 0.0,
+        stream_chunk_chars: int = 24,
+        error_rate: float = 0.0,
+        error_codes: Tuple[int, ...] = (429, 500),
+        truncate_rate: float = 0.0,
+        payload_chars: int = 80,
+        image_latency_ms: Optional[float] = None,
+        fixtures_dir: Optional[str] = None,
+        record_upstream: Optional[str] = None,
+        seed: int = 0
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.stream_chunk_ms = stream_chunk_ms
+        self.stream_chunk_chars = stream_chunk_chars
+        self.error_rate = error_rate
+        self.error_codes = error_codes
+        self.truncate_rate = truncate_rate
+        self.payload_chars = payload_chars
+        self.image_latency_ms = latency_ms if image_latency_ms is None else image_latency_ms
+        self.fixtures_dir = fixtures_dir
+        self.record_upstream = record_upstream
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "truncated": 0, "replayed": 0, "recorded": 0}
+
+    def roll(self) -> float:
+        with self.rng_lock:
+            return self.rng.random()
+
+    def delay(self, base_ms: float):
+        jitter = self.roll() * self.jitter_ms if self.jitter_ms else 0.0
+        if base_ms + jitter > 0:
+            time.sleep((base_ms + jitter) / 1000.0)
+
+
+def request_key(endpoint: str, body: Dict[str, Any]) -> str:
+    """픽스처 키 - 응답에 영향을 주는 필드만 해시 (stream 여부는 제외)"""
+    relevant = {k: v for k, v in body.items() if k not in ("stream", "stream_options", "user")}
+    payload = json.dumps({"endpoint": endpoint, "body": relevant}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ---------------------------
+# 결정적 합성 응답
+# ---------------------------
+_FILLER = "정책 실행 계획과 홍보 전략을 현장 여건에 맞게 단계적으로 적용합니다. "
+
+
+def _fill(schema: Any, rng: random.Random, payload_chars: int) -> Any:
+    if isinstance(schema, dict):
+        return {k: _fill(v, rng, payload_chars) for k, v in schema.items()}
+    if isinstance(schema, list):
+        item = schema[0] if schema else ""
+        return [_fill(item, rng, payload_chars) for _ in range(rng.randint(3, 5))]
+    if isinstance(schema, str):
+        start = rng.randrange(len(_FILLER))
+        text = (_FILLER * (payload_chars // len(_FILLER) + 2))[start:start + payload_chars]
+        return f"{schema}: {text}"
+    return schema
+
+
+def _extract_schema(prompt: str) -> Optional[Any]:
+    """프롬프트 속 JSON 스키마 추출 ([JSON 스키마] 뒤 또는 첫 '{')"""
+    decoder = json.JSONDecoder()
+    anchor = prompt.find("[JSON 스키마]")
+    positions = [prompt.find("{", anchor)] if anchor >= 0 else []
+    positions.append(prompt.find("{"))
+    for pos in positions:
+        if pos < 0:
+            continue
+        try:
+            schema, _ = decoder.raw_decode(prompt, pos)
+            return schema
+        except ValueError:
+            continue
+    return None
+
+
+def synthesize_text(prompt: str, key: str, payload_chars: int) -> str:
+    rng = random.Random(key)
+    schema = _extract_schema(prompt)
+    if schema is None:
+        schema = {"result": "응답"}
+    return json.dumps(_fill(schema, rng, payload_chars), ensure_ascii=False, indent=2)
+
+
+_png_cache: Dict[Tuple[int, int], bytes] = {}
+_png_lock = threading.Lock()
+
+
+def make_png(width: int, height: int) -> bytes:
+    """요청 크기의 그라디언트 PNG (Pillow 없이 생성, 크기별 캐시)"""
+    with _png_lock:
+        if (width, height) in _png_cache:
+            return _png_cache[(width, height)]
+    base = bytearray(width * 3)
+    base[0::3] = bytes(x * 255 // max(width - 1, 1) for x in range(width))
+    base[2::3] = bytes([160]) * width
+    rows = []
+    for y in range(height):
+        row = bytearray(base)
+        row[1::3] = bytes([(y * 255) // max(height - 1, 1)]) * width
+        rows.append(b"\x00" + bytes(row))
+    raw = b"".join(rows)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    png = (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 6))
+        + chunk(b"IEND", b"")
+    )
+    with _png_lock:
+        _png_cache[(width, height)] = png
+    return png
+
+
+# ---------------------------
+# 응답 본문
+# ---------------------------
+def _usage(prompt: str, text: str) -> Dict[str, int]:
+    prompt_tokens = max(1, len(prompt) // 2)
+    completion_tokens = max(1, len(text) // 2)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def chat_body(model: str, text: str, prompt: str, finish_reason: str) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": text},
+            "finish_reason": finish_reason,
+        }],
+        "usage": _usage(prompt, text),
+    }
+
+
+def chat_chunk(model: str, delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+def responses_body(model: str, text: str, prompt: str) -> Dict[str, Any]:
+    usage = _usage(prompt, text)
+    return {
+        "id": "resp_mock",
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": model,
+        "output": [{
+            "id": "msg_mock",
+            "type": "message",
+            "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        }],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": usage["prompt_tokens"],
+            "output_tokens": usage["completion_tokens"],
+            "total_tokens": usage["total_tokens"],
+        },
+    }
+
+
+def images_body(size: str, n: int) -> Dict[str, Any]:
+    try:
+        width, height = (int(v) for v in size.split("x"))
+    except ValueError:
+        width, height = 1024, 1024
+    b64 = base64.b64encode(make_png(width, height)).decode("ascii")
+    return {"created": int(time.time()), "data": [{"b64_json": b64} for _ in range(max(1, n))]}
+
+
+def _prompt_text(endpoint: str, body: Dict[str, Any]) -> str:
+    if endpoint == "chat":
+        return "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+    if endpoint == "responses":
+        value = body.get("input", "")
+        return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    return str(body.get("prompt", ""))
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config: MockConfig = MockConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int):
+        self.config.stats["errors"] += 1
+        kind = "rate_limit_exceeded" if status == 429 else "server_error"
+        self._send_json(
+            status,
+            {"error": {"message": f"mock injected {status}", "type": kind, "code": kind}},
+            {"retry-after": "1"} if status == 429 else None,
+        )
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            self._send_json(200, self.config.stats)
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        try:
+            self._handle_post()
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 타임아웃/취소로 먼저 끊은 경우
+            self.close_connection = True
+
+    def _handle_post(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "invalid JSON body"}})
+            return
+        path = self.path.split("?")[0].rstrip("/")
+        if path.endswith("/chat/completions"):
+            endpoint = "chat"
+        elif path.endswith("/responses"):
+            endpoint = "responses"
+        elif path.endswith("/images/generations"):
+            endpoint = "images"
+        else:
+            self._send_json(404, {"error": {"message": f"unknown endpoint {path}"}})
+            return
+
+        config = self.config
+        config.stats["requests"] += 1
+        if config.error_rate and config.roll() < config.error_rate:
+            config.delay(config.latency_ms / 4)
+            self._send_error(config.error_codes[int(config.roll() * len(config.error_codes))])
+            return
+
+        if endpoint == "images":
+            config.delay(config.image_latency_ms)
+            self._send_json(200, self._fixture_or(endpoint, body, lambda: images_body(body.get("size", "1024x1024"), body.get("n", 1))))
+            return
+
+        prompt = _prompt_text(endpoint, body)
+        key = request_key(endpoint, body)
+        text = self._text_for(endpoint, body, prompt, key)
+        finish_reason = "stop"
+        if config.truncate_rate and config.roll() < config.truncate_rate:
+            config.stats["truncated"] += 1
+            text = text[:int(len(text) * (0.5 + config.roll() * 0.4))]
+            finish_reason = "length"
+
+        if endpoint == "chat" and body.get("stream"):
+            self._stream_chat(body.get("model", "mock"), text, finish_reason)
+            return
+        config.delay(config.latency_ms)
+        if endpoint == "chat":
+            self._send_json(200, chat_body(body.get("model", "mock"), text, prompt, finish_reason))
+        else:
+            self._send_json(200, responses_body(body.get("model", "mock"), text, prompt))
+
+    def _stream_chat(self, model: str, text: str, finish_reason: str):
+        config = self.config
+        config.delay(config.latency_ms)  # 첫 토큰까지의 지연
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(payload: Any):
+            self.wfile.write(f"data: {payload}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        send(json.dumps(chat_chunk(model, {"role": "assistant", "content": ""}), ensure_ascii=False))
+        step = max(1, config.stream_chunk_chars)
+        for i in range(0, len(text), step):
+            if config.stream_chunk_ms:
+                time.sleep(config.stream_chunk_ms / 1000.0)
+            send(json.dumps(chat_chunk(model, {"content": text[i:i + step]}), ensure_ascii=False))
+        send(json.dumps(chat_chunk(model, {}, finish_reason), ensure_ascii=False))
+        send("[DONE]")
+
+    # ---------------------------
+    # 픽스처 재생/기록
+    # ---------------------------
+    def _fixture_path(self, key: str) -> Optional[str]:
+        if not self.config.fixtures_dir:
+            return None
+        return os.path.join(self.config.fixtures_dir, f"{key}.json")
+
+    def _load_fixture(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._fixture_path(key)
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.config.stats["replayed"] += 1
+                return json.load(f)
+        return None
+
+    def _record(self, endpoint: str, body: Dict[str, Any], key: str) -> Optional[Dict[str, Any]]:
+        """실제 API로 요청을 전달하고 응답을 픽스처로 저장 (스트림 요청도 일반 요청으로 기록)"""
+        upstream = self.config.record_upstream
+        if not upstream or not self.config.fixtures_dir:
+            return None
+        route = {"chat": "/chat/completions", "responses": "/responses", "images": "/images/generations"}[endpoint]
+        forward = {k: v for k, v in body.items() if k not in ("stream", "stream_options")}
+        request = urllib.request.Request(
+            upstream.rstrip("/") + route,
+            data=json.dumps(forward).encode("utf-8"),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": self.headers.get("Authorization", ""),
+            },
+        )
+        with urllib.request.urlopen(request, timeout=300) as response:
+            recorded = json.loads(response.read())
+        os.makedirs(self.config.fixtures_dir, exist_ok=True)
+        with open(self._fixture_path(key), "w", encoding="utf-8") as f:
+            json.dump(recorded, f, ensure_ascii=False)
+        self.config.stats["recorded"] += 1
+        return recorded
+
+    def _fixture_or(self, endpoint: str, body: Dict[str, Any], build) -> Dict[str, Any]:
+        key = request_key(endpoint, body)
+        return self._load_fixture(key) or self._record(endpoint, body, key) or build()
+
+    def _text_for(self, endpoint: str, body: Dict[str, Any], prompt: str, key: str) -> str:
+        recorded = self._load_fixture(key) or self._record(endpoint, body, key)
+        if recorded:
+            if endpoint == "chat":
+                return recorded["choices"][0]["message"]["content"] or ""
+            return "".join(
+                part.get("text", "")
+                for item in recorded.get("output", [])
+                for part in item.get("content", []) or []
+                if part.get("type") == "output_text"
+            )
+        return synthesize_text(prompt, key, self.config.payload_chars)
+
+
+def serve(config: MockConfig, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """백그라운드 스레드에서 서버 시작 (port=0이면 빈 포트 사용 - server.server_address로 확인)"""
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def base_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 OpenAI 대체 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="텍스트 응답(스트림은 첫 토큰) 지연")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="0~지정값 사이 추가 지연")
+    parser.add_argument("--image-latency-ms", type=float, default=None, help="이미지 응답 지연 (기본: --latency-ms)")
+    parser.add_argument("--stream-chunk-ms", type=float, default=0.0, help="스트림 청크 간격")
+    parser.add_argument("--stream-chunk-chars", type=int, default=24)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="오류 응답 비율 (0~1)")
+    parser.add_argument("--error-codes", default="429,500")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="잘린 응답 비율 (0~1)")
+    parser.add_argument("--payload-chars", type=int, default=80, help="스키마 문자열 필드당 글자 수")
+    parser.add_argument("--fixtures", default=None, help="기록 응답 디렉터리 (요청 해시.json)")
+    parser.add_argument("--record-upstream", default=None, help="예: https://api.openai.com/v1 (픽스처가 없으면 전달 후 기록)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        stream_chunk_ms=args.stream_chunk_ms,
+        stream_chunk_chars=args.stream_chunk_chars,
+        error_rate=args.error_rate,
+        error_codes=tuple(int(code) for code in args.error_codes.split(",") if code),
+        truncate_rate=args.truncate_rate,
+        payload_chars=args.payload_chars,
+        image_latency_ms=args.image_latency_ms,
+        fixtures_dir=args.fixtures,
+        record_upstream=args.record_upstream,
+        seed=args.seed,
+    )
+    server = serve(config, args.host, args.port)
+    print(f"mock OpenAI server: {base_url(server)}  (OPENAI_BASE_URL로 지정)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()